@@ -0,0 +1,116 @@
+"""
+Gunicorn configuration of the task_manager project.
+
+Gunicorn reads it from the working directory, for `gunicorn task_manager.wsgi`
+and `gunicorn task_manager.asgi:application -k uvicorn.workers.UvicornWorker`.
+Every setting can be overridden by an environment variable:
+
+    WEB_CONCURRENCY             number of worker processes
+    GUNICORN_WORKER_CLASS       sync, gthread or uvicorn.workers.UvicornWorker
+    GUNICORN_THREADS            threads per gthread worker
+    GUNICORN_TIMEOUT            seconds before a silent worker is restarted
+    GUNICORN_KEEPALIVE          seconds a client connection is kept open
+    GUNICORN_MAX_REQUESTS       requests served before a worker is replaced
+    GUNICORN_PRELOAD            False to import the app in every worker
+    GUNICORN_SLOW_REQUEST_MS    requests slower than this are logged
+
+By default a worker has 4 threads and there is one worker per CPU plus one,
+so a worker waiting on the database does not hold back the others; sync
+workers (GUNICORN_THREADS=1) get two per CPU plus one.
+
+Migrations are not run here: they are the release step of the Procfile.
+
+For more information on this file, see
+https://docs.gunicorn.org/en/stable/settings.html
+"""
+
+import os
+import threading
+import time
+from typing import Any, Dict
+
+
+def cpu_count() -> int:
+    '''CPUs this process may run on, which in a container may be fewer
+    than those of the host.'''
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, default))
+
+
+bind = '0.0.0.0:{}'.format(os.getenv('PORT', '8000'))
+
+threads = env_int('GUNICORN_THREADS', 4)
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread' if threads > 1 else 'sync')
+workers = env_int(
+    'WEB_CONCURRENCY', cpu_count() * 2 + 1 if worker_class == 'sync' else cpu_count() + 1
+)
+
+timeout = env_int('GUNICORN_TIMEOUT', 30)
+graceful_timeout = timeout
+keepalive = env_int('GUNICORN_KEEPALIVE', 5)
+
+# Replace workers now and then, so a slow leak never grows for long. The
+# jitter spreads the restarts of workers started at the same time.
+max_requests = env_int('GUNICORN_MAX_REQUESTS', 1000)
+max_requests_jitter = env_int('GUNICORN_MAX_REQUESTS_JITTER', max_requests // 10)
+
+# Import Django and the project once in the master: the workers share the
+# imported code through copy-on-write memory and start faster.
+preload_app = os.getenv('GUNICORN_PRELOAD', 'True') == 'True'
+
+# Worker heartbeats go to memory rather than to a possibly slow disk.
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+accesslog = '-'
+errorlog = '-'
+
+slow_request_ms = env_int('GUNICORN_SLOW_REQUEST_MS', 1000)
+
+
+def post_fork(server: Any, worker: Any) -> None:
+    '''A preloaded app must not share the master's database connections.'''
+    if server.cfg.preload_app:
+        from django.db import connections
+        connections.close_all()
+    worker.timings = {'requests': 0, 'total_ms': 0.0, 'max_ms': 0.0}
+    worker.timings_lock = threading.Lock()
+
+
+def pre_request(worker: Any, req: Any) -> None:
+    req.started = time.perf_counter()
+
+
+def post_request(worker: Any, req: Any, environ: Dict[str, Any], resp: Any) -> None:
+    '''Counts the time of every request of the worker and logs slow ones.'''
+    elapsed = (time.perf_counter() - req.started) * 1000
+    timings = worker.timings
+    # gthread workers run this hook in several threads at once.
+    with worker.timings_lock:
+        timings['requests'] += 1
+        timings['total_ms'] += elapsed
+        timings['max_ms'] = max(timings['max_ms'], elapsed)
+    if elapsed >= slow_request_ms:
+        worker.log.warning('Slow request: %s %s took %.0f ms', req.method, req.path, elapsed)
+
+
+def worker_exit(server: Any, worker: Any) -> None:
+    '''Logs the request timings and the database pool statistics of the
+    worker when it is replaced or stopped.'''
+    timings = getattr(worker, 'timings', None)
+    if timings and timings['requests']:
+        server.log.info(
+            'Worker %s served %d requests, mean %.1f ms, max %.1f ms',
+            worker.pid, timings['requests'],
+            timings['total_ms'] / timings['requests'], timings['max_ms'],
+        )
+    from task_manager.db import pool_stats
+    for alias, stats in pool_stats().items():
+        server.log.info('Worker %s database pool %r: %s', worker.pid, alias, ', '.join(
+            '{} {:g}'.format(name, value) for name, value in sorted(stats.items())
+        ))
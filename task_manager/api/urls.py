@@ -0,0 +1,18 @@
+from django.urls import path, URLPattern
+from typing import List
+
+from .views import (
+    TaskListApiView, TaskDetailApiView, StatusListApiView, StatusDetailApiView,
+    LabelListApiView, LabelDetailApiView, UserListApiView, UserDetailApiView
+)
+
+urlpatterns: List[URLPattern] = [
+    path('tasks/', TaskListApiView.as_view(), name='api_tasks'),
+    path('tasks/<int:pk>/', TaskDetailApiView.as_view(), name='api_task'),
+    path('statuses/', StatusListApiView.as_view(), name='api_statuses'),
+    path('statuses/<int:pk>/', StatusDetailApiView.as_view(), name='api_status'),
+    path('labels/', LabelListApiView.as_view(), name='api_labels'),
+    path('labels/<int:pk>/', LabelDetailApiView.as_view(), name='api_label'),
+    path('users/', UserListApiView.as_view(), name='api_users'),
+    path('users/<int:pk>/', UserDetailApiView.as_view(), name='api_user'),
+]
@@ -0,0 +1,226 @@
+"""Read-only JSON API over tasks, statuses, labels and users.
+
+Payloads are built from `values()` rows, never from model instances.
+Every response carries a strong ETag computed from an aggregate query
+(see `task_manager.conditional`), so a poller sending `If-None-Match`
+gets `304 Not Modified` before anything is serialized.
+"""
+
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from django.db.models import Model, QuerySet
+from django.http import HttpRequest, HttpResponse, JsonResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from django.utils.translation import gettext as _
+from django.views import View
+from django_filters import FilterSet
+
+from task_manager.conditional import fingerprint, make_etag
+from task_manager.labels.models import Label
+from task_manager.pagination import InvalidCursor, KeysetPaginator
+from task_manager.statuses.models import Status
+from task_manager.tasks.filters import TasksFilter
+from task_manager.tasks.models import Task, TaskLabel
+from task_manager.tasks.search import get_ordering
+from task_manager.users.models import User
+
+
+def error(message: Any, status: int) -> JsonResponse:
+    return JsonResponse({'detail': message}, status=status)
+
+
+class ApiView(View):
+    """Base of the API views: session authentication and compact JSON.
+    They only read, from a replica if there is one."""
+
+    http_method_names: List[str] = ['get', 'head', 'options']
+    read_from_replica: bool = True
+    model: Type[Model]
+    fields: Tuple[str, ...]
+
+    def dispatch(self, request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+        if not request.user.is_authenticated:
+            return error(_('Authentication credentials were not provided.'), 401)
+        return super().dispatch(request, *args, **kwargs)
+
+    def get_queryset(self) -> QuerySet:
+        return self.model._default_manager.all()
+
+    def serialize(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Complete the `values()` rows, e.g. with many-to-many ids."""
+        return rows
+
+    def render(self, data: Dict[str, Any], etag: str,
+               last_modified: Optional[int] = None) -> JsonResponse:
+        response = JsonResponse(data, json_dumps_params={'separators': (',', ':')})
+        return self.add_validators(response, etag, last_modified)
+
+    def not_modified(self, etag: str,
+                     last_modified: Optional[int] = None) -> Optional[HttpResponse]:
+        """A 304 (or 412) response if the request's validators match."""
+        response = get_conditional_response(self.request, etag=etag, last_modified=last_modified)
+        if response is not None:
+            self.add_validators(response, etag, last_modified)
+        return response
+
+    def add_validators(self, response: HttpResponse, etag: str,
+                       last_modified: Optional[int]) -> HttpResponse:
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        # Clients may keep the payload but must revalidate it on every use.
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+class ApiListView(ApiView):
+    """A page of rows in (date_modified, id) order, or by rank for a
+    task search, addressed by cursor.
+
+    The ETag covers the filtered rows and the query string. No
+    Last-Modified is sent: deleting a row leaves the latest modification
+    time unchanged, so only the row count in the ETag notices it.
+    """
+
+    filterset_class: Optional[Type[FilterSet]] = None
+    ordering: Tuple[str, ...] = ('date_modified', 'id')
+    paginate_by: int = 50
+    max_paginate_by: int = 500
+    page_kwarg: str = 'cursor'
+    page_size_kwarg: str = 'limit'
+
+    def get(self, request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+        queryset = self.get_queryset()
+        if self.filterset_class is not None:
+            filterset = self.filterset_class(request.GET, queryset=queryset, request=request)
+            if not filterset.is_valid():
+                return error(filterset.errors, 400)
+            queryset = filterset.qs
+
+        etag = make_etag(
+            self.model._meta.label, request.user.pk,
+            *fingerprint(queryset), sorted(request.GET.lists()),
+        )
+        response = self.not_modified(etag)
+        if response is not None:
+            return response
+        return self.get_page(queryset, etag)
+
+    def get_page(self, queryset: QuerySet, etag: str) -> HttpResponse:
+        try:
+            per_page = min(
+                int(self.request.GET.get(self.page_size_kwarg, self.paginate_by)),
+                self.max_paginate_by,
+            )
+            if per_page < 1:
+                raise ValueError
+        except ValueError:
+            return error(_('Invalid page size.'), 400)
+        ordering = get_ordering(queryset, self.ordering)
+        paginator = KeysetPaginator(queryset, per_page, ordering)
+        try:
+            page = paginator.page(self.request.GET.get(self.page_kwarg) or None)
+        except InvalidCursor as invalid:
+            return error(_('Invalid cursor: %(message)s') % {'message': invalid}, 400)
+
+        rows = list(page.object_list.order_by(*ordering).values(*self.fields))
+        return self.render({
+            'next': self.get_page_url(page.next_cursor),
+            'previous': self.get_page_url(page.previous_cursor),
+            'results': self.serialize(rows),
+        }, etag)
+
+    def get_page_url(self, cursor: Optional[str]) -> Optional[str]:
+        if cursor is None:
+            return None
+        params = self.request.GET.copy()
+        params[self.page_kwarg] = cursor
+        return '{}?{}'.format(self.request.path, params.urlencode())
+
+
+class ApiDetailView(ApiView):
+    """One row. The ETag and Last-Modified come from its `date_modified`."""
+
+    def get(self, request: HttpRequest, pk: int, *args: Any, **kwargs: Any) -> HttpResponse:
+        queryset = self.get_queryset().filter(pk=pk)
+        modified = queryset.values_list('date_modified', flat=True).first()
+        if modified is None:
+            return error(_('Not found.'), 404)
+
+        etag = make_etag(self.model._meta.label, pk, modified)
+        last_modified = int(modified.timestamp())
+        response = self.not_modified(etag, last_modified)
+        if response is not None:
+            return response
+        row, = self.serialize(list(queryset.values(*self.fields)))
+        return self.render(row, etag, last_modified)
+
+
+class TaskApiMixin:
+    model: Type[Model] = Task
+    fields: Tuple[str, ...] = (
+        'id', 'name', 'description', 'status', 'author', 'executor',
+        'date_created', 'date_modified',
+    )
+
+    def serialize(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Adds the label ids of the tasks with one query."""
+        labels = defaultdict(list)
+        for task_id, label_id in TaskLabel.objects.filter(
+            task_id__in=[row['id'] for row in rows]
+        ).order_by('label_id').values_list('task_id', 'label_id'):
+            labels[task_id].append(label_id)
+        for row in rows:
+            row['labels'] = labels[row['id']]
+        return rows
+
+
+class TaskListApiView(TaskApiMixin, ApiListView):
+    filterset_class: Type[FilterSet] = TasksFilter
+
+
+class TaskDetailApiView(TaskApiMixin, ApiDetailView):
+    pass
+
+
+class StatusApiMixin:
+    model: Type[Model] = Status
+    fields: Tuple[str, ...] = ('id', 'name', 'date_created', 'date_modified')
+
+
+class StatusListApiView(StatusApiMixin, ApiListView):
+    pass
+
+
+class StatusDetailApiView(StatusApiMixin, ApiDetailView):
+    pass
+
+
+class LabelApiMixin:
+    model: Type[Model] = Label
+    fields: Tuple[str, ...] = ('id', 'name', 'date_created', 'date_modified')
+
+
+class LabelListApiView(LabelApiMixin, ApiListView):
+    pass
+
+
+class LabelDetailApiView(LabelApiMixin, ApiDetailView):
+    pass
+
+
+class UserApiMixin:
+    model: Type[Model] = User
+    fields: Tuple[str, ...] = (
+        'id', 'username', 'first_name', 'last_name', 'date_joined', 'date_modified',
+    )
+
+
+class UserListApiView(UserApiMixin, ApiListView):
+    pass
+
+
+class UserDetailApiView(UserApiMixin, ApiDetailView):
+    pass
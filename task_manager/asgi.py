@@ -2,6 +2,11 @@
 ASGI config for task_manager project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+The read-only pages are served by their async views with ASYNC_VIEWS=True,
+which is off by default: measure it with `make load-test` first.
+
+Run it with uvicorn workers, e.g.:
+    gunicorn task_manager.asgi:application -k uvicorn.workers.UvicornWorker
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.1/howto/deployment/asgi/
@@ -0,0 +1,62 @@
+"""Configure Django cache backends from URLs, the way dj_database_url does for databases.
+
+    lru://?max_entries=10000&timeout=300      bounded in-process LRU cache
+    locmem://                                 Django local-memory cache
+    file:////var/tmp/task_manager             files shared by the processes of a host
+    sqlite:////var/tmp/task_manager.sqlite3   SQLite file shared by the processes of a host
+    dummy://                                  no caching
+"""
+
+import os
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qsl, urlsplit
+
+
+SCHEMES: Dict[str, str] = {
+    'lru': 'task_manager.caching.backends.LRUCache',
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'task_manager.caching.backends.FileCache',
+    'sqlite': 'task_manager.caching.backends.SQLiteCache',
+    'dummy': 'django.core.cache.backends.dummy.DummyCache',
+}
+
+OPTIONS = {
+    'max_entries': 'MAX_ENTRIES',
+    'cull_frequency': 'CULL_FREQUENCY',
+}
+
+
+def config(env: str = 'CACHE_URL', default: Optional[str] = None) -> Dict[str, Any]:
+    """Return the cache configuration from the URL in the environment variable."""
+    url = os.environ.get(env, default)
+    return parse(url) if url else {}
+
+
+def parse(url: str) -> Dict[str, Any]:
+    """Turn a cache URL into an item of the CACHES setting."""
+    parts = urlsplit(url)
+    if parts.scheme not in SCHEMES:
+        raise ValueError('Unknown cache scheme {!r} in {!r}'.format(parts.scheme, url))
+
+    cache: Dict[str, Any] = {'BACKEND': SCHEMES[parts.scheme]}
+    _parse_query(parts.query, cache)
+    if parts.scheme in ('file', 'sqlite'):
+        # As with dj_database_url, "sqlite:////tmp/cache" is absolute
+        # and "sqlite:///cache" is relative to the working directory.
+        cache['LOCATION'] = parts.path[1:]
+    else:
+        cache['LOCATION'] = parts.netloc
+    return cache
+
+
+def _parse_query(query: str, cache: Dict[str, Any]) -> None:
+    """Move the cache options of the query into `cache`."""
+    for name, value in parse_qsl(query):
+        if name == 'timeout':
+            cache['TIMEOUT'] = None if value.lower() == 'none' else int(value)
+        elif name == 'key_prefix':
+            cache['KEY_PREFIX'] = value
+        elif name in OPTIONS:
+            cache.setdefault('OPTIONS', {})[OPTIONS[name]] = int(value)
+        else:
+            raise ValueError('Unknown cache option {!r}'.format(name))
@@ -0,0 +1,345 @@
+"""Cache backends that count hits, misses and evictions.
+
+Every backend here has a `stats()` method, reported by the `cache_stats`
+management command. Counters of in-process backends cover the current
+process only. The SQLite backend keeps them in its database, so they
+add up across every process sharing the file.
+"""
+
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.cache.backends.filebased import FileBasedCache
+
+
+_MISSING = object()
+
+
+def _stats(size: int, hits: int, misses: int, evictions: int, shared: bool) -> Dict[str, Any]:
+    lookups = hits + misses
+    return {
+        'size': size,
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': hits / lookups if lookups else 0.0,
+        'evictions': evictions,
+        'shared': shared,
+    }
+
+
+class LRUCache(BaseCache):
+    """Bounded in-process cache evicting the least recently used key.
+
+    Unlike LocMemCache, which culls a third of its entries once full,
+    it evicts exactly one entry per insert over MAX_ENTRIES.
+    """
+
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+
+    def __init__(self, name: str, params: Dict[str, Any]) -> None:
+        super().__init__(params)
+        self._entries: 'OrderedDict[str, Tuple[Optional[float], bytes]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        pickled = pickle.dumps(value, self.pickle_protocol)
+        with self._lock:
+            if self._live(key) is not None:
+                return False
+            self._store(key, pickled, timeout)
+            return True
+
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        with self._lock:
+            pickled = self._live(key)
+            if pickled is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return pickle.loads(pickled)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        pickled = pickle.dumps(value, self.pickle_protocol)
+        with self._lock:
+            self._store(key, pickled, timeout)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        with self._lock:
+            pickled = self._live(key)
+            if pickled is None:
+                return False
+            self._store(key, pickled, timeout)
+            return True
+
+    def incr(self, key, delta=1, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        with self._lock:
+            pickled = self._live(key)
+            if pickled is None:
+                raise ValueError("Key '%s' not found" % key)
+            value = pickle.loads(pickled) + delta
+            expires, _ = self._entries[key]
+            self._entries[key] = (expires, pickle.dumps(value, self.pickle_protocol))
+            self._entries.move_to_end(key)
+        return value
+
+    def has_key(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        with self._lock:
+            return self._live(key) is not None
+
+    def delete(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        with self._lock:
+            return self._entries.pop(key, None) is not None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return _stats(len(self._entries), self.hits, self.misses, self.evictions, False)
+
+    def _live(self, key: str) -> Optional[bytes]:
+        """The pickled value of an unexpired key. The caller holds the lock."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, pickled = entry
+        if expires is not None and expires <= time.time():
+            del self._entries[key]
+            return None
+        return pickled
+
+    def _store(self, key: str, pickled: bytes, timeout: Any) -> None:
+        """Insert or replace a value and evict the overflow. The caller holds the lock."""
+        self._entries[key] = (self.get_backend_timeout(timeout), pickled)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+
+class FileCache(FileBasedCache):
+    """Django's file-based cache with per-process hit, miss and eviction counters."""
+
+    def __init__(self, dir: str, params: Dict[str, Any]) -> None:
+        super().__init__(dir, params)
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _MISSING, version)
+        with self._lock:
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self.hits += 1
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        size = len(self._list_cache_files())
+        with self._lock:
+            return _stats(size, self.hits, self.misses, self.evictions, False)
+
+    def _cull(self):
+        before = len(self._list_cache_files())
+        super()._cull()
+        evicted = before - len(self._list_cache_files())
+        with self._lock:
+            self.evictions += evicted
+
+
+class SQLiteCache(BaseCache):
+    """Cache in a SQLite file that every process of a host can share.
+
+    The database runs in WAL mode, so readers never wait for a writer.
+    Counters are buffered in memory and flushed to the database every
+    `stats_flush_every` lookups. Entries are counted, and culled if over
+    MAX_ENTRIES, every `cull_every` writes of a process, so the cache may
+    briefly hold a few more entries than MAX_ENTRIES.
+    """
+
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+    stats_flush_every = 100
+    cull_every = 100
+
+    def __init__(self, location: str, params: Dict[str, Any]) -> None:
+        super().__init__(params)
+        self._path = os.path.abspath(location)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._pending = {'hits': 0, 'misses': 0, 'evictions': 0}
+        self._writes = 0
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        pickled = pickle.dumps(value, self.pickle_protocol)
+        with self._transaction() as db:
+            db.execute('DELETE FROM cache WHERE key = ? AND expires <= ?', (key, time.time()))
+            inserted = db.execute(
+                'INSERT OR IGNORE INTO cache (key, value, expires) VALUES (?, ?, ?)',
+                (key, pickled, self.get_backend_timeout(timeout)),
+            ).rowcount
+            self._cull(db)
+        return bool(inserted)
+
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        row = self._connection().execute(
+            'SELECT value FROM cache WHERE key = ? AND (expires IS NULL OR expires > ?)',
+            (key, time.time()),
+        ).fetchone()
+        self._record('misses' if row is None else 'hits')
+        return default if row is None else pickle.loads(row[0])
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        pickled = pickle.dumps(value, self.pickle_protocol)
+        with self._transaction() as db:
+            db.execute(
+                'INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)',
+                (key, pickled, self.get_backend_timeout(timeout)),
+            )
+            self._cull(db)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        with self._transaction() as db:
+            return bool(db.execute(
+                'UPDATE cache SET expires = ? WHERE key = ? AND (expires IS NULL OR expires > ?)',
+                (self.get_backend_timeout(timeout), key, time.time()),
+            ).rowcount)
+
+    def incr(self, key, delta=1, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        with self._transaction() as db:
+            row = db.execute(
+                'SELECT value FROM cache WHERE key = ? AND (expires IS NULL OR expires > ?)',
+                (key, time.time()),
+            ).fetchone()
+            if row is None:
+                raise ValueError("Key '%s' not found" % key)
+            value = pickle.loads(row[0]) + delta
+            db.execute(
+                'UPDATE cache SET value = ? WHERE key = ?',
+                (pickle.dumps(value, self.pickle_protocol), key),
+            )
+        return value
+
+    def has_key(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return self._connection().execute(
+            'SELECT 1 FROM cache WHERE key = ? AND (expires IS NULL OR expires > ?)',
+            (key, time.time()),
+        ).fetchone() is not None
+
+    def delete(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        with self._transaction() as db:
+            return bool(db.execute('DELETE FROM cache WHERE key = ?', (key,)).rowcount)
+
+    def clear(self):
+        with self._transaction() as db:
+            db.execute('DELETE FROM cache')
+
+    def stats(self) -> Dict[str, Any]:
+        self._flush_stats()
+        db = self._connection()
+        size = db.execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+        counters = dict(db.execute('SELECT name, value FROM cache_stats').fetchall())
+        return _stats(
+            size, counters.get('hits', 0), counters.get('misses', 0),
+            counters.get('evictions', 0), True,
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        """A connection of the current thread, reopened after a fork."""
+        connection, pid = getattr(self._local, 'connection', (None, None))
+        if connection is None or pid != os.getpid():
+            os.makedirs(os.path.dirname(self._path), exist_ok=True)
+            connection = sqlite3.connect(self._path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS cache '
+                '(key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL)'
+            )
+            connection.execute('CREATE INDEX IF NOT EXISTS cache_expires ON cache (expires)')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS cache_stats '
+                '(name TEXT PRIMARY KEY, value INTEGER NOT NULL)'
+            )
+            self._local.connection = (connection, os.getpid())
+        return connection
+
+    def _transaction(self) -> '_Transaction':
+        return _Transaction(self._connection())
+
+    def _cull(self, db: sqlite3.Connection) -> None:
+        """Drop expired keys, then the keys expiring soonest, once over MAX_ENTRIES.
+        Only every `cull_every` writes count the entries."""
+        with self._lock:
+            self._writes += 1
+            if self._writes < self.cull_every:
+                return
+            self._writes = 0
+        size = db.execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+        if size <= self._max_entries:
+            return
+        evicted = db.execute('DELETE FROM cache WHERE expires <= ?', (time.time(),)).rowcount
+        if size - evicted > self._max_entries:
+            evicted += db.execute(
+                'DELETE FROM cache WHERE key IN (SELECT key FROM cache '
+                'ORDER BY expires IS NULL, expires LIMIT ?)',
+                (max(1, (size - evicted) // self._cull_frequency),),
+            ).rowcount
+        with self._lock:
+            self._pending['evictions'] += evicted
+
+    def _record(self, name: str) -> None:
+        with self._lock:
+            self._pending[name] += 1
+            flush = sum(self._pending.values()) >= self.stats_flush_every
+        if flush:
+            self._flush_stats()
+
+    def _flush_stats(self) -> None:
+        with self._lock:
+            pending = [(name, count) for name, count in self._pending.items() if count]
+            self._pending = dict.fromkeys(self._pending, 0)
+        if not pending:
+            return
+        with self._transaction() as db:
+            db.executemany(
+                'INSERT INTO cache_stats (name, value) VALUES (?, ?) '
+                'ON CONFLICT (name) DO UPDATE SET value = value + excluded.value',
+                pending,
+            )
+
+
+class _Transaction:
+    """`BEGIN IMMEDIATE` ... `COMMIT`, so concurrent writers queue instead of failing."""
+
+    def __init__(self, connection: sqlite3.Connection) -> None:
+        self.connection = connection
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.connection.execute('BEGIN IMMEDIATE')
+        return self.connection
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        self.connection.execute('COMMIT' if exc_type is None else 'ROLLBACK')
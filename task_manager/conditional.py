@@ -0,0 +1,30 @@
+"""Validators for conditional requests computed from aggregate queries.
+
+A queryset's fingerprint is the latest `date_modified` of its rows and
+their count, fetched in one aggregate query without loading any row.
+It changes whenever a row is added, changed or deleted: an insert or
+update moves the maximum, a deletion lowers the count.
+"""
+
+import hashlib
+from datetime import datetime
+from typing import Any, Optional, Tuple
+
+from django.db.models import Count, Max, QuerySet
+
+
+Fingerprint = Tuple[Optional[datetime], int]
+
+
+def fingerprint(queryset: QuerySet, field: str = 'date_modified') -> Fingerprint:
+    """The latest modification time and the number of rows of the queryset."""
+    result = queryset.aggregate(modified=Max(field), count=Count('pk'))
+    return result['modified'], result['count']
+
+
+def make_etag(*parts: Any) -> str:
+    """A strong entity tag, quoted as sent in the ETag header, hashing the parts."""
+    source = '\x1f'.join(
+        part.isoformat() if isinstance(part, datetime) else str(part) for part in parts
+    )
+    return '"{}"'.format(hashlib.sha1(source.encode()).hexdigest())
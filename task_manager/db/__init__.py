@@ -0,0 +1,135 @@
+"""Database configuration from the environment, next to dj_database_url.
+
+PostgreSQL
+----------
+
+With DATABASE_POOL=True, a PostgreSQL database uses the
+`task_manager.db.postgresql` backend: every process keeps a pool of
+connections (see pool.py) shared by its threads, instead of a persistent
+connection per thread. A request takes a connection from the pool when
+it first queries and gives it back when it ends, so a worker holds no
+more connections than it has busy threads.
+
+    DATABASE_POOL_MIN_SIZE       idle connections kept open, 1 by default
+    DATABASE_POOL_MAX_SIZE       connections per process, GUNICORN_THREADS (4) by default
+    DATABASE_POOL_MAX_AGE        seconds before a connection is replaced, 1800 by default
+    DATABASE_POOL_MAX_IDLE       seconds before an idle connection is closed, 600 by default
+    DATABASE_POOL_CHECK_AFTER    idle seconds after which a connection is checked
+                                 with "SELECT 1" before use, 30 by default
+    DATABASE_POOL_TIMEOUT        seconds to wait for a free connection, 10 by default
+
+Server-side cursors, used by `QuerySet.iterator()` on PostgreSQL, do not
+survive the end of a transaction under PgBouncer in transaction mode.
+They are disabled unless DATABASE_SERVER_SIDE_CURSORS=True: iterators then
+read the whole result into memory, so task exports read their rows by
+keyset chunks instead (see `iterate_by_keyset` in task_manager/pagination.py).
+
+SQLite
+------
+
+With SQLITE_PRODUCTION=True, an SQLite database uses the
+`task_manager.db.sqlite3` backend, for several workers writing at once:
+
+* WAL journal, so readers do not block the writer nor the writer readers;
+* synchronous=NORMAL, which in WAL mode may lose the last transactions
+  on a power failure but never corrupts the database;
+* a busy timeout of SQLITE_BUSY_TIMEOUT milliseconds (5000 by default),
+  during which a writer waits for the write lock held by another one;
+* SQLITE_MMAP_SIZE bytes of the file memory-mapped (256 MiB by default)
+  and a page cache of SQLITE_CACHE_SIZE KiB per connection (64000);
+* atomic blocks starting with BEGIN IMMEDIATE, so that writers queue
+  for the lock instead of failing with "database is locked".
+
+`manage.py benchmark_task_writes` measures concurrent task writes with
+and without it.
+"""
+
+import os
+from typing import Any, Dict
+
+import dj_database_url
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+SQLITE_ENGINE = 'django.db.backends.sqlite3'
+POSTGRESQL_ENGINES = ('django.db.backends.postgresql', 'django.db.backends.postgresql_psycopg2')
+
+
+def config(database: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the settings to add to the database item of DATABASES."""
+    engine = database.get('ENGINE')
+    if engine in POSTGRESQL_ENGINES:
+        return postgresql_config()
+    if engine == SQLITE_ENGINE and os.getenv('SQLITE_PRODUCTION', 'False') == 'True':
+        return sqlite_config(database)
+    return {}
+
+
+def postgresql_config() -> Dict[str, Any]:
+    settings: Dict[str, Any] = {}
+    settings['DISABLE_SERVER_SIDE_CURSORS'] = (
+        os.getenv('DATABASE_SERVER_SIDE_CURSORS', 'False') != 'True'
+    )
+    if os.getenv('DATABASE_POOL', 'False') == 'True':
+        settings.update({
+            'ENGINE': 'task_manager.db.postgresql',
+            # Connections go back to the pool at the end of every request.
+            'CONN_MAX_AGE': 0,
+            'POOL': {
+                'min_size': int(os.getenv('DATABASE_POOL_MIN_SIZE', 1)),
+                'max_size': int(os.getenv(
+                    'DATABASE_POOL_MAX_SIZE', os.getenv('GUNICORN_THREADS', 4)
+                )),
+                'max_age': float(os.getenv('DATABASE_POOL_MAX_AGE', 1800)),
+                'max_idle': float(os.getenv('DATABASE_POOL_MAX_IDLE', 600)),
+                'check_after': float(os.getenv('DATABASE_POOL_CHECK_AFTER', 30)),
+                'timeout': float(os.getenv('DATABASE_POOL_TIMEOUT', 10)),
+            },
+        })
+    return settings
+
+
+def sqlite_config(database: Dict[str, Any]) -> Dict[str, Any]:
+    pragmas = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT', 5000)),
+        'mmap_size': int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+        # Negative sizes are in KiB rather than in pages.
+        'cache_size': -int(os.getenv('SQLITE_CACHE_SIZE', 64000)),
+        'temp_store': 'MEMORY',
+    }
+    return {
+        'ENGINE': 'task_manager.db.sqlite3',
+        'OPTIONS': dict(
+            database.get('OPTIONS', {}),
+            transaction_mode='IMMEDIATE',
+            init_command='; '.join(
+                'PRAGMA {} = {}'.format(name, value) for name, value in pragmas.items()
+            ),
+        ),
+    }
+
+
+def replicas(env: str = 'DATABASE_REPLICA_URLS',
+             conn_max_age: int = 0) -> Dict[str, Dict[str, Any]]:
+    """Return the items of DATABASES for the comma-separated database URLs
+    in the environment variable, named replica_0, replica_1 and so on.
+    In tests they mirror the default database."""
+    databases = {}
+    urls = [url.strip() for url in os.getenv(env, '').split(',') if url.strip()]
+    for number, url in enumerate(urls):
+        database = dj_database_url.parse(url, conn_max_age=conn_max_age)
+        database.update(config(database))
+        database['TEST'] = {'MIRROR': DEFAULT_DB_ALIAS}
+        databases['replica_{}'.format(number)] = database
+    return databases
+
+
+def pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Statistics of the connection pools of this process, by database alias."""
+    from task_manager.db.pool import pools
+    return {
+        alias: pools[alias].stats()
+        for alias in connections.settings if alias in pools
+    }
@@ -0,0 +1,214 @@
+"""A pool of database connections shared by the threads of a process.
+
+The pool does not know about databases: it opens connections with a
+`connect` callable, asks `check` whether an idle connection still works
+and `reset` whether a returned one can be reused, e.g. after a rollback.
+
+A connection is handed out again only while it is younger than `max_age`
+seconds. One that was idle for `check_after` seconds is checked first.
+Idle connections beyond `min_size` are closed after `max_idle` seconds.
+No more than `max_size` connections are open at once: a thread wanting
+another one waits up to `timeout` seconds, then gets `PoolTimeout`.
+
+After a fork the child drops the connections of the parent without
+closing them, since closing would end the parent's sessions.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+
+# Connections inherited from a parent process. Kept referenced, so they
+# are never closed (or garbage collected, which closes them) by the child.
+_inherited: List[Any] = []
+
+
+# The pools of this process, by database alias.
+pools: Dict[str, 'ConnectionPool'] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias: str, **options: Any) -> 'ConnectionPool':
+    """Return the pool of the database `alias`, created with `options` on first use."""
+    with _pools_lock:
+        if alias not in pools:
+            pools[alias] = ConnectionPool(**options)
+        return pools[alias]
+
+
+class PoolTimeout(Exception):
+    """No connection became available within the timeout of the pool."""
+
+
+class Entry:
+    """A connection of the pool with the times it was opened and returned."""
+
+    __slots__ = ('connection', 'opened', 'returned')
+
+    def __init__(self, connection: Any, now: float) -> None:
+        self.connection = connection
+        self.opened = self.returned = now
+
+
+class ConnectionPool:
+    """Connections opened on demand, at most `max_size` at once."""
+
+    def __init__(self, connect: Callable[[], Any],
+                 check: Callable[[Any], bool] = lambda connection: True,
+                 reset: Callable[[Any], bool] = lambda connection: True,
+                 min_size: int = 1, max_size: int = 4, max_age: float = 1800,
+                 max_idle: float = 600, check_after: float = 30, timeout: float = 10) -> None:
+        self.connect, self.check, self.reset = connect, check, reset
+        self.min_size, self.max_size = min_size, max_size
+        self.max_age, self.max_idle = max_age, max_idle
+        self.check_after, self.timeout = check_after, timeout
+        self._condition = threading.Condition()
+        self._start()
+
+    def _start(self) -> None:
+        self._pid = os.getpid()
+        self._idle: Deque[Entry] = deque()
+        self._in_use: Dict[int, Entry] = {}
+        self._size = 0
+        self.counters: Dict[str, float] = dict.fromkeys((
+            'checkouts', 'opened', 'closed', 'expired', 'failed_checks',
+            'waits', 'timeouts', 'max_wait_ms',
+        ), 0)
+
+    def get(self) -> Any:
+        """Return an idle connection, or a new one if there is none."""
+        self._forget_parent()
+        deadline = time.monotonic() + self.timeout
+        while True:
+            entry = self._reserve(deadline)
+            if entry is None:
+                return self._open()
+            if self._usable(entry):
+                return entry.connection
+            self._discard(entry)
+
+    def put(self, connection: Any) -> None:
+        """Take a connection back from the thread that got it."""
+        self._forget_parent()
+        with self._condition:
+            entry = self._in_use.pop(id(connection), None)
+        if entry is None:
+            # Not ours: inherited from the parent process.
+            _inherited.append(connection)
+            return
+        now = time.monotonic()
+        if now - entry.opened >= self.max_age or not self._reset(connection):
+            self._discard(entry)
+            return
+        entry.returned = now
+        with self._condition:
+            self._idle.append(entry)
+            expired = self._trim(now)
+            self._condition.notify()
+        for old in expired:
+            self._close(old.connection)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._condition:
+            return dict(
+                self.counters, size=self._size, idle=len(self._idle),
+                in_use=len(self._in_use), max_size=self.max_size,
+            )
+
+    def _forget_parent(self) -> None:
+        if self._pid != os.getpid():
+            with self._condition:
+                _inherited.extend(entry.connection for entry in self._idle)
+                _inherited.extend(entry.connection for entry in self._in_use.values())
+                self._start()
+
+    def _reserve(self, deadline: float) -> Optional[Entry]:
+        """Take the most recently returned idle connection, or return None
+        after reserving room for a new one. Waits while the pool is full."""
+        started = time.monotonic()
+        with self._condition:
+            while not self._idle and self._size >= self.max_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.counters['timeouts'] += 1
+                    raise PoolTimeout('No database connection available within {}s '
+                                      '({} in use)'.format(self.timeout, self._size))
+                self.counters['waits'] += 1
+                self._condition.wait(remaining)
+            waited = (time.monotonic() - started) * 1000
+            self.counters['max_wait_ms'] = max(self.counters['max_wait_ms'], waited)
+            self.counters['checkouts'] += 1
+            if not self._idle:
+                self._size += 1
+                return None
+            entry = self._idle.pop()
+            self._in_use[id(entry.connection)] = entry
+            return entry
+
+    def _usable(self, entry: Entry) -> bool:
+        now = time.monotonic()
+        if now - entry.opened >= self.max_age:
+            self._count('expired')
+            return False
+        if now - entry.returned >= self.check_after and not self._check(entry.connection):
+            self._count('failed_checks')
+            return False
+        return True
+
+    def _count(self, counter: str) -> None:
+        with self._condition:
+            self.counters[counter] += 1
+
+    def _open(self) -> Any:
+        try:
+            connection = self.connect()
+        except BaseException:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self._in_use[id(connection)] = Entry(connection, time.monotonic())
+            self.counters['opened'] += 1
+        return connection
+
+    def _trim(self, now: float) -> List[Entry]:
+        """Remove the connections idle for too long beyond `min_size`,
+        the least recently returned first. Called with the lock held."""
+        expired = []
+        while (self._idle and self._size > self.min_size
+               and now - self._idle[0].returned >= self.max_idle):
+            expired.append(self._idle.popleft())
+            self._size -= 1
+            self.counters['closed'] += 1
+        return expired
+
+    def _discard(self, entry: Entry) -> None:
+        with self._condition:
+            self._in_use.pop(id(entry.connection), None)
+            self._size -= 1
+            self.counters['closed'] += 1
+            self._condition.notify()
+        self._close(entry.connection)
+
+    def _check(self, connection: Any) -> bool:
+        try:
+            return self.check(connection)
+        except Exception:
+            return False
+
+    def _reset(self, connection: Any) -> bool:
+        try:
+            return self.reset(connection)
+        except Exception:
+            return False
+
+    @staticmethod
+    def _close(connection: Any) -> None:
+        try:
+            connection.close()
+        except Exception:
+            pass
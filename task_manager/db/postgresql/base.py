@@ -0,0 +1,57 @@
+"""PostgreSQL backend taking its connections from a pool of the process.
+
+See task_manager/db/__init__.py for its settings.
+"""
+
+from functools import partial
+from typing import Any, Dict
+
+from django.db.backends.postgresql import base
+from psycopg2 import extensions
+
+from task_manager.db.pool import PoolTimeout, get_pool, pools
+
+
+Database = base.Database
+
+
+def check(connection: Any) -> bool:
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+    return True
+
+
+def reset(connection: Any) -> bool:
+    '''Rolls back what a failed request left open. A connection whose
+    state is unknown, e.g. after a lost server, is not reused.'''
+    if connection.closed:
+        return False
+    status = connection.get_transaction_status()
+    if status in (extensions.TRANSACTION_STATUS_INTRANS, extensions.TRANSACTION_STATUS_INERROR):
+        connection.rollback()
+        status = connection.get_transaction_status()
+    return status == extensions.TRANSACTION_STATUS_IDLE
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def get_new_connection(self, conn_params: Dict[str, Any]) -> Any:
+        # The pool opens connections as the plain backend does, through a
+        # wrapper of its own rather than the one of the thread creating it.
+        pool = pools.get(self.alias) or get_pool(
+            self.alias, check=check, reset=reset,
+            connect=partial(
+                base.DatabaseWrapper.get_new_connection,
+                base.DatabaseWrapper(self.settings_dict, self.alias), conn_params,
+            ),
+            **self.settings_dict['POOL'],
+        )
+        try:
+            return pool.get()
+        except PoolTimeout as error:
+            raise Database.OperationalError(str(error)) from error
+
+    def _close(self) -> None:
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                pools[self.alias].put(self.connection)
@@ -0,0 +1,47 @@
+"""Send the reads of read-only pages to a replica of the database.
+
+`ReplicaMiddleware` picks one of the DATABASE_REPLICAS for a GET or HEAD
+request to a view with `read_from_replica = True` and keeps it in
+`replica` while the view runs. `ReplicaRouter` then reads the models of
+the project apps from that replica. Sessions and everything else, all
+writes and every other request use the primary database, `default`.
+
+A replica lags behind the primary. After a request that may have
+written, the middleware sets a cookie that keeps the reads of that
+browser on the primary for DATABASE_REPLICA_STICKY_SECONDS, so users
+see the task they have just created.
+"""
+
+from contextvars import ContextVar
+from typing import Any, Optional, Type
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Model
+
+
+REPLICATED_APPS = frozenset(('tasks', 'statuses', 'labels', 'users'))
+
+# The replica the current request reads from, if any.
+replica: ContextVar[Optional[str]] = ContextVar('replica', default=None)
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model: Type[Model], **hints: Any) -> Optional[str]:
+        if model._meta.app_label in REPLICATED_APPS:
+            return replica.get()
+        return None
+
+    def db_for_write(self, model: Type[Model], **hints: Any) -> str:
+        # Objects read from a replica are saved to the primary, too.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1: Model, obj2: Model, **hints: Any) -> Optional[bool]:
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
+
+    def allow_migrate(self, db: str, app_label: str, **hints: Any) -> Optional[bool]:
+        return False if db in settings.DATABASE_REPLICAS else None
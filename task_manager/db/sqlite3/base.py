@@ -0,0 +1,39 @@
+"""SQLite backend for production, with the transaction_mode and
+init_command options of the SQLite backend of Django 5.1.
+
+See task_manager/db/__init__.py for its settings.
+"""
+
+from typing import Any, Dict
+
+from django.db.backends.sqlite3 import base
+
+
+OPTIONS = ('init_command', 'transaction_mode')
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def get_connection_params(self) -> Dict[str, Any]:
+        params = super().get_connection_params()
+        for option in OPTIONS:
+            params.pop(option, None)
+        return params
+
+    def get_new_connection(self, conn_params: Dict[str, Any]) -> Any:
+        connection = super().get_new_connection(conn_params)
+        init_command = self.settings_dict['OPTIONS'].get('init_command', '')
+        for statement in filter(None, (part.strip() for part in init_command.split(';'))):
+            connection.execute(statement)
+        return connection
+
+    def _start_transaction_under_autocommit(self) -> None:
+        '''Starts atomic blocks with BEGIN IMMEDIATE, which takes the write
+        lock at once. A DEFERRED transaction that reads, then writes while
+        another connection writes cannot wait for the lock: SQLite fails it
+        with "database is locked" whatever the busy timeout.'''
+        mode = self.settings_dict['OPTIONS'].get('transaction_mode')
+        if mode:
+            self.cursor().execute('BEGIN {}'.format(mode))
+        else:
+            super()._start_transaction_under_autocommit()
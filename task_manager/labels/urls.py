@@ -1,10 +1,16 @@
+from django.conf import settings
 from django.urls import path, URLPattern
 from typing import List
 
-from .views import LabelsListView, LabelCreateView, LabelUpdateView, LabelDeleteView
+from .views import (
+    AsyncLabelsListView, LabelsListView, LabelCreateView, LabelUpdateView, LabelDeleteView
+)
+
+# With ASYNC_VIEWS under ASGI the read-only pages are served by async views.
+ListView = AsyncLabelsListView if settings.ASYNC_VIEWS else LabelsListView
 
 urlpatterns: List[URLPattern] = [
-    path('', LabelsListView.as_view(), name='labels'),
+    path('', ListView.as_view(), name='labels'),
     path('create/', LabelCreateView.as_view(), name='label_create'),
     path('<int:pk>/update/', LabelUpdateView.as_view(), name='label_update'),
     path('<int:pk>/delete/', LabelDeleteView.as_view(), name='label_delete')
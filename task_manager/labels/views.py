@@ -5,13 +5,17 @@ from django.contrib.messages.views import SuccessMessageMixin
 from typing import Dict, Tuple, Type
 
 from .models import Label
-from ..mixins import AuthorizationPermissionMixin, DeletionProtectionMixin
+from ..mixins import (
+    AsyncListMixin, AuthorizationPermissionMixin, ConditionalGetMixin, DeletionProtectionMixin,
+    MemoizedObjectMixin
+)
 
 
-class LabelsListView(AuthorizationPermissionMixin, ListView):
+class LabelsListView(AuthorizationPermissionMixin, ConditionalGetMixin, ListView):
     '''Show the list of labels.'''
     model: Type[Label] = Label
     context_object_name: str = 'labels'
+    shows_task_counts: bool = True
     extra_context: Dict = {
         'page_title': _('Labels'),
         'page_description': _('List of Task Manager Labels.'),
@@ -19,6 +23,10 @@ class LabelsListView(AuthorizationPermissionMixin, ListView):
     }
 
 
+class AsyncLabelsListView(AsyncListMixin, LabelsListView):
+    '''Show the list of labels from an async view.'''
+
+
 class LabelCreateView(AuthorizationPermissionMixin,
                       SuccessMessageMixin, CreateView):
     '''Create a label.'''
@@ -34,7 +42,7 @@ class LabelCreateView(AuthorizationPermissionMixin,
     success_message: str = _('Label created successfully')
 
 
-class LabelUpdateView(AuthorizationPermissionMixin,
+class LabelUpdateView(AuthorizationPermissionMixin, MemoizedObjectMixin,
                       SuccessMessageMixin, UpdateView):
     '''Change a label.'''
     model: Type[Label] = Label
@@ -49,7 +57,7 @@ class LabelUpdateView(AuthorizationPermissionMixin,
     success_message: str = _('Label changed successfully')
 
 
-class LabelDeleteView(AuthorizationPermissionMixin,
+class LabelDeleteView(AuthorizationPermissionMixin, MemoizedObjectMixin,
                       DeletionProtectionMixin, SuccessMessageMixin, DeleteView):
     '''Delete a label.'''
     model: Type[Label] = Label
@@ -0,0 +1,210 @@
+"""Measure every page of the project in process, for comparisons in CI."""
+
+import json
+import math
+import platform
+import statistics
+import time
+from contextlib import ExitStack
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import django
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import connection, connections
+from django.db.models import Model
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+from django.utils import timezone
+
+from task_manager.labels.models import Label
+from task_manager.statuses.models import Status
+from task_manager.tasks.models import Task
+from task_manager.users.models import User
+
+
+# URLs measured only when named: logging out ends the session of the
+# benchmark, /metrics is for scrapers (and missing unless INSTRUMENTATION
+# is on) and an export of a million seeded tasks takes minutes.
+EXCLUDED: Tuple[str, ...] = ('logout', 'metrics', 'tasks_export')
+
+# Values of the URL arguments other than primary keys.
+ARGUMENTS: Dict[str, Dict[str, str]] = {
+    'tasks_export': {'format': 'csv'},
+}
+
+
+def percentile(timings: List[float], fraction: float) -> float:
+    '''The nearest-rank percentile of sorted timings.'''
+    return timings[max(math.ceil(len(timings) * fraction) - 1, 0)]
+
+
+def get(client: Client, url: str) -> Any:
+    '''Requests the page and reads all of it: streamed pages, e.g. exports,
+    run their queries while read.'''
+    response = client.get(url)
+    if response.streaming:
+        b''.join(response.streaming_content)
+    return response
+
+
+def url_names(patterns: List[Any]) -> Iterator[Tuple[str, URLPattern]]:
+    '''Names and patterns of the named URLs, the admin site left out.'''
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            if pattern.namespace != 'admin':
+                yield from url_names(pattern.url_patterns)
+        elif pattern.name:
+            yield pattern.name, pattern
+
+
+class Command(BaseCommand):
+    help = (
+        'Requests the named URLs of urls.py (or the given ones) in this process '
+        'with the test client, logged in as --user, and reports per page the '
+        'status, requests per second, p50/p95/p99 latency and SQL queries. '
+        'No server or network is needed. --output writes the results as JSON; '
+        '--baseline compares them with an earlier file and fails when a page runs '
+        'more queries or is slower beyond --tolerance. Seed the database with '
+        'seed_benchmark first.'
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('names', nargs='*', help='URL names to measure, all by default.')
+        parser.add_argument('--exclude', action='append', default=[],
+                            help='URL name to leave out, repeatable.')
+        parser.add_argument('--user', help='Username to log in as, the first user by default.')
+        parser.add_argument('--requests', type=int, default=20, help='Measured requests per page.')
+        parser.add_argument('--warmup', type=int, default=2,
+                            help='Requests per page before measuring, which fill the caches.')
+        parser.add_argument('--output', help='File to write the results to as JSON.')
+        parser.add_argument('--baseline', help='JSON results to compare with.')
+        parser.add_argument('--tolerance', type=float, default=0.5,
+                            help='Allowed p95 slowdown against the baseline, 0.5 for 50%%.')
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        user = self.get_user(options['user'])
+        client = Client(HTTP_HOST='localhost')
+        client.force_login(user)
+
+        excluded = set(options['exclude']) | (set() if options['names'] else set(EXCLUDED))
+        results: Dict[str, Dict[str, Any]] = {}
+        for name, pattern in url_names(get_resolver().url_patterns):
+            if (options['names'] and name not in options['names']) or name in excluded:
+                continue
+            url = self.build_url(name, pattern, user)
+            if url is None:
+                self.stderr.write('Skipped {}: unknown URL arguments.'.format(name))
+                continue
+            results[name] = self.measure(client, url, options['warmup'], options['requests'])
+            self.write_result(name, results[name])
+
+        report = {'environment': self.environment(), 'results': results}
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(report, output, indent=2)
+        if options['baseline']:
+            self.compare(results, options['baseline'], options['tolerance'])
+
+    def get_user(self, username: Optional[str]) -> User:
+        users = User.objects.order_by('pk')
+        user = users.filter(username=username).first() if username else users.first()
+        if user is None:
+            raise CommandError('No user to log in as.')
+        return user
+
+    def build_url(self, name: str, pattern: URLPattern, user: User) -> Optional[str]:
+        kwargs: Dict[str, Any] = dict(ARGUMENTS.get(name, {}))
+        for argument in pattern.pattern.converters:
+            if argument in kwargs:
+                continue
+            if argument != 'pk':
+                return None
+            kwargs['pk'] = self.pick_pk(getattr(pattern.callback, 'view_class', None), user)
+        return reverse(name, kwargs=kwargs)
+
+    def pick_pk(self, view: Any, user: User) -> Optional[int]:
+        '''The object of a page: the user itself, a task of the user if there
+        is one, or the first object.'''
+        model: Optional[Model] = getattr(view, 'model', None)
+        if model is User:
+            return user.pk
+        if model is Task:
+            task = Task.objects.filter(author=user).order_by('pk').first()
+            if task is not None:
+                return task.pk
+        if model in (Task, Status, Label):
+            return model._default_manager.order_by('pk').values_list('pk', flat=True).first()
+        return None
+
+    def measure(self, client: Client, url: str, warmup: int, requests: int) -> Dict[str, Any]:
+        for _ in range(warmup):
+            get(client, url)
+        timings: List[float] = []
+        queries: List[int] = []
+        started = time.perf_counter()
+        for _ in range(requests):
+            with ExitStack() as stack:
+                captured = [
+                    stack.enter_context(CaptureQueriesContext(database))
+                    for database in connections.all()
+                ]
+                request_started = time.perf_counter()
+                response = get(client, url)
+                timings.append((time.perf_counter() - request_started) * 1000)
+            queries.append(sum(len(context) for context in captured))
+        seconds = time.perf_counter() - started
+        timings.sort()
+        return {
+            'url': url,
+            'status': response.status_code,
+            'requests': requests,
+            'rps': round(requests / seconds, 1),
+            'p50_ms': round(statistics.median(timings), 2),
+            'p95_ms': round(percentile(timings, 0.95), 2),
+            'p99_ms': round(percentile(timings, 0.99), 2),
+            'max_ms': round(timings[-1], 2),
+            # The usual count: the first requests may fill caches.
+            'queries': statistics.median_low(queries),
+        }
+
+    def write_result(self, name: str, result: Dict[str, Any]) -> None:
+        self.stdout.write(
+            '{:<18} {:>3}  {:8.1f} rps  p50 {:8.2f} ms  p95 {:8.2f} ms  p99 {:8.2f} ms  '
+            '{:>4} queries'.format(
+                name, result['status'], result['rps'], result['p50_ms'],
+                result['p95_ms'], result['p99_ms'], result['queries'],
+            )
+        )
+
+    def environment(self) -> Dict[str, Any]:
+        return {
+            'date': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'users': User.objects.count(),
+            'statuses': Status.objects.count(),
+            'labels': Label.objects.count(),
+            'tasks': Task.objects.count(),
+        }
+
+    def compare(self, results: Dict[str, Dict[str, Any]], path: str, tolerance: float) -> None:
+        with open(path) as baseline_file:
+            baseline = json.load(baseline_file)['results']
+        regressions = []
+        for name, result in results.items():
+            before = baseline.get(name)
+            if before is None:
+                continue
+            if result['queries'] > before['queries']:
+                regressions.append('{}: {} queries instead of {}'.format(
+                    name, result['queries'], before['queries']
+                ))
+            if result['p95_ms'] > before['p95_ms'] * (1 + tolerance):
+                regressions.append('{}: p95 {:.2f} ms instead of {:.2f} ms'.format(
+                    name, result['p95_ms'], before['p95_ms']
+                ))
+        if regressions:
+            raise CommandError('Slower than the baseline:\n  ' + '\n  '.join(regressions))
+        self.stdout.write('No regression against the baseline.')
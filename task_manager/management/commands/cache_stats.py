@@ -0,0 +1,42 @@
+"""Report the size, hit ratio and evictions of every configured cache."""
+
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+
+from task_manager.tasks.cache import task_detail_cache, task_table_cache
+
+
+class Command(BaseCommand):
+    help = (
+        'Reports size, hits, misses, hit ratio and evictions per cache alias. '
+        'Shared backends (SQLite) report the totals of all processes, '
+        'in-process backends only those of this command.'
+    )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        for alias, config in settings.CACHES.items():
+            backend = caches[alias]
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                '{} ({})'.format(alias, config['BACKEND'])
+            ))
+            if not hasattr(backend, 'stats'):
+                self.stdout.write('  statistics are not collected by this backend')
+                continue
+            stats = backend.stats()
+            self.stdout.write('  scope:      {}'.format('shared' if stats['shared'] else 'process'))
+            self.stdout.write('  size:       {}'.format(stats['size']))
+            self.stdout.write('  hits:       {}'.format(stats['hits']))
+            self.stdout.write('  misses:     {}'.format(stats['misses']))
+            self.stdout.write('  hit ratio:  {:.1%}'.format(stats['hit_ratio']))
+            self.stdout.write('  evictions:  {}'.format(stats['evictions']))
+
+        for name, cache in (('task table fragments', task_table_cache),
+                            ('task detail pages', task_detail_cache)):
+            stats = cache.stats()
+            self.stdout.write(self.style.MIGRATE_HEADING('{} (this process)'.format(name)))
+            self.stdout.write('  hits:       {}'.format(stats['hits']))
+            self.stdout.write('  misses:     {}'.format(stats['misses']))
+            self.stdout.write('  hit ratio:  {:.1%}'.format(stats['hit_ratio']))
@@ -0,0 +1,159 @@
+"""Load a running server with many concurrent keep-alive connections."""
+
+import asyncio
+import statistics
+import time
+from importlib import import_module
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from task_manager.users.models import User
+
+
+class Connection:
+    """One HTTP/1.1 connection, reopened when the server closes it."""
+
+    def __init__(self, host: str, port: int) -> None:
+        self.host, self.port = host, port
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+
+    async def request(self, message: bytes) -> int:
+        '''Sends a request and reads its whole response. Returns the status.'''
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        self.writer.write(message)
+        head = await self.reader.readuntil(b'\r\n\r\n')
+        status_line, *lines = head.decode('latin-1').split('\r\n')
+        headers = dict(
+            (name.strip().lower(), value.strip())
+            for name, _, value in (line.partition(':') for line in lines if line)
+        )
+        await self.read_body(headers)
+        if headers.get('connection', '').lower() == 'close':
+            self.close()
+        return int(status_line.split()[1])
+
+    async def read_body(self, headers: Dict[str, str]) -> None:
+        if 'content-length' in headers:
+            await self.reader.readexactly(int(headers['content-length']))
+        elif headers.get('transfer-encoding', '').lower() == 'chunked':
+            size = -1
+            while size:
+                size = int((await self.reader.readline()).split(b';')[0], 16)
+                await self.reader.readexactly(size + 2)
+        else:
+            await self.reader.read()
+            self.close()
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+class Command(BaseCommand):
+    help = (
+        'Sends GET requests to a running server over --concurrency keep-alive '
+        'connections and reports requests per second and latency percentiles. '
+        'Compare `make serve-wsgi` with `make serve-asgi` under the same load.'
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('url', nargs='?', default='http://127.0.0.1:8000/tasks/',
+                            help='Page to request.')
+        parser.add_argument('--concurrency', type=int, default=500,
+                            help='Number of connections open at once.')
+        parser.add_argument('--requests', type=int, default=5000,
+                            help='Total number of requests.')
+        parser.add_argument('--duration', type=float, default=0,
+                            help='Seconds to run for instead of a number of requests.')
+        parser.add_argument('--user', help='Username to send the requests as, '
+                                           'with a session created in the database.')
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        url = urlsplit(options['url'])
+        if url.scheme != 'http' or not url.hostname:
+            raise CommandError('Only http:// URLs are supported.')
+        lines = [
+            'GET {} HTTP/1.1'.format(url.path + ('?' + url.query if url.query else '') or '/'),
+            'Host: {}'.format(url.netloc),
+        ]
+        if options['user']:
+            lines.append('Cookie: {}={}'.format(
+                settings.SESSION_COOKIE_NAME, self.create_session(options['user'])
+            ))
+        message = '\r\n'.join(lines + ['', '']).encode('latin-1')
+
+        started = time.perf_counter()
+        timings, statuses, errors = asyncio.run(self.run(
+            url.hostname, url.port or 80, message, options,
+        ))
+        self.report(timings, statuses, errors, time.perf_counter() - started, options)
+
+    def create_session(self, username: str) -> str:
+        user = User.objects.filter(username=username).first()
+        if user is None:
+            raise CommandError('No user named "{}".'.format(username))
+        session = import_module(settings.SESSION_ENGINE).SessionStore()
+        session[SESSION_KEY] = user._meta.pk.value_to_string(user)
+        session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+        session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+        session.create()
+        return session.session_key
+
+    async def run(self, host: str, port: int, message: bytes,
+                  options: Dict[str, Any]) -> Tuple[List[float], Dict[int, int], int]:
+        self.timings: List[float] = []
+        self.statuses: Dict[int, int] = {}
+        self.errors = self.sent = 0
+        self.budget = options['requests']
+        self.deadline = (
+            time.perf_counter() + options['duration'] if options['duration'] else None
+        )
+        await asyncio.gather(*(
+            self.client(Connection(host, port), message)
+            for _ in range(options['concurrency'])
+        ))
+        return self.timings, self.statuses, self.errors
+
+    def more(self) -> bool:
+        if self.deadline is not None:
+            return time.perf_counter() < self.deadline
+        return self.sent < self.budget
+
+    async def client(self, connection: Connection, message: bytes) -> None:
+        while self.more():
+            self.sent += 1
+            started = time.perf_counter()
+            try:
+                status = await connection.request(message)
+            except (OSError, asyncio.IncompleteReadError, ValueError):
+                self.errors += 1
+                connection.close()
+                continue
+            self.timings.append((time.perf_counter() - started) * 1000)
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+        connection.close()
+
+    def report(self, timings: List[float], statuses: Dict[int, int], errors: int,
+               seconds: float, options: Dict[str, Any]) -> None:
+        self.stdout.write('{} connections, {} responses in {:.1f}s, {} errors'.format(
+            options['concurrency'], len(timings), seconds, errors
+        ))
+        self.stdout.write('statuses:   {}'.format(', '.join(
+            '{} x{}'.format(status, count) for status, count in sorted(statuses.items())
+        )))
+        if not timings:
+            return
+        timings.sort()
+        self.stdout.write('rps:        {:.1f}'.format(len(timings) / seconds))
+        self.stdout.write('p50:        {:.1f} ms'.format(statistics.median(timings)))
+        self.stdout.write('p99:        {:.1f} ms'.format(
+            timings[max(int(len(timings) * 0.99) - 1, 0)]
+        ))
+        self.stdout.write('max:        {:.1f} ms'.format(timings[-1]))
@@ -0,0 +1,140 @@
+"""Fill a database with synthetic users, statuses, labels and tasks."""
+
+import random
+import time
+from typing import Any, Callable, Dict, List, Type
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import transaction
+from django.db.models import Max, Model
+
+from task_manager.labels.models import Label
+from task_manager.statuses.models import Status
+from task_manager.tasks.cache import task_table_cache
+from task_manager.tasks.counters import CounterDeltas
+from task_manager.tasks.models import Task, TaskLabel
+from task_manager.tasks.stats import DayStatDeltas
+from task_manager.users.models import User
+
+
+WORDS = (
+    'api', 'backup', 'billing', 'cache', 'client', 'deploy', 'docs', 'email', 'export',
+    'fix', 'form', 'import', 'index', 'invoice', 'login', 'migrate', 'page', 'report',
+    'review', 'search', 'server', 'signup', 'test', 'update', 'upload', 'user',
+)
+FIRST_NAMES = ('Anna', 'Boris', 'Daria', 'Ivan', 'Maria', 'Oleg', 'Olga', 'Pavel', 'Vera')
+LAST_NAMES = ('Ivanov', 'Kuznetsov', 'Orlov', 'Petrov', 'Popov', 'Smirnov', 'Sokolov')
+
+# Password of every seeded user.
+PASSWORD = 'benchmark'
+
+
+class Command(BaseCommand):
+    help = (
+        'Inserts synthetic users, statuses, labels and tasks with label links by '
+        'bulk inserts, for benchmark_views and the other benchmarks. The task '
+        'counters and day statistics are kept in step. Data is generated from '
+        '--random-seed, so runs with the same options insert the same data. '
+        'Writes rows: use a scratch database.'
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--users', type=int, default=10000)
+        parser.add_argument('--statuses', type=int, default=100)
+        parser.add_argument('--labels', type=int, default=5000)
+        parser.add_argument('--tasks', type=int, default=1000000)
+        parser.add_argument('--labels-per-task', type=int, default=3,
+                            help='Most labels of a task; each task gets 0 up to this many.')
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help='Rows inserted per transaction.')
+        parser.add_argument('--random-seed', type=int, default=0)
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        self.generator = random.Random(options['random_seed'])
+        self.batch_size = options['batch_size']
+        started = time.perf_counter()
+
+        password = make_password(PASSWORD)
+        users = self.seed(User, options['users'], lambda number: User(
+            username='bench{}'.format(number), password=password,
+            first_name=self.generator.choice(FIRST_NAMES),
+            last_name=self.generator.choice(LAST_NAMES),
+        ))
+        statuses = self.seed(Status, options['statuses'], lambda number: Status(
+            name='Status {}'.format(number)
+        ))
+        labels = self.seed(Label, options['labels'], lambda number: Label(
+            name='Label {}'.format(number)
+        ))
+        users = users or list(User.objects.values_list('pk', flat=True))
+        statuses = statuses or list(Status.objects.values_list('pk', flat=True))
+        labels = labels or list(Label.objects.values_list('pk', flat=True))
+        if options['tasks'] and not (users and statuses):
+            raise CommandError('Tasks need at least one user and one status.')
+
+        links = 0
+        for offset in range(0, options['tasks'], self.batch_size):
+            size = min(self.batch_size, options['tasks'] - offset)
+            links += self.insert_tasks(size, users, statuses, labels, options['labels_per_task'])
+        if options['tasks']:
+            task_table_cache.bump()
+
+        seconds = time.perf_counter() - started
+        rows = options['users'] + options['statuses'] + options['labels'] + options['tasks'] + links
+        self.stdout.write('Seeded {} users, {} statuses, {} labels, {} tasks and {} task '
+                          'labels in {:.1f}s ({:.0f} rows/s)'.format(
+                              options['users'], options['statuses'], options['labels'],
+                              options['tasks'], links, seconds, rows / seconds,
+                          ))
+
+    def seed(self, model: Type[Model], count: int,
+             build: Callable[[int], Model]) -> List[int]:
+        '''Inserts `count` rows numbered after the highest primary key,
+        so their unique names do not collide with earlier runs.
+        Returns their primary keys.'''
+        start = (model._default_manager.aggregate(last=Max('pk'))['last'] or 0) + 1
+        pks: List[int] = []
+        for offset in range(0, count, self.batch_size):
+            numbers = range(start + offset, start + min(offset + self.batch_size, count))
+            with transaction.atomic():
+                rows = model._default_manager.bulk_create([build(number) for number in numbers])
+            pks.extend(row.pk for row in rows)
+        return pks
+
+    def insert_tasks(self, size: int, users: List[int], statuses: List[int],
+                     labels: List[int], labels_per_task: int) -> int:
+        '''Inserts a batch of tasks with their labels and counts them.
+        Returns the number of task labels.'''
+        generator = self.generator
+        tasks = [self.build_task(users, statuses) for _ in range(size)]
+        label_ids: Dict[int, List[int]] = {}
+        with transaction.atomic():
+            tasks = Task.objects.bulk_create(tasks)
+            counters, days = CounterDeltas(), DayStatDeltas()
+            for task in tasks:
+                label_ids[task.pk] = generator.sample(
+                    labels, generator.randint(0, min(labels_per_task, len(labels)))
+                )
+                counters.add_task(task.status_id, task.author_id, task.executor_id)
+                counters.add_labels(label_ids[task.pk])
+                days.add_task(task.date_created, task.date_modified)
+            TaskLabel.objects.bulk_create([
+                TaskLabel(task_id=task_id, label_id=label_id)
+                for task_id, task_labels in label_ids.items() for label_id in task_labels
+            ])
+            counters.apply()
+            days.apply()
+        return sum(len(task_labels) for task_labels in label_ids.values())
+
+    def build_task(self, users: List[int], statuses: List[int]) -> Task:
+        generator = self.generator
+        words = generator.choices(WORDS, k=generator.randint(2, 5))
+        return Task(
+            name=' '.join(words).capitalize()[:50],
+            description=' '.join(generator.choices(WORDS, k=generator.randint(10, 60))),
+            status_id=generator.choice(statuses),
+            author_id=generator.choice(users),
+            # Four tasks in five are assigned.
+            executor_id=generator.choice(users) if generator.random() < 0.8 else None,
+        )
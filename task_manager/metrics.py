@@ -0,0 +1,123 @@
+"""Per-view request metrics, exposed at /metrics in the Prometheus text format.
+
+`InstrumentationMiddleware` records every request with `observe`. The
+metrics are histograms by view name (the URL name, e.g. `tasks`):
+
+    http_request_duration_seconds     time until the view's response is ready
+    http_request_db_queries           SQL queries
+    http_request_db_duration_seconds  time spent in SQL queries
+    http_request_template_seconds     time spent rendering TemplateResponses
+
+with `http_responses_total` by view and status code, and gauges of the
+database connection pools (see task_manager/db).
+
+Metrics are kept per process: with several gunicorn workers a scrape
+sees the worker that answers it. Prometheus adds up the series of the
+workers it scrapes with sum(); restarts reset them like any counter.
+"""
+
+import threading
+from bisect import bisect_left
+from typing import Dict, Iterator, List, Tuple
+
+from task_manager.db import pool_stats
+
+
+DURATION_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10,
+)
+QUERY_BUCKETS: Tuple[float, ...] = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+HISTOGRAMS: Dict[str, Tuple[str, Tuple[float, ...]]] = {
+    'http_request_duration_seconds': ('Time until the response is ready.', DURATION_BUCKETS),
+    'http_request_db_queries': ('SQL queries per request.', QUERY_BUCKETS),
+    'http_request_db_duration_seconds': ('Time in SQL queries per request.', DURATION_BUCKETS),
+    'http_request_template_seconds': ('Time rendering templates per request.', DURATION_BUCKETS),
+}
+
+POOL_METRICS: Tuple[Tuple[str, str], ...] = (
+    ('size', 'gauge'), ('idle', 'gauge'), ('in_use', 'gauge'), ('max_size', 'gauge'),
+    ('checkouts', 'counter'), ('opened', 'counter'), ('closed', 'counter'),
+    ('waits', 'counter'), ('timeouts', 'counter'),
+)
+
+
+class Histogram:
+
+    def __init__(self, buckets: Tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.counts: List[int] = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def lines(self, name: str, labels: str) -> Iterator[str]:
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            cumulative += count
+            yield '{}_bucket{{{},le="{}"}} {}'.format(name, labels, format_bound(bound), cumulative)
+        yield '{}_sum{{{}}} {}'.format(name, labels, self.sum)
+        yield '{}_count{{{}}} {}'.format(name, labels, cumulative)
+
+
+class Registry:
+    """The metrics of this process."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.histograms: Dict[Tuple[str, str], Histogram] = {}
+        self.responses: Dict[Tuple[str, int], int] = {}
+
+    def observe(self, view: str, status: int, values: Dict[str, float]) -> None:
+        with self.lock:
+            for name, value in values.items():
+                key = (name, view)
+                if key not in self.histograms:
+                    self.histograms[key] = Histogram(HISTOGRAMS[name][1])
+                self.histograms[key].observe(value)
+            self.responses[view, status] = self.responses.get((view, status), 0) + 1
+
+    def render(self) -> str:
+        with self.lock:
+            lines = list(self.histogram_lines())
+            lines.append('# HELP http_responses_total Responses by view and status code.')
+            lines.append('# TYPE http_responses_total counter')
+            lines.extend(
+                'http_responses_total{{view="{}",status="{}"}} {}'.format(
+                    escape(view), status, count
+                ) for (view, status), count in sorted(self.responses.items())
+            )
+        lines.extend(pool_lines())
+        return '\n'.join(lines) + '\n'
+
+    def histogram_lines(self) -> Iterator[str]:
+        for name, (description, _) in HISTOGRAMS.items():
+            yield '# HELP {} {}'.format(name, description)
+            yield '# TYPE {} histogram'.format(name)
+            for (metric, view), histogram in sorted(self.histograms.items()):
+                if metric == name:
+                    yield from histogram.lines(name, 'view="{}"'.format(escape(view)))
+
+
+def pool_lines() -> Iterator[str]:
+    stats = sorted(pool_stats().items())
+    if not stats:
+        return
+    for name, kind in POOL_METRICS:
+        metric = 'db_pool_' + name + ('_total' if kind == 'counter' else '')
+        yield '# TYPE {} {}'.format(metric, kind)
+        for alias, values in stats:
+            yield '{}{{database="{}"}} {:g}'.format(metric, escape(alias), values[name])
+
+
+def format_bound(bound: float) -> str:
+    return '+Inf' if bound == float('inf') else repr(float(bound))
+
+
+def escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+registry = Registry()
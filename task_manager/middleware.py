@@ -0,0 +1,261 @@
+"""Middleware of the project."""
+
+import asyncio
+import logging
+import random
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from asgiref.sync import markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpRequest, HttpResponse
+from django.template.response import SimpleTemplateResponse
+from whitenoise import middleware as whitenoise
+
+from task_manager.db.routers import replica
+from task_manager.metrics import registry
+from task_manager.tasks.history import current_request
+
+
+logger = logging.getLogger(__name__)
+
+
+class WhiteNoiseMiddleware(whitenoise.WhiteNoiseMiddleware):
+    """WhiteNoise that also runs in an async middleware chain.
+
+    WhiteNoise middleware is synchronous only, so under ASGI Django would
+    run it, and everything after it, through a thread per request. Static
+    files are found in memory; only serving one opens a file in a thread.
+    """
+
+    async_capable: bool = True
+
+    def __init__(self, get_response: Callable[..., Any], *args: Any, **kwargs: Any) -> None:
+        super().__init__(get_response, *args, **kwargs)
+        if asyncio.iscoroutinefunction(get_response):
+            # Makes Django await the instance.
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> Any:
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        if self.autorefresh:
+            static_file = self.find_file(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve, thread_sensitive=False)(static_file, request)
+        return await self.get_response(request)
+
+
+class ReplicaMiddleware:
+    """Reads the data of views with `read_from_replica = True` from a replica
+    on GET and HEAD, except for the DATABASE_REPLICA_STICKY_SECONDS after the
+    browser sent another request. See task_manager/db/routers.py."""
+
+    sync_capable: bool = True
+    async_capable: bool = True
+    sticky_cookie: str = 'read_primary'
+
+    def __init__(self, get_response: Callable[..., Any]) -> None:
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> Any:
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        # The view sets the replica, which must not outlive the request.
+        token = replica.set(None)
+        try:
+            response = self.get_response(request)
+        finally:
+            replica.reset(token)
+        return self.stick_to_primary(request, response)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        token = replica.set(None)
+        try:
+            response = await self.get_response(request)
+        finally:
+            replica.reset(token)
+        return self.stick_to_primary(request, response)
+
+    def process_view(self, request: HttpRequest, view_func: Callable[..., Any],
+                     view_args: Tuple[Any, ...], view_kwargs: Dict[str, Any]) -> None:
+        view_class = getattr(view_func, 'view_class', view_func)
+        if (settings.DATABASE_REPLICAS and request.method in ('GET', 'HEAD')
+                and getattr(view_class, 'read_from_replica', False)
+                and self.sticky_cookie not in request.COOKIES):
+            replica.set(random.choice(settings.DATABASE_REPLICAS))
+
+    def stick_to_primary(self, request: HttpRequest, response: HttpResponse) -> HttpResponse:
+        if settings.DATABASE_REPLICAS and request.method not in ('GET', 'HEAD', 'OPTIONS'):
+            response.set_cookie(
+                self.sticky_cookie, '1', max_age=settings.DATABASE_REPLICA_STICKY_SECONDS,
+                httponly=True, samesite='Lax',
+            )
+        return response
+
+
+class HistoryMiddleware:
+    """Makes the user of the request the author of the task changes it
+    records, see task_manager/tasks/history.py. The user is loaded only
+    if a change is recorded."""
+
+    sync_capable: bool = True
+    async_capable: bool = True
+
+    def __init__(self, get_response: Callable[..., Any]) -> None:
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> Any:
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        token = current_request.set(request)
+        try:
+            return self.get_response(request)
+        finally:
+            current_request.reset(token)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        token = current_request.set(request)
+        try:
+            return await self.get_response(request)
+        finally:
+            current_request.reset(token)
+
+
+class RequestTimings:
+    """SQL queries and template rendering time of a request."""
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.queries: List[Tuple[str, float]] = []
+        self.template = 0.0
+
+    def duplicates(self, limit: int = 3) -> List[Tuple[str, int]]:
+        counts = Counter(sql for sql, _ in self.queries)
+        return [(sql, count) for sql, count in counts.most_common(limit) if count > 1]
+
+
+# The timings of the current request, if it is instrumented.
+request_timings: ContextVar[Optional[RequestTimings]] = ContextVar(
+    'request_timings', default=None
+)
+
+
+def time_query(execute: Callable[..., Any], sql: str, params: Any, many: bool,
+               context: Dict[str, Any]) -> Any:
+    timings = request_timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.queries.append((sql, time.perf_counter() - started))
+
+
+def install_query_timer(connection: Any, **kwargs: Any) -> None:
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
+
+
+class InstrumentationMiddleware:
+    """Times requests by view: total, SQL and template rendering time and
+    the number of queries, added to the `Server-Timing` header and to the
+    histograms of `task_manager.metrics`. Requests slower than
+    INSTRUMENTATION_SLOW_REQUEST_MS are logged with their most repeated
+    queries. Enabled by INSTRUMENTATION=True.
+
+    Queries are timed on every database connection, including those that
+    async views use in threads, while a request is being instrumented.
+    Templates are timed when rendered from a TemplateResponse."""
+
+    sync_capable: bool = True
+    async_capable: bool = True
+
+    def __init__(self, get_response: Callable[..., Any]) -> None:
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        connection_created.connect(install_query_timer, dispatch_uid='install_query_timer')
+
+    def __call__(self, request: HttpRequest) -> Any:
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        timings = self.start()
+        token = request_timings.set(timings)
+        try:
+            response = self.get_response(request)
+        finally:
+            request_timings.reset(token)
+        return self.finish(request, response, timings)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        timings = self.start()
+        token = request_timings.set(timings)
+        try:
+            response = await self.get_response(request)
+        finally:
+            request_timings.reset(token)
+        return self.finish(request, response, timings)
+
+    def start(self) -> RequestTimings:
+        for connection in connections.all():
+            install_query_timer(connection)
+        return RequestTimings()
+
+    def process_template_response(self, request: HttpRequest,
+                                  response: SimpleTemplateResponse) -> SimpleTemplateResponse:
+        # Rendering follows this hook and ends with the post-render callbacks.
+        timings = request_timings.get()
+        if timings is not None:
+            started = time.perf_counter()
+
+            def rendered(response: HttpResponse) -> None:
+                timings.template += time.perf_counter() - started
+
+            response.add_post_render_callback(rendered)
+        return response
+
+    def finish(self, request: HttpRequest, response: HttpResponse,
+               timings: RequestTimings) -> HttpResponse:
+        total = time.perf_counter() - timings.started
+        sql = sum(duration for _, duration in timings.queries)
+        match = request.resolver_match
+        view = match.view_name if match else '<unmatched>'
+        registry.observe(view, response.status_code, {
+            'http_request_duration_seconds': total,
+            'http_request_db_queries': len(timings.queries),
+            'http_request_db_duration_seconds': sql,
+            'http_request_template_seconds': timings.template,
+        })
+        response['Server-Timing'] = ', '.join((
+            'db;dur={:.1f};desc="{} queries"'.format(sql * 1000, len(timings.queries)),
+            'tpl;dur={:.1f}'.format(timings.template * 1000),
+            'total;dur={:.1f}'.format(total * 1000),
+        ))
+        if total * 1000 >= settings.INSTRUMENTATION_SLOW_REQUEST_MS:
+            self.log_slow_request(request, view, total, sql, timings)
+        return response
+
+    def log_slow_request(self, request: HttpRequest, view: str, total: float, sql: float,
+                         timings: RequestTimings) -> None:
+        logger.warning(
+            'Slow request: %s %s (%s) took %.0f ms, %d queries in %.0f ms, templates %.0f ms%s',
+            request.method, request.get_full_path(), view, total * 1000, len(timings.queries),
+            sql * 1000, timings.template * 1000, ''.join(
+                '\n  %d x %s' % (count, statement) for statement, count in timings.duplicates()
+            ),
+        )
@@ -2,10 +2,25 @@ from django.utils.translation import gettext_lazy as _
 from django.urls import reverse_lazy
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib import messages
+from django.conf import settings
 from django.shortcuts import redirect
-from django.http import HttpResponse, HttpRequest, HttpResponseRedirect
-from django.db.models import ProtectedError
-from typing import Any, Union, Callable
+from django.http import HttpResponse, HttpRequest, HttpResponseRedirect, Http404
+from django.db.models import PROTECT, ProtectedError, QuerySet
+from django.template.response import SimpleTemplateResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from django.utils.translation import get_language
+import asyncio
+from asgiref.sync import sync_to_async
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple, Union, Callable
+
+from .conditional import fingerprint, make_etag
+from .pagination import KeysetPaginator, KeysetPage, InvalidCursor
+from .tasks.cache import task_table_cache
+
+# The values a page depends on and the time it last changed, if known.
+Validators = Tuple[Tuple[Any, ...], Optional[datetime]]
 
 
 class AuthorizationPermissionMixin(LoginRequiredMixin):
@@ -17,6 +32,157 @@ class AuthorizationPermissionMixin(LoginRequiredMixin):
         return redirect(reverse_lazy('login'))
 
 
+class ConditionalGetMixin:
+    '''Answers conditional GET requests with 304 Not Modified
+    before the view queries its objects or renders its template.
+
+    The ETag hashes the values returned by `get_validators` with the page
+    URL, the current user and the language, so a page is never shared
+    between users or translations.
+
+    Task counters change without moving `date_modified`, so a list showing
+    them sets `shows_task_counts` to add the task board generation.
+
+    The pages only read, so they read from a replica if there is one
+    (see task_manager/db/routers.py).
+
+    A page that embeds a CSRF token, e.g. with a form, is sent without
+    validators: a 304 would keep the browser's copy, and its token, in
+    use after the token is rotated.'''
+
+    shows_task_counts: bool = False
+    read_from_replica: bool = True
+
+    def get_validators(self) -> Optional[Validators]:
+        '''Fingerprints the listed model, or reads `date_modified`
+        of the shown object. None disables the validation.'''
+        queryset = self.model._default_manager.all()
+        pk = self.kwargs.get(getattr(self, 'pk_url_kwarg', 'pk'))
+        if pk is None and self.shows_task_counts:
+            generation = task_table_cache.generation()
+            return None if generation is None else (fingerprint(queryset) + (generation,), None)
+        if pk is None:
+            # No Last-Modified: a deletion does not move the latest date.
+            return fingerprint(queryset), None
+        modified = queryset.filter(pk=pk).values_list('date_modified', flat=True).first()
+        return ((modified,), modified) if modified else None
+
+    def get_etag(self, validators: Tuple[Any, ...]) -> str:
+        user = self.request.user
+        return make_etag(
+            settings.RELEASE_VERSION, self.request.get_full_path(), get_language(),
+            user.pk, getattr(user, 'date_modified', None), *validators
+        )
+
+    def get(self, request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+        '''Renders the page only if the client's copy is out of date.'''
+        # Pending messages are shown by the next rendered page.
+        validators = None if messages.get_messages(request) else self.get_validators()
+        response = self.get_not_modified_response(validators)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        return self.add_validators(response)
+
+    def get_not_modified_response(self, validators: Optional[Validators]) -> Optional[HttpResponse]:
+        '''Returns 304 Not Modified (or 412) if the client's copy matches the
+        validators, which are kept for `add_validators`.'''
+        self.etag: Optional[str] = None
+        if validators is None:
+            return None
+        values, modified = validators
+        self.etag = self.get_etag(values)
+        self.last_modified = int(modified.timestamp()) if modified else None
+        return get_conditional_response(
+            self.request, etag=self.etag, last_modified=self.last_modified
+        )
+
+    def add_validators(self, response: HttpResponse) -> HttpResponse:
+        if self.etag is None or response.status_code not in (200, 304):
+            return response
+        response['ETag'] = self.etag
+        if self.last_modified is not None:
+            response['Last-Modified'] = http_date(self.last_modified)
+        # Browsers may keep the page but must revalidate it on every use.
+        patch_cache_control(response, private=True, no_cache=True)
+        if isinstance(response, SimpleTemplateResponse) and not response.is_rendered:
+            response.add_post_render_callback(self.remove_csrf_page_validators)
+        else:
+            self.remove_csrf_page_validators(response)
+        return response
+
+    def remove_csrf_page_validators(self, response: HttpResponse) -> None:
+        '''Removes the validators of a page whose rendering used the CSRF token,
+        which `get_token` flags (CSRF_COOKIE_USED before Django 4.1).'''
+        if self.request.META.get('CSRF_COOKIE_NEEDS_UPDATE'):
+            del response['ETag']
+            if 'Last-Modified' in response:
+                del response['Last-Modified']
+
+
+class AsyncGetMixin:
+    '''Serves GET from a coroutine, for ASGI deployments (see task_manager/asgi.py).
+    Goes before the synchronous view it makes asynchronous, which has to use
+    ConditionalGetMixin.
+
+    The current user and the session are loaded in a thread before the
+    view's permission checks read them. `aget_response` loads the page,
+    by default with the synchronous view's `get` in a thread; views override
+    it to read their objects with the async ORM. TemplateResponse renders
+    the template once the view has returned, also in a thread.'''
+
+    async def dispatch(self, request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+        await sync_to_async(lambda: request.user.is_authenticated)()
+        response = super().dispatch(request, *args, **kwargs)
+        if asyncio.iscoroutine(response):
+            response = await response
+        return response
+
+    async def get(self, request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+        '''Renders the page only if the client's copy is out of date.'''
+        validators = None
+        if not messages.get_messages(request):
+            validators = await sync_to_async(self.get_validators)()
+        response = self.get_not_modified_response(validators)
+        if response is None:
+            response = await self.aget_response(request, *args, **kwargs)
+        return self.add_validators(response)
+
+    async def aget_response(self, request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+        return await sync_to_async(super(ConditionalGetMixin, self).get)(request, *args, **kwargs)
+
+
+class AsyncListMixin(AsyncGetMixin):
+    '''Makes a ListView without pagination asynchronous.'''
+
+    async def aget_response(self, request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+        '''Reads the list with `async for`, which fills the result cache
+        of the queryset, so its context and template need no query.'''
+        self.object_list = self.get_queryset()
+        async for item in self.object_list:
+            pass
+        return self.render_to_response(self.get_context_data())
+
+
+class MemoizedObjectMixin:
+    '''Fetches the object of a single object view once per request.
+
+    Permission checks in `dispatch`, `DeletionProtectionMixin` and the
+    generic view itself all call `get_object`; the first call queries the
+    object and the others reuse it. A view instance serves one request,
+    so nothing outlives the request.'''
+
+    def get_object(self, queryset: Optional[QuerySet] = None) -> Any:
+        if queryset is not None:
+            return super().get_object(queryset)
+        if not hasattr(self, '_memoized_object'):
+            self._memoized_object = self.fetch_object()
+        return self._memoized_object
+
+    def fetch_object(self) -> Any:
+        '''Gets the object of the view, the first time it is asked for.'''
+        return super().get_object()
+
+
 class ModifyPermissionMixin(LoginRequiredMixin):
     '''Sets access rules for an unauthenticated user.'''
 
@@ -35,15 +201,92 @@ class ModifyPermissionMixin(LoginRequiredMixin):
 
 class DeletionProtectionMixin:
     '''Sets the rules for handling the case of the impossibility of deleting data
-    due to the protection of related data.'''
+    due to the protection of related data.
+
+    An object whose `in_use` property is false (see the task counters in
+    task_manager/tasks/counters.py) is deleted without checking its related
+    rows first. A positive counter may be out of date, so the object is
+    only refused if rows protecting it exist. ProtectedError is still
+    handled for objects without counters or with counters out of date.'''
 
     protected_data_message: str = 'Entity deletion forbidden message'
     protected_data_url: Union[str, Callable[..., Any]] = reverse_lazy('home')
 
     def post(self, request: HttpRequest, *args: str, **kwargs: Any) -> HttpResponse:
         '''Sends data to the server with protection check.'''
+        if self.is_protected(self.get_object()):
+            return self.handle_protected_data()
         try:
             return super().post(request, *args, **kwargs)
         except ProtectedError:
-            messages.error(self.request, self.protected_data_message)
-            return redirect(self.protected_data_url)
+            return self.handle_protected_data()
+
+    def is_protected(self, obj: Any) -> bool:
+        '''Whether the counters of the object, confirmed by an `exists()`
+        per protecting relation, show it in use.'''
+        if not getattr(obj, 'in_use', False):
+            return False
+        return any(
+            relation.related_model._base_manager.filter(**{relation.field.name: obj}).exists()
+            for relation in obj._meta.related_objects if relation.on_delete is PROTECT
+        )
+
+    def handle_protected_data(self) -> HttpResponseRedirect:
+        messages.error(self.request, self.protected_data_message)
+        return redirect(self.protected_data_url)
+
+
+class KeysetPaginationMixin:
+    '''Paginates a list view by cursor over a unique ordering instead of by page number.'''
+
+    paginate_by: int = 50
+    page_kwarg: str = 'cursor'
+    keyset_ordering: Tuple[str, ...] = ('date_modified', 'id')
+    keyset_page: Optional[KeysetPage] = None
+
+    def paginate_queryset(self, queryset: QuerySet,
+                          page_size: int) -> Tuple[KeysetPaginator, KeysetPage, QuerySet, bool]:
+        '''Returns the page addressed by the cursor in the query string,
+        or the one `aread_page` has read.'''
+        paginator = KeysetPaginator(queryset, page_size, self.get_keyset_ordering(queryset))
+        page = self.keyset_page
+        if page is None:
+            try:
+                page = paginator.page(self.request.GET.get(self.page_kwarg) or None)
+            except InvalidCursor as error:
+                raise Http404(_('Invalid cursor: %(message)s') % {'message': error})
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    async def aread_page(self, queryset: QuerySet) -> None:
+        '''Reads the page and its rows with the async ORM, for async views.'''
+        paginator = KeysetPaginator(
+            queryset, self.get_paginate_by(queryset), self.get_keyset_ordering(queryset)
+        )
+        try:
+            page = await paginator.apage(self.request.GET.get(self.page_kwarg) or None)
+        except InvalidCursor as error:
+            raise Http404(_('Invalid cursor: %(message)s') % {'message': error})
+        async for item in page.object_list:
+            pass
+        self.keyset_page = page
+
+    def get_keyset_ordering(self, queryset: QuerySet) -> Tuple[str, ...]:
+        '''Returns the unique ordering the queryset is paginated by.'''
+        return self.keyset_ordering
+
+    def get_page_query(self, cursor: Optional[str]) -> Optional[str]:
+        '''Builds the query string of a neighbour page keeping the other parameters.'''
+        if cursor is None:
+            return None
+        params = self.request.GET.copy()
+        params[self.page_kwarg] = cursor
+        return params.urlencode()
+
+    def get_context_data(self, **kwargs: Any) -> Dict[str, Any]:
+        '''Adds the query strings of the next and previous pages.'''
+        context = super().get_context_data(**kwargs)
+        page = context.get('page_obj')
+        if page is not None:
+            context['next_page_query'] = self.get_page_query(page.next_cursor)
+            context['previous_page_query'] = self.get_page_query(page.previous_cursor)
+        return context
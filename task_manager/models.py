@@ -0,0 +1,26 @@
+from django.db import models
+
+from typing import Any, Tuple
+
+
+class TaskCountersModel(models.Model):
+    '''A model with task counters, which only change in the database by
+    `UPDATE ... SET count = count + delta` (see task_manager/tasks/counters.py).
+
+    Saving an existing row writes every field but the counters: the values
+    read with the row may be out of date, and writing them back would undo
+    the increments made since.'''
+
+    counter_fields: Tuple[str, ...] = ()
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args: Any, **kwargs: Any) -> None:
+        if not self._state.adding and kwargs.get('update_fields') is None \
+                and not kwargs.get('force_insert') and not args:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.counter_fields
+            ]
+        super().save(*args, **kwargs)
@@ -0,0 +1,190 @@
+"""Keyset (cursor) pagination for querysets with a unique, stable ordering.
+
+Pages are addressed by the ordering key of their boundary rows instead of
+a row offset, so fetching a deep page costs as much as fetching the first.
+"""
+
+import base64
+import binascii
+import json
+from typing import Any, Iterator, List, Optional, Sequence, Tuple
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import connections
+from django.db.models import Q, QuerySet
+
+
+FORWARD = 'n'
+BACKWARD = 'p'
+
+
+class InvalidCursor(ValueError):
+    """The cursor cannot be decoded for the paginated queryset."""
+
+
+class KeysetPage:
+    """A page of objects together with the cursors of its neighbours."""
+
+    def __init__(self, object_list: QuerySet,
+                 next_cursor: Optional[str], previous_cursor: Optional[str]) -> None:
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.object_list)
+
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    def has_previous(self) -> bool:
+        return self.previous_cursor is not None
+
+    def has_other_pages(self) -> bool:
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """Split a queryset into pages by its ordering key.
+
+    The ordering must be unique (end with the primary key), otherwise rows
+    sharing a key may be skipped between pages.
+    """
+
+    def __init__(self, queryset: QuerySet, per_page: int,
+                 ordering: Sequence[str] = ('date_modified', 'id')) -> None:
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = tuple(ordering)
+        self.keys: List[Tuple[str, bool]] = [
+            (field.lstrip('-'), field.startswith('-')) for field in self.ordering
+        ]
+
+    def page(self, cursor: Optional[str] = None) -> KeysetPage:
+        """Return the page following (or preceding) the cursor position."""
+        queryset, keys, forward, moved = self._locate(cursor)
+        return self._make_page(queryset, list(keys), forward, moved)
+
+    async def apage(self, cursor: Optional[str] = None) -> KeysetPage:
+        """`page` reading the ordering keys with the async ORM."""
+        queryset, keys, forward, moved = self._locate(cursor)
+        return self._make_page(queryset, [key async for key in keys], forward, moved)
+
+    def _locate(self, cursor: Optional[str]) -> Tuple[QuerySet, QuerySet, bool, bool]:
+        """The rows beyond the cursor and the query of the ordering keys
+        of the page, plus one to detect a further page."""
+        direction, position = self.decode(cursor) if cursor else (FORWARD, None)
+        forward = direction == FORWARD
+
+        queryset = self.queryset.order_by(*self.ordering)
+        if position is not None:
+            queryset = queryset.filter(self._beyond(position, forward))
+
+        # Only the ordering keys of the page are fetched here,
+        # the rows themselves are loaded lazily by range.
+        key_ordering = self.ordering if forward else self._reversed_ordering()
+        fields = [field for field, _ in self.keys]
+        keys = queryset.order_by(*key_ordering).values_list(*fields)[:self.per_page + 1]
+        return queryset, keys, forward, position is not None
+
+    def _make_page(self, queryset: QuerySet, keys: List[Tuple[Any, ...]],
+                   forward: bool, moved: bool) -> KeysetPage:
+        has_more = len(keys) > self.per_page
+        keys = keys[:self.per_page]
+        if not forward:
+            keys.reverse()
+
+        if not keys:
+            return KeysetPage(queryset.none(), None, None)
+
+        object_list = queryset.filter(
+            self._beyond(keys[0], True, inclusive=True),
+            self._beyond(keys[-1], False, inclusive=True),
+        )
+        if forward:
+            next_cursor = self.encode(FORWARD, keys[-1]) if has_more else None
+            previous_cursor = self.encode(BACKWARD, keys[0]) if moved else None
+        else:
+            next_cursor = self.encode(FORWARD, keys[-1])
+            previous_cursor = self.encode(BACKWARD, keys[0]) if has_more else None
+        return KeysetPage(object_list, next_cursor, previous_cursor)
+
+    def rows(self) -> Iterator[Any]:
+        """Every row of the queryset in order, a page per query, each
+        starting after the ordering key of the last row of the previous one."""
+        queryset = self.queryset.order_by(*self.ordering)
+        position = None
+        while True:
+            rows = queryset if position is None else queryset.filter(self._beyond(position, True))
+            chunk = list(rows[:self.per_page])
+            yield from chunk
+            if len(chunk) < self.per_page:
+                return
+            position = [getattr(chunk[-1], field) for field, _ in self.keys]
+
+    def encode(self, direction: str, position: Sequence[Any]) -> str:
+        """Pack a direction and an ordering key into an opaque URL-safe token."""
+        values = [
+            value.isoformat() if hasattr(value, 'isoformat') else value
+            for value in position
+        ]
+        payload = json.dumps([direction, *values], separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode(self, cursor: str) -> Tuple[str, List[Any]]:
+        """Unpack a token made by `encode` back into a direction and a key."""
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            direction, *values = json.loads(base64.urlsafe_b64decode(padded))
+        except (binascii.Error, ValueError, TypeError):
+            raise InvalidCursor('malformed cursor')
+        if direction not in (FORWARD, BACKWARD) or len(values) != len(self.keys):
+            raise InvalidCursor('cursor does not match the ordering')
+        try:
+            position = [
+                self._to_python(field, value)
+                for (field, _), value in zip(self.keys, values)
+            ]
+        except ValidationError:
+            raise InvalidCursor('cursor does not match the ordering')
+        return direction, position
+
+    def _to_python(self, field_name: str, value: Any) -> Any:
+        try:
+            field = self.queryset.model._meta.get_field(field_name)
+        except FieldDoesNotExist:
+            # Annotations (e.g. a search rank) travel as plain JSON values.
+            return value
+        return field.to_python(value)
+
+    def _reversed_ordering(self) -> Tuple[str, ...]:
+        return tuple(
+            field if descending else '-' + field for field, descending in self.keys
+        )
+
+    def _beyond(self, position: Sequence[Any], forward: bool,
+                inclusive: bool = False) -> Q:
+        """Rows after (forward) or before the position in the ordering."""
+        condition = Q()
+        for index, (field, descending) in enumerate(self.keys):
+            lookup = 'gt' if descending != forward else 'lt'
+            if inclusive and index == len(self.keys) - 1:
+                lookup += 'e'
+            equal = {name: position[number]
+                     for number, (name, _) in enumerate(self.keys[:index])}
+            condition |= Q(**equal, **{'{}__{}'.format(field, lookup): position[index]})
+        return condition
+
+
+def iterate_by_keyset(queryset: QuerySet, ordering: Sequence[str],
+                      chunk_size: int) -> Iterator[Any]:
+    """Iterate over the queryset in a unique ordering, `chunk_size` rows at a time.
+
+    Without server-side cursors, e.g. behind PgBouncer (see task_manager/db),
+    `iterator()` on PostgreSQL would read the whole result at once; then each
+    chunk is a query of its own, read by `KeysetPaginator.rows`.
+    """
+    if not connections[queryset.db].settings_dict.get('DISABLE_SERVER_SIDE_CURSORS'):
+        yield from queryset.order_by(*ordering).iterator(chunk_size=chunk_size)
+        return
+    yield from KeysetPaginator(queryset, chunk_size, ordering).rows()
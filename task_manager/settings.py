@@ -11,12 +11,15 @@ https://docs.djangoproject.com/en/4.1/ref/settings/
 """
 
 import os
+import tempfile
 from pathlib import Path
 
 import rollbar
 import dj_database_url
 from dotenv import load_dotenv
 
+from task_manager import caching, db
+
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -65,17 +68,38 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'task_manager.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.locale.LocaleMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'task_manager.middleware.ReplicaMiddleware',
+    'task_manager.middleware.HistoryMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'rollbar.contrib.django.middleware.RollbarNotifierMiddleware'
 ]
 
+# Per-view timings, the Server-Timing header and /metrics, see task_manager/metrics.py.
+INSTRUMENTATION = os.getenv('INSTRUMENTATION', 'False') == 'True'
+INSTRUMENTATION_SLOW_REQUEST_MS = int(os.getenv('INSTRUMENTATION_SLOW_REQUEST_MS', 500))
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+if INSTRUMENTATION:
+    # After WhiteNoise, which serves static files before any other middleware.
+    MIDDLEWARE.insert(2, 'task_manager.middleware.InstrumentationMiddleware')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'task_manager': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
 ROOT_URLCONF = 'task_manager.urls'
 
 TEMPLATES = [
@@ -96,6 +120,9 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'task_manager.wsgi.application'
 
+# Route the read-only pages to their async views, for ASGI deployments (opt-in).
+ASYNC_VIEWS = os.getenv('ASYNC_VIEWS', 'False') == 'True'
+
 
 # Database
 # https://docs.djangoproject.com/en/4.1/ref/settings/#databases
@@ -107,13 +134,57 @@ DATABASES = {
     }
 }
 
-db_from_env = dj_database_url.config(conn_max_age=600)
+# Under ASGI every request runs its queries in a thread of its own, which
+# would leave a persistent connection behind per request.
+conn_max_age = 0 if ASYNC_VIEWS else 600
+db_from_env = dj_database_url.config(conn_max_age=conn_max_age)
 DATABASES['default'].update(db_from_env)
+# Connection pooling, PgBouncer compatibility and the SQLite production profile,
+# see task_manager/db/__init__.py.
+DATABASES['default'].update(db.config(DATABASES['default']))
+
+# Read replicas for the read-only pages, see task_manager/db/routers.py.
+DATABASES.update(db.replicas('DATABASE_REPLICA_URLS', conn_max_age))
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_REPLICA_STICKY_SECONDS = int(os.getenv('DATABASE_REPLICA_STICKY_SECONDS', 10))
+DATABASE_ROUTERS = ['task_manager.db.routers.ReplicaRouter']
 
 # Deployment:
 # https://developer.mozilla.org/en-US/docs/Learn/Server-side/Django/Deployment
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.1/topics/cache/
+# Backends are set by URLs, see task_manager/caching/__init__.py.
+
+CACHES = {
+    # Private to each process:
+    'default': caching.config(
+        'CACHE_URL', default='lru://?max_entries=10000&timeout=300'
+    ),
+    # Shared by the processes of a host, for data invalidated by signals:
+    'shared': caching.config(
+        'SHARED_CACHE_URL',
+        default='sqlite:///' + os.path.join(tempfile.gettempdir(), 'task_manager_cache.sqlite3'),
+    ),
+}
+
+# Rendered task tables, invalidated by task_manager.tasks.signals.
+TASK_TABLE_CACHE_ALIAS = 'shared'
+TASK_TABLE_CACHE_TIMEOUT = int(os.getenv('TASK_TABLE_CACHE_TIMEOUT', 300))
+
+# Tasks of the detail page, keyed by the dates of everything the page shows.
+TASK_DETAIL_CACHE_ALIAS = 'default'
+TASK_DETAIL_CACHE_TIMEOUT = int(os.getenv('TASK_DETAIL_CACHE_TIMEOUT', 300))
+
+# Days the task history is kept by the prune_task_history command.
+TASK_HISTORY_DAYS = int(os.getenv('TASK_HISTORY_DAYS', 365))
+
+# Part of the ETag of every HTML page, so that a deployment with changed
+# templates does not answer 304 for pages rendered by the previous one.
+RELEASE_VERSION = os.getenv('RELEASE_VERSION', '')
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
 
@@ -186,3 +257,4 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # Tests:
 FIXTURE_DIRS = ('task_manager/tests/fixtures/',)
+TEST_RUNNER = 'task_manager.tests.runner.TestRunner'
@@ -0,0 +1,18 @@
+# Generated by Django 4.1.3 on 2026-10-18 03:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('statuses', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='status',
+            name='task_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='tasks'),
+        ),
+    ]
@@ -1,8 +1,10 @@
 from django.db import models
 from django.utils.translation import gettext_lazy
 
+from task_manager.models import TaskCountersModel
 
-class Status(models.Model):
+
+class Status(TaskCountersModel):
     name = models.CharField(
         verbose_name=gettext_lazy('name'),
         max_length=40, unique=True, blank=False
@@ -15,6 +17,13 @@ class Status(models.Model):
         verbose_name=gettext_lazy('modified at'),
         auto_now=True
     )
+    # Maintained by task_manager.tasks.signals, see task_manager/tasks/counters.py.
+    task_count = models.IntegerField(
+        verbose_name=gettext_lazy('tasks'),
+        default=0, editable=False
+    )
+
+    counter_fields = ('task_count',)
 
     class Meta:
         verbose_name: str = gettext_lazy('status')
@@ -22,3 +31,7 @@ class Status(models.Model):
 
     def __str__(self) -> str:
         return self.name
+
+    @property
+    def in_use(self) -> bool:
+        return self.task_count > 0
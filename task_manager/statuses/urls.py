@@ -1,10 +1,16 @@
+from django.conf import settings
 from django.urls import path, URLPattern
 from typing import List
 
-from .views import StatusesListView, StatusCreateView, StatusUpdateView, StatusDeleteView
+from .views import (
+    AsyncStatusesListView, StatusesListView, StatusCreateView, StatusUpdateView, StatusDeleteView
+)
+
+# With ASYNC_VIEWS under ASGI the read-only pages are served by async views.
+ListView = AsyncStatusesListView if settings.ASYNC_VIEWS else StatusesListView
 
 urlpatterns: List[URLPattern] = [
-    path('', StatusesListView.as_view(), name='statuses'),
+    path('', ListView.as_view(), name='statuses'),
     path('create/', StatusCreateView.as_view(), name='status_create'),
     path('<int:pk>/update/', StatusUpdateView.as_view(), name='status_update'),
     path('<int:pk>/delete/', StatusDeleteView.as_view(), name='status_delete'),
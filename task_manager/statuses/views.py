@@ -5,13 +5,17 @@ from django.contrib.messages.views import SuccessMessageMixin
 from typing import Dict, Tuple, Type
 
 from .models import Status
-from ..mixins import AuthorizationPermissionMixin, DeletionProtectionMixin
+from ..mixins import (
+    AsyncListMixin, AuthorizationPermissionMixin, ConditionalGetMixin, DeletionProtectionMixin,
+    MemoizedObjectMixin
+)
 
 
-class StatusesListView(AuthorizationPermissionMixin, ListView):
+class StatusesListView(AuthorizationPermissionMixin, ConditionalGetMixin, ListView):
     '''Show the list of statuses.'''
     model: Type[Status] = Status
     context_object_name: str = 'statuses'
+    shows_task_counts: bool = True
     extra_context: Dict = {
         'page_title': _('Statuses'),
         'page_description': _('List of Task Manager Statuses.'),
@@ -19,6 +23,10 @@ class StatusesListView(AuthorizationPermissionMixin, ListView):
     }
 
 
+class AsyncStatusesListView(AsyncListMixin, StatusesListView):
+    '''Show the list of statuses from an async view.'''
+
+
 class StatusCreateView(AuthorizationPermissionMixin,
                        SuccessMessageMixin, CreateView):
     '''Create a status.'''
@@ -34,7 +42,7 @@ class StatusCreateView(AuthorizationPermissionMixin,
     success_message: str = _('Status created successfully')
 
 
-class StatusUpdateView(AuthorizationPermissionMixin,
+class StatusUpdateView(AuthorizationPermissionMixin, MemoizedObjectMixin,
                        SuccessMessageMixin, UpdateView):
     '''Change a status.'''
     model: Type[Status] = Status
@@ -49,7 +57,7 @@ class StatusUpdateView(AuthorizationPermissionMixin,
     success_message: str = _('Status changed successfully')
 
 
-class StatusDeleteView(AuthorizationPermissionMixin,
+class StatusDeleteView(AuthorizationPermissionMixin, MemoizedObjectMixin,
                        DeletionProtectionMixin, SuccessMessageMixin, DeleteView):
     '''Delete a status.'''
     model: Type[Status] = Status
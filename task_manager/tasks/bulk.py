@@ -0,0 +1,174 @@
+"""Bulk changes of many tasks: status, executor and labels.
+
+`bulk_change` applies one change to a selection of tasks with set-based
+statements rather than a save per task: an UPDATE of the tasks, a
+`bulk_create` of the added label links and a DELETE of the removed ones.
+The selection is read once, as primary keys, so a change that takes tasks
+out of a filter (e.g. a status filter) does not change what is updated.
+Tasks are then processed `chunk_size` at a time, which keeps every
+statement within the parameter limits of the databases.
+
+These statements send no signals, so the task counters, day statistics
+and history are updated here in the same transaction (see counters.py,
+stats.py and history.py), and the task table cache is invalidated once
+the transaction is over. The tasks and label links of a chunk are locked
+when read, so a save of one of them cannot change the values the counter
+deltas are computed from before the chunk is written.
+Like a save, a change moves `date_modified` of the tasks it changes, and
+only of those: tasks already in the requested state are left alone.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from django.db import router, transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from .cache import task_table_cache
+from .counters import CounterDeltas
+from .history import Diff, label_changes, record_tasks
+from .models import Task, TaskLabel
+from .stats import DayStatDeltas
+
+
+# The executor argument when the executor is not changed, as None unassigns.
+UNCHANGED: Any = object()
+
+# (id, status_id, author_id, executor_id, date_modified) of a task.
+Row = Tuple[int, int, int, Optional[int], Any]
+
+
+class BulkResult:
+    """Tasks found and changed, and label links added and removed by a bulk change."""
+
+    def __init__(self) -> None:
+        self.selected = 0
+        self.changed = 0
+        self.labels_added = 0
+        self.labels_removed = 0
+
+
+class BulkChange:
+    """One change applied to chunks of selected tasks."""
+
+    def __init__(self, status_id: Optional[int] = None, executor_id: Any = UNCHANGED,
+                 add_labels: Iterable[int] = (), remove_labels: Iterable[int] = ()) -> None:
+        self.fields: Dict[str, Any] = {}
+        if status_id is not None:
+            self.fields['status_id'] = status_id
+        if executor_id is not UNCHANGED:
+            self.fields['executor_id'] = executor_id
+        self.add_labels = set(add_labels)
+        self.remove_labels = set(remove_labels) - self.add_labels
+        self.now = timezone.now()
+        self.result = BulkResult()
+
+    def apply(self, task_ids: List[int], using: Optional[str]) -> None:
+        """Change the tasks of one chunk, their counters, day statistics and history."""
+        rows: List[Row] = list(
+            Task.objects.using(using).select_for_update().filter(pk__in=task_ids).values_list(
+                'id', 'status_id', 'author_id', 'executor_id', 'date_modified'
+            )
+        )
+        self.result.selected += len(rows)
+        counters = CounterDeltas()
+        changes: Dict[int, Diff] = {}
+        for row in rows:
+            diff = self.field_changes(row)
+            if diff:
+                self.count_fields(row, counters)
+                changes[row[0]] = diff
+        for task_id, diff in self.relabel([row[0] for row in rows], counters, using).items():
+            changes.setdefault(task_id, {}).update(diff)
+        if not changes:
+            return
+
+        Task.objects.using(using).filter(pk__in=sorted(changes)).update(
+            date_modified=self.now, **self.fields
+        )
+        counters.apply(using)
+        self.move_days(rows, changes).apply(using)
+        record_tasks(changes, using)
+        self.result.changed += len(changes)
+
+    def move_days(self, rows: List[Row], changed: Dict[int, Diff]) -> DayStatDeltas:
+        """Move the changed tasks from the days of their modification to today."""
+        days = DayStatDeltas()
+        for task_id, _, _, _, modified in rows:
+            if task_id in changed:
+                days.add('modified', timezone.localdate(modified), -1)
+        days.add('modified', timezone.localdate(self.now), len(changed))
+        return days
+
+    def field_changes(self, row: Row) -> Diff:
+        """The status and executor the change gives the task, if they differ."""
+        _, status_id, _, executor_id, _ = row
+        return {
+            name: [old, self.fields[field]]
+            for name, field, old in (('status', 'status_id', status_id),
+                                     ('executor', 'executor_id', executor_id))
+            if field in self.fields and self.fields[field] != old
+        }
+
+    def count_fields(self, row: Row, counters: CounterDeltas) -> None:
+        """Move a task between the counters of its old and new status and executor."""
+        _, status_id, author_id, executor_id, _ = row
+        counters.add_task(status_id, author_id, executor_id, sign=-1)
+        counters.add_task(
+            self.fields.get('status_id', status_id), author_id,
+            self.fields.get('executor_id', executor_id),
+        )
+
+    def relabel(self, task_ids: List[int], counters: CounterDeltas,
+                using: Optional[str]) -> Dict[int, Diff]:
+        """Add and remove the label links of a chunk.
+        Returns the label changes of the relabelled tasks."""
+        if not (self.add_labels or self.remove_labels):
+            return {}
+        links = TaskLabel.objects.using(using).filter(task_id__in=task_ids)
+        existing = set(links.select_for_update().filter(
+            label_id__in=self.add_labels | self.remove_labels
+        ).values_list('task_id', 'label_id'))
+        added = [
+            (task_id, label_id) for task_id in task_ids for label_id in sorted(self.add_labels)
+            if (task_id, label_id) not in existing
+        ]
+        removed = [link for link in existing if link[1] in self.remove_labels]
+        if added:
+            TaskLabel.objects.using(using).bulk_create([
+                TaskLabel(task_id=task_id, label_id=label_id) for task_id, label_id in added
+            ])
+        if removed:
+            links.filter(label_id__in=self.remove_labels).delete()
+        counters.add_labels(label_id for _, label_id in added)
+        counters.add_labels((label_id for _, label_id in removed), sign=-1)
+        self.result.labels_added += len(added)
+        self.result.labels_removed += len(removed)
+        labels: Dict[int, Tuple[List[int], List[int]]] = {}
+        for task_id, label_id in added:
+            labels.setdefault(task_id, ([], []))[0].append(label_id)
+        for task_id, label_id in removed:
+            labels.setdefault(task_id, ([], []))[1].append(label_id)
+        return {task_id: label_changes(*ids) for task_id, ids in labels.items()}
+
+
+def bulk_change(tasks: Union[QuerySet, Iterable[int]], status_id: Optional[int] = None,
+                executor_id: Any = UNCHANGED, add_labels: Iterable[int] = (),
+                remove_labels: Iterable[int] = (), chunk_size: int = 5000) -> BulkResult:
+    """Change the status, the executor (None to unassign) or the labels of
+    the tasks of a queryset or of a list of ids, in one transaction."""
+    change = BulkChange(status_id, executor_id, add_labels, remove_labels)
+    # The selection is read from the primary database, not from a replica.
+    using = router.db_for_write(Task)
+    with transaction.atomic(using=using):
+        if isinstance(tasks, QuerySet):
+            task_ids = list(
+                tasks.using(using).order_by('pk').values_list('pk', flat=True).distinct()
+            )
+        else:
+            task_ids = sorted(set(tasks))
+        for start in range(0, len(task_ids), chunk_size):
+            change.apply(task_ids[start:start + chunk_size], using)
+    if change.result.changed:
+        task_table_cache.bump()
+    return change.result
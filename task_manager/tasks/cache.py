@@ -0,0 +1,152 @@
+"""Caches of the task pages: the rendered task table and the task of the detail page."""
+
+import hashlib
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import BaseCache, caches
+from django.http import HttpRequest
+from django.utils.safestring import SafeString, mark_safe
+from django.utils.translation import get_language
+
+
+class CacheStatistics:
+    """Hit and miss counters of the lookups of this process."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def stats(self) -> Dict[str, float]:
+        """Hit and miss counters of this process."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+            }
+
+
+class Generation:
+    """A counter in the cache shared by the workers. Keys embedding it
+    are never read again once it is bumped, and simply expire."""
+
+    def __init__(self, key: str) -> None:
+        self.key = key
+
+    @property
+    def cache(self) -> BaseCache:
+        return caches[settings.TASK_TABLE_CACHE_ALIAS]
+
+    def get(self) -> Optional[int]:
+        generation = self.cache.get(self.key)
+        if generation is None:
+            # Start from the clock so a lost counter never revisits old keys.
+            self.cache.add(self.key, time.time_ns(), timeout=None)
+            generation = self.cache.get(self.key)
+        return generation
+
+    def bump(self) -> None:
+        try:
+            self.cache.incr(self.key)
+        except ValueError:
+            self.cache.set(self.key, time.time_ns(), timeout=None)
+
+
+class TaskTableCache(CacheStatistics):
+    """Cache the rendered task table per user, language and filter parameters.
+
+    Every key embeds the board generation, a counter bumped by signals on any
+    change of the rows the table shows, so stale fragments are never read and
+    simply expire.
+    """
+
+    board: Generation = Generation('tasks:board:generation')
+
+    @property
+    def cache(self) -> BaseCache:
+        return caches[settings.TASK_TABLE_CACHE_ALIAS]
+
+    def generation(self) -> Optional[int]:
+        """The current board generation."""
+        return self.board.get()
+
+    def bump(self) -> None:
+        """Invalidate every cached table."""
+        self.board.bump()
+
+    def make_key(self, request: HttpRequest) -> str:
+        params = sorted(
+            (name, value) for name, values in request.GET.lists() for value in values
+        )
+        digest = hashlib.sha1(repr(params).encode()).hexdigest()
+        return 'tasks:table:{}:{}:{}:{}'.format(
+            self.generation(), request.user.pk, get_language(), digest
+        )
+
+    def get(self, key: str) -> Optional[SafeString]:
+        html = self.cache.get(key)
+        self.count(html is not None)
+        return None if html is None else mark_safe(html)
+
+    def set(self, key: str, html: str) -> None:
+        self.cache.set(key, str(html), timeout=settings.TASK_TABLE_CACHE_TIMEOUT)
+
+    async def aget(self, key: str) -> Optional[SafeString]:
+        html = await self.cache.aget(key)
+        self.count(html is not None)
+        return None if html is None else mark_safe(html)
+
+
+class TaskDetailCache(CacheStatistics):
+    """Cache the task of the detail page with its status, users and labels
+    and the first page of its history.
+
+    A key embeds the validators of the page, which the view reads anyway
+    for its ETag: the modification dates of the task and of its relations,
+    the latest history entry, and the names generation, bumped by signals
+    when a status, user or label the history may name changes. A change of
+    anything the page shows makes a new key, so stale tasks are never read
+    and simply expire.
+    """
+
+    names: Generation = Generation('tasks:names:generation')
+
+    @property
+    def cache(self) -> BaseCache:
+        return caches[settings.TASK_DETAIL_CACHE_ALIAS]
+
+    def make_key(self, pk: int, validators: Tuple[Any, ...]) -> str:
+        digest = hashlib.sha1(repr(validators).encode()).hexdigest()
+        return 'tasks:detail:{}:{}'.format(pk, digest)
+
+    def get(self, key: str) -> Any:
+        task = self.cache.get(key)
+        self.count(task is not None)
+        return task
+
+    def set(self, key: str, task: Any) -> None:
+        self.cache.set(key, task, timeout=settings.TASK_DETAIL_CACHE_TIMEOUT)
+
+    async def aget(self, key: str) -> Any:
+        task = await self.cache.aget(key)
+        self.count(task is not None)
+        return task
+
+    async def aset(self, key: str, task: Any) -> None:
+        await self.cache.aset(key, task, timeout=settings.TASK_DETAIL_CACHE_TIMEOUT)
+
+
+task_table_cache = TaskTableCache()
+task_detail_cache = TaskDetailCache()
@@ -0,0 +1,62 @@
+"""Versioned in-process cache of filter choices."""
+
+import threading
+import time
+from typing import Any, Dict, List, Tuple, Type
+
+from django.db.models import Model, QuerySet
+
+
+Choices = List[Tuple[Any, str]]
+
+
+class ChoicesCache:
+    """Keep `(pk, label)` choices of a model in process memory.
+
+    Choices are kept per queryset and label field, so fields listing other
+    rows or labels of the same model do not share them. Saving or deleting
+    a row of the model bumps its version, which drops every choice list of
+    the model cached by this process. Processes that did not see the change
+    reload their choices at the latest after `timeout` seconds.
+    """
+
+    def __init__(self, timeout: float = 60) -> None:
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._versions: Dict[str, int] = {}
+        self._entries: Dict[Tuple[str, str, str], Tuple[int, float, Choices]] = {}
+
+    def get(self, queryset: QuerySet, label_field: str) -> Choices:
+        """Return the choices of the queryset, loading them if the cached ones are stale."""
+        if queryset.query.is_empty():
+            return []
+        label = queryset.model._meta.label
+        key = (label, str(queryset.query), label_field)
+        version = self._versions.get(label, 0)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == version and entry[1] > time.monotonic():
+            return entry[2]
+
+        choices = list(queryset.values_list('pk', label_field))
+        with self._lock:
+            # A save during the load makes these choices stale already.
+            if self._versions.get(label, 0) == version:
+                self._entries[key] = (version, time.monotonic() + self.timeout, choices)
+        return choices
+
+    def clear(self) -> None:
+        """Drop the cached choices of every model."""
+        with self._lock:
+            self._versions.clear()
+            self._entries.clear()
+
+    def invalidate(self, model: Type[Model]) -> None:
+        """Drop the cached choices of the model."""
+        label = model._meta.label
+        with self._lock:
+            self._versions[label] = self._versions.get(label, 0) + 1
+            for key in [key for key in self._entries if key[0] == label]:
+                del self._entries[key]
+
+
+choices_cache = ChoicesCache()
@@ -0,0 +1,79 @@
+"""Denormalized task counters of statuses, labels and users.
+
+`Status.task_count`, `Label.task_count`, `User.authored_task_count` and
+`User.assigned_task_count` are kept in step with the tasks by the
+receivers in `task_manager.tasks.signals`, which run in the transaction
+of the write they count: `Task.save`, the deletion collector and the
+many-to-many managers all wrap their signals in one. Every change is an
+`UPDATE ... SET count = count + delta`, so concurrent writers never lose
+each other's increments.
+
+Paths sending no signals (`bulk_create`, `QuerySet.update`, raw SQL)
+have to apply their own `CounterDeltas`. `rebuild_counters` recounts
+everything from the tasks, see the `rebuild_task_counters` command.
+"""
+
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple, Type
+
+from django.db import transaction
+from django.db.models import Count, F, Model, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from task_manager.labels.models import Label
+from task_manager.statuses.models import Status
+from task_manager.users.models import User
+
+from .models import Task, TaskLabel
+
+
+# (counted model, counter field, row model, foreign key of the row model)
+COUNTERS: Tuple[Tuple[Type[Model], str, Type[Model], str], ...] = (
+    (Status, 'task_count', Task, 'status'),
+    (Label, 'task_count', TaskLabel, 'label'),
+    (User, 'authored_task_count', Task, 'author'),
+    (User, 'assigned_task_count', Task, 'executor'),
+)
+
+
+class CounterDeltas:
+    """Changes of the counters, accumulated then written with one
+    UPDATE per counter and distinct delta."""
+
+    def __init__(self) -> None:
+        self.deltas: Dict[Tuple[Type[Model], str], Counter] = defaultdict(Counter)
+
+    def add_task(self, status_id: int, author_id: int, executor_id: Optional[int],
+                 sign: int = 1) -> None:
+        """Count a task in (or, with `sign=-1`, out of) its status and users."""
+        self.deltas[Status, 'task_count'][status_id] += sign
+        self.deltas[User, 'authored_task_count'][author_id] += sign
+        if executor_id is not None:
+            self.deltas[User, 'assigned_task_count'][executor_id] += sign
+
+    def add_labels(self, label_ids: Iterable[int], sign: int = 1) -> None:
+        """Count a task in (or out of) each of the labels."""
+        for label_id in label_ids:
+            self.deltas[Label, 'task_count'][label_id] += sign
+
+    def apply(self, using: Optional[str] = None) -> None:
+        for (model, field), counter in self.deltas.items():
+            by_delta: Dict[int, List[int]] = defaultdict(list)
+            for pk, delta in counter.items():
+                if delta:
+                    by_delta[delta].append(pk)
+            for delta, pks in by_delta.items():
+                model._default_manager.using(using).filter(pk__in=pks).update(
+                    **{field: F(field) + delta}
+                )
+        self.deltas.clear()
+
+
+@transaction.atomic
+def rebuild_counters() -> None:
+    """Recount every counter from the tasks, one UPDATE per counter."""
+    for model, field, rows, key in COUNTERS:
+        count = rows._default_manager.filter(
+            **{key: OuterRef('pk')}
+        ).order_by().values(key).annotate(count=Count('pk')).values('count')
+        model._default_manager.update(**{field: Coalesce(Subquery(count), Value(0))})
@@ -3,16 +3,69 @@
 from django import forms
 from django.utils.translation import gettext_lazy
 
-from django_filters import FilterSet, BooleanFilter, ChoiceFilter
+from django_filters import FilterSet, BooleanFilter, CharFilter, ModelChoiceFilter
+from django_filters.fields import ModelChoiceField, ModelChoiceIterator, ModelMultipleChoiceField
 
 from task_manager.labels.models import Label
+from task_manager.statuses.models import Status
+from task_manager.tasks.choices import choices_cache
 from task_manager.tasks.models import Task
+from task_manager.tasks.search import search_tasks
+
+
+class CachedChoiceIterator(ModelChoiceIterator):
+    """Yield the field choices from the choices cache instead of the queryset."""
+
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ('', self.field.empty_label)
+        if self.field.null_label is not None:
+            yield (self.field.null_value, self.field.null_label)
+        yield from choices_cache.get(self.queryset, self.field.label_field)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __bool__(self):
+        return self.field.empty_label is not None or bool(
+            choices_cache.get(self.queryset, self.field.label_field)
+        )
+
+
+class CachedChoicesMixin:
+    """Take the choices of a model choice field from the choices cache,
+    labelled by `label_field`."""
+    iterator = CachedChoiceIterator
+
+    def __init__(self, *args, label_field='name', **kwargs):
+        self.label_field = label_field
+        super().__init__(*args, **kwargs)
+
+
+class CachedModelChoiceField(CachedChoicesMixin, ModelChoiceField):
+    """Render cached choices, validate the submitted one by primary key."""
+
+
+class CachedModelMultipleChoiceField(CachedChoicesMixin, ModelMultipleChoiceField):
+    """Render cached choices, validate the submitted ones by primary key."""
+
+
+class CachedModelChoiceFilter(ModelChoiceFilter):
+    field_class = CachedModelChoiceField
 
 
 class TasksFilter(FilterSet):
     """Define filers for tasks list."""
-    labels_query = Label.objects.values_list('id', 'name')
-    labels = ChoiceFilter(label=gettext_lazy('Label'), choices=labels_query)
+    q = CharFilter(
+        label=gettext_lazy('Search'),
+        method='search',
+    )
+    status = CachedModelChoiceFilter(
+        label=gettext_lazy('Status'), queryset=Status.objects.all()
+    )
+    labels = CachedModelChoiceFilter(
+        label=gettext_lazy('Label'), queryset=Label.objects.all()
+    )
     self_tasks = BooleanFilter(
         label=gettext_lazy('Current user tasks'),
         widget=forms.CheckboxInput(),
@@ -23,6 +76,10 @@ class TasksFilter(FilterSet):
         model = Task
         fields = ['status', 'executor']
 
+    def search(self, queryset, name, value):
+        """Filter tasks by words of their name and description, ranked."""
+        return search_tasks(queryset, value)
+
     def get_self_tasks(self, queryset, name, value):
         """Filter current user tasks."""
         if value:
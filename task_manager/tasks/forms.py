@@ -0,0 +1,79 @@
+from django.utils.translation import gettext_lazy as _
+from django import forms
+from django.db import router, transaction
+from django.db.models import Value
+from django.db.models.functions import Concat
+
+from typing import Any, Dict, List
+
+from task_manager.labels.models import Label
+from task_manager.statuses.models import Status
+from task_manager.users.models import User
+
+from .filters import CachedModelChoiceField, CachedModelMultipleChoiceField
+from .history import collect
+from .labelling import set_labels
+from .models import Task
+
+
+class TaskForm(forms.ModelForm):
+    '''A task with its labels, which are saved by difference (see labelling.py).'''
+
+    class Meta:
+        model = Task
+        fields = ('name', 'status', 'description', 'executor', 'labels')
+
+    def save(self, commit: bool = True) -> Task:
+        '''Saves the task and its labels in one transaction, as one entry
+        of its history.'''
+        if not commit:
+            return super().save(commit)
+        using = router.db_for_write(Task, instance=self.instance)
+        with transaction.atomic(using=using), collect(self.instance, using):
+            return super().save(commit)
+
+    def _save_m2m(self) -> None:
+        '''Replaces the `set()` of the labels, the only many-to-many field.
+        The task was saved just before, which moved its `date_modified`.'''
+        set_labels(self.instance, self.cleaned_data['labels'], touch=False)
+
+
+class TasksBulkForm(forms.Form):
+    '''A change of many tasks: the listed ones, or else the filtered ones.
+    The choices come from the choices cache; submitted ones are checked
+    by primary key.'''
+    ids = forms.CharField(
+        required=False, label=_('Task IDs'),
+        help_text=_('Comma-separated. If empty, every task of the filter is changed.')
+    )
+    status = CachedModelChoiceField(
+        queryset=Status.objects.all(), required=False, label=_('Status')
+    )
+    executor = CachedModelChoiceField(
+        queryset=User.objects.annotate(full_name=Concat('first_name', Value(' '), 'last_name')),
+        label_field='full_name', required=False, label=_('Executor')
+    )
+    unassign = forms.BooleanField(required=False, label=_('Remove the executor'))
+    add_labels = CachedModelMultipleChoiceField(
+        queryset=Label.objects.all(), required=False, label=_('Add labels')
+    )
+    remove_labels = CachedModelMultipleChoiceField(
+        queryset=Label.objects.all(), required=False, label=_('Remove labels')
+    )
+
+    def clean_ids(self) -> List[int]:
+        text = self.cleaned_data['ids'].replace(',', ' ')
+        try:
+            return [int(value) for value in text.split()]
+        except ValueError:
+            raise forms.ValidationError(_('Enter task IDs separated by commas.'))
+
+    def clean(self) -> Dict[str, Any]:
+        cleaned_data = super().clean()
+        if cleaned_data.get('executor') and cleaned_data.get('unassign'):
+            raise forms.ValidationError(_('Choose an executor or remove it, not both.'))
+        if not any(cleaned_data.get(name) for name in (
+            'status', 'executor', 'unassign', 'add_labels', 'remove_labels'
+        )):
+            raise forms.ValidationError(_('Choose a change to make.'))
+        return cleaned_data
@@ -0,0 +1,217 @@
+"""Append-only history of the changes of tasks.
+
+A save of a task that changes its name, description, status or executor,
+and a change of its labels, each append one `TaskChange` row: the user of
+the current request, the time and a compact diff of what changed, e.g.
+`{"status": [1, 3], "labels": [[2], []]}`. A value is stored as the pair
+of its old and new value, the labels as the ids added and removed, and
+the description only as changed (`true`), without its text. Statuses,
+users and labels are stored by id and named when the history is shown.
+
+Rows are only ever inserted, one INSERT per save. The task form collects
+the save of a task and of its labels into a single row (see `collect`),
+and bulk paths insert the rows of a chunk with one `bulk_create`. Tasks
+created by `bulk_create` (imports, seeding) have no history.
+
+The history is kept when its task is deleted: the deletion appends a last
+entry, with the values of the task as changes to nothing, and its rows
+are only removed by `prune_history`.
+
+The history of a task is read newest first through the
+(task, date_changed, id) index, by keyset. `prune_history` deletes the
+rows older than TASK_HISTORY_DAYS in primary key order, which keeps the
+table to a bounded size: see the `prune_task_history` command.
+"""
+
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Set
+
+from django.db.models import Model
+from django.http import HttpRequest
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from task_manager.labels.models import Label
+from task_manager.statuses.models import Status
+from task_manager.users.models import User
+
+from .models import Task, TaskChange
+
+
+# The current request, set by HistoryMiddleware. Not its lazy user, which
+# asgiref would load from an event loop when comparing context values.
+current_request: ContextVar[Optional[HttpRequest]] = ContextVar('current_request', default=None)
+
+# Task columns whose changes are recorded; the description only as changed.
+RECORDED_FIELDS = ('name', 'description', 'status_id', 'executor_id')
+
+# A compact diff: field name to [old, new], or to true, and 'labels' to [added, removed].
+Diff = Dict[str, Any]
+
+
+def changed_by() -> Optional[int]:
+    user = getattr(current_request.get(), 'user', None)
+    return user.pk if user is not None and user.is_authenticated else None
+
+
+def field_changes(stored: Optional[Dict[str, Any]], written: Dict[str, Any]) -> Diff:
+    """The diff of the recorded columns of a task, from nothing if it is new."""
+    changes: Diff = {}
+    for field in RECORDED_FIELDS:
+        before = stored[field] if stored is not None else None
+        if before != written[field]:
+            name = field[:-3] if field.endswith('_id') else field
+            changes[name] = True if field == 'description' else [before, written[field]]
+    return changes
+
+
+def label_changes(added: Iterable[int], removed: Iterable[int]) -> Diff:
+    added, removed = sorted(added), sorted(removed)
+    return {'labels': [added, removed]} if added or removed else {}
+
+
+def merge(changes: Diff, later: Diff) -> None:
+    """Add later changes of the same task to a diff."""
+    for name, change in later.items():
+        if name == 'labels' and 'labels' in changes:
+            # A label added then removed, or removed then added, did not change.
+            added, removed = (set(ids) for ids in changes.pop('labels'))
+            added_later, removed_later = (set(ids) for ids in change)
+            changes.update(label_changes(
+                (added - removed_later) | (added_later - removed),
+                (removed - added_later) | (removed_later - added),
+            ))
+        elif isinstance(change, list) and name in changes:
+            changes[name] = [changes[name][0], change[1]]
+            if changes[name][0] == change[1]:
+                del changes[name]
+        else:
+            changes[name] = change
+
+
+def record(task: Task, changes: Diff, created: bool = False,
+           using: Optional[str] = None) -> None:
+    """Append an entry of the task, or add the changes to the one `collect` writes."""
+    pending = getattr(task, '_pending_change', None)
+    if pending is not None:
+        pending.created |= created
+        merge(pending.changes, changes)
+    elif changes or created:
+        TaskChange.objects.using(using).create(
+            task=task, user_id=changed_by(), created=created, changes=changes
+        )
+
+
+def record_deleted(task: Task, using: Optional[str] = None) -> None:
+    """Append the last entry of a deleted task."""
+    stored = {field: getattr(task, field) for field in RECORDED_FIELDS}
+    TaskChange.objects.using(using).create(
+        task_id=task.pk, user_id=changed_by(), deleted=True,
+        changes=field_changes(stored, dict.fromkeys(RECORDED_FIELDS)),
+    )
+
+
+def record_tasks(changes: Dict[int, Diff], using: Optional[str] = None) -> None:
+    """Append an entry for each task, with one INSERT."""
+    user_id, now = changed_by(), timezone.now()
+    TaskChange.objects.using(using).bulk_create([
+        TaskChange(task_id=task_id, user_id=user_id, date_changed=now, changes=diff)
+        for task_id, diff in changes.items() if diff
+    ])
+
+
+@contextmanager
+def collect(task: Task, using: Optional[str] = None) -> Iterator[None]:
+    """Record the changes made to the task in the block as one entry."""
+    task._pending_change = pending = TaskChange(user_id=changed_by())
+    try:
+        yield
+    finally:
+        del task._pending_change
+    if pending.changes or pending.created:
+        pending.task = task
+        pending.save(using=using)
+
+
+class HistoryLine(NamedTuple):
+    """A changed field of an entry: `value` pairs, `text` flags and `labels` sets."""
+    kind: str
+    field: str
+    before: str = ''
+    after: str = ''
+
+
+FIELD_TITLES = {
+    'name': _('Name'), 'description': _('Description'), 'status': _('Status'),
+    'executor': _('Executor'), 'labels': _('Labels'),
+}
+
+
+def referenced_ids(entries: Sequence[TaskChange]) -> Dict[type, Set[int]]:
+    ids: Dict[type, Set[int]] = defaultdict(set)
+    for entry in entries:
+        ids[User].add(entry.user_id)
+        ids[Status].update(entry.changes.get('status', ()))
+        ids[User].update(entry.changes.get('executor', ()))
+        for label_ids in entry.changes.get('labels', ()):
+            ids[Label].update(label_ids)
+    return ids
+
+
+def describe(entries: Sequence[TaskChange]) -> None:
+    """Set `author` and `lines` of the entries, naming the statuses,
+    users and labels they refer to with one query per model."""
+    names: Dict[type, Dict[int, str]] = {}
+    for model, ids in referenced_ids(entries).items():
+        ids.discard(None)
+        objects: Dict[int, Model] = model._default_manager.in_bulk(ids) if ids else {}
+        names[model] = {pk: str(obj) for pk, obj in objects.items()}
+    for entry in entries:
+        entry.author = name_of(names, User, entry.user_id)
+        entry.lines = [
+            describe_change(names, field, change) for field, change in entry.changes.items()
+        ]
+
+
+def name_of(names: Dict[type, Dict[int, str]], model: Optional[type], value: Any) -> str:
+    if value is None:
+        return ''
+    if model is None:
+        return str(value)
+    # A deleted status, user or label is shown by its id.
+    return names[model].get(value, '#{}'.format(value))
+
+
+def describe_change(names: Dict[type, Dict[int, str]], field: str, change: Any) -> HistoryLine:
+    title = FIELD_TITLES.get(field, field)
+    if field == 'labels':
+        added, removed = (', '.join(name_of(names, Label, pk) for pk in ids) for ids in change)
+        return HistoryLine('labels', title, removed, added)
+    if change is True:
+        return HistoryLine('text', title)
+    model = {'status': Status, 'executor': User}.get(field)
+    return HistoryLine('value', title, *(name_of(names, model, value) for value in change))
+
+
+def prune_history(before: datetime, batch_size: int = 10000,
+                  using: Optional[str] = None) -> int:
+    """Delete the entries older than `before`, oldest first, in batches.
+    Returns the number of entries deleted.
+
+    Entries are appended, so the oldest have the smallest primary keys:
+    each batch reads the first keys and deletes up to the last old one,
+    without scanning the entries that are kept."""
+    entries = TaskChange.objects.using(using)
+    deleted = 0
+    while True:
+        rows: List[Any] = list(
+            entries.order_by('pk').values_list('pk', 'date_changed')[:batch_size]
+        )
+        old = [pk for pk, date_changed in rows if date_changed < before]
+        if old:
+            deleted += entries.filter(pk__lte=old[-1], date_changed__lt=before).delete()[0]
+        if len(old) < batch_size:
+            return deleted
@@ -0,0 +1,75 @@
+"""Assignment of the labels of a task by difference.
+
+`set_labels` compares the wanted labels with the stored `TaskLabel` links
+of a task, then inserts the missing links with one `bulk_create` and
+deletes the extra ones with one DELETE. Links kept by the change are not
+touched. `ManyToManyField.set()` reaches the same rows through `remove()`
+and `add()`, which read the links again and send their own m2m_changed
+signals, so the task was touched and its counters updated once per
+direction.
+
+No signals are sent here: the label counters (see counters.py), the
+modification of the task, with its day statistics (see stats.py), and its
+history (see history.py) are updated in the same transaction. The
+`(task, label)` unique constraint of `TaskLabel` keeps a concurrent
+assignment from duplicating a link.
+"""
+
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple, Union
+
+from django.db import router, transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from task_manager.labels.models import Label
+
+from .cache import task_table_cache
+from .counters import CounterDeltas
+from .history import label_changes, record
+from .models import Task, TaskLabel
+from .stats import DayStatDeltas
+
+
+def touch_tasks(tasks: QuerySet, using: Optional[str] = None) -> datetime:
+    """Move `date_modified` of the tasks, and their day statistics, to now."""
+    now = timezone.now()
+    days = DayStatDeltas()
+    days.move_modified(tasks.using(using), now)
+    days.apply(using)
+    tasks.using(using).update(date_modified=now)
+    return now
+
+
+def set_labels(task: Task, labels: Iterable[Union[Label, int]], using: Optional[str] = None,
+               touch: bool = True) -> Tuple[List[int], List[int]]:
+    """Give the task exactly the labels, or label ids, given.
+    Returns the ids of the labels added and of those removed.
+
+    `touch=False` leaves `date_modified` to a save of the task that has
+    just moved it, in the same request."""
+    using = using or router.db_for_write(Task, instance=task)
+    wanted = {getattr(label, 'pk', label) for label in labels}
+    with transaction.atomic(using=using, savepoint=False):
+        links = TaskLabel.objects.using(using).filter(task_id=task.pk)
+        stored = set(links.values_list('label_id', flat=True))
+        added, removed = sorted(wanted - stored), sorted(stored - wanted)
+        if not (added or removed):
+            return added, removed
+        if removed:
+            links.filter(label_id__in=removed).delete()
+        if added:
+            TaskLabel.objects.using(using).bulk_create([
+                TaskLabel(task_id=task.pk, label_id=label_id) for label_id in added
+            ])
+        counters = CounterDeltas()
+        counters.add_labels(added)
+        counters.add_labels(removed, sign=-1)
+        counters.apply(using)
+        if touch:
+            task.date_modified = touch_tasks(Task.objects.filter(pk=task.pk), using)
+        record(task, label_changes(added, removed), using=using)
+    # As with set(), labels prefetched before the change are read again.
+    getattr(task, '_prefetched_objects_cache', {}).pop('labels', None)
+    task_table_cache.bump()
+    return added, removed
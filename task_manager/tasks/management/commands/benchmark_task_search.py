@@ -0,0 +1,102 @@
+"""Measure the latency of ranked task searches."""
+
+import random
+import statistics
+import time
+from itertools import product
+from typing import Any, List
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import transaction
+
+from task_manager.statuses.models import Status
+from task_manager.tasks.counters import CounterDeltas
+from task_manager.tasks.models import Task
+from task_manager.tasks.stats import DayStatDeltas
+from task_manager.tasks.search import ORDERING, RANK, search_tasks
+from task_manager.tasks.views import TasksListView
+from task_manager.users.models import User
+
+
+SYLLABLES = ('ka', 'lo', 'mi', 'ne', 'ru', 'sa', 'te', 'vo', 'zu', 'pi', 'do', 'ge')
+
+# 1728 three-syllable words. Texts draw them with a Zipf-like skew, so
+# searches cover frequent words (long posting lists) and rare ones.
+VOCABULARY: List[str] = [''.join(word) for word in product(SYLLABLES, repeat=3)]
+
+
+class Command(BaseCommand):
+    help = (
+        'Times the first page of ranked task searches, the query the task list '
+        'runs for the "q" filter, and reports latency percentiles per search. '
+        'With --seed, first inserts synthetic tasks: use a scratch database.'
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('searches', nargs='*',
+                            help='Searches to time, words of the synthetic vocabulary by default.')
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Number of synthetic tasks to insert before measuring.')
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help='Tasks inserted per transaction when seeding.')
+        parser.add_argument('--repeat', type=int, default=20,
+                            help='Runs of each search.')
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if options['seed']:
+            self.seed(options['seed'], options['batch_size'])
+        searches = options['searches'] or [
+            VOCABULARY[0], VOCABULARY[10], VOCABULARY[500],
+            VOCABULARY[1700], '{} {}'.format(VOCABULARY[0], VOCABULARY[3]),
+        ]
+        self.stdout.write('{} tasks'.format(Task.objects.count()))
+        for text in searches:
+            self.measure(text, options['repeat'])
+
+    def measure(self, text: str, repeat: int) -> None:
+        queryset = search_tasks(Task.objects.all(), text).order_by(*ORDERING)
+        page = queryset.values_list(RANK, 'id')[:TasksListView.paginate_by + 1]
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            rows = len(list(page.all()))
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        self.stdout.write(
+            '{:<20} {:>3} rows  p50 {:8.2f} ms  p95 {:8.2f} ms  max {:8.2f} ms  '
+            '({} matches)'.format(
+                text, rows, statistics.median(timings),
+                timings[int(len(timings) * 0.95) - 1], timings[-1], queryset.count(),
+            )
+        )
+
+    def seed(self, count: int, batch_size: int) -> None:
+        status = Status.objects.order_by('pk').first()
+        author = User.objects.order_by('pk').first()
+        if not (status and author):
+            raise CommandError('At least one status and one user are required to seed tasks.')
+        generator = random.Random(count)
+        weights = [1 / rank for rank in range(1, len(VOCABULARY) + 1)]
+
+        def text(length: int) -> str:
+            return ' '.join(generator.choices(VOCABULARY, weights, k=length))
+
+        started = time.perf_counter()
+        for offset in range(0, count, batch_size):
+            size = min(batch_size, count - offset)
+            with transaction.atomic():
+                tasks = Task.objects.bulk_create([
+                    Task(name=text(4)[:50], description=text(generator.randint(20, 120)),
+                         status=status, author=author)
+                    for _ in range(size)
+                ])
+                counters, days = CounterDeltas(), DayStatDeltas()
+                counters.add_task(status.pk, author.pk, None, sign=size)
+                for task in tasks:
+                    days.add_task(task.date_created, task.date_modified)
+                counters.apply()
+                days.apply()
+        seconds = time.perf_counter() - started
+        self.stdout.write('Seeded {} tasks in {:.1f}s ({:.0f} rows/s)'.format(
+            count, seconds, count / seconds
+        ))
@@ -0,0 +1,98 @@
+"""Measure concurrent task writes from several processes."""
+
+import multiprocessing
+import random
+import statistics
+import time
+from typing import Any, List, Tuple
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import OperationalError, connection, connections
+
+from task_manager.statuses.models import Status
+from task_manager.tasks.models import Task
+from task_manager.users.models import User
+
+
+def write_tasks(worker: int, operations: int, status_id: int,
+                author_id: int) -> Tuple[List[float], int]:
+    '''Creates a task, then renames a random one, `operations` times in all.
+    Returns the timings in milliseconds and the number of failed writes.'''
+    generator = random.Random(worker)
+    last = Task.objects.order_by('-pk').values_list('pk', flat=True).first()
+    timings: List[float] = []
+    errors = 0
+    for number in range(operations):
+        started = time.perf_counter()
+        try:
+            if number % 2 == 0:
+                Task.objects.create(name='Benchmark {}.{}'.format(worker, number),
+                                    description='', status_id=status_id, author_id=author_id)
+            else:
+                task = Task.objects.filter(pk__lte=generator.randint(1, last)).last()
+                task.name = 'Renamed {}.{}'.format(worker, number)
+                task.save()
+        except OperationalError:
+            errors += 1
+            continue
+        timings.append((time.perf_counter() - started) * 1000)
+    connections.close_all()
+    return timings, errors
+
+
+class Command(BaseCommand):
+    help = (
+        'Creates and renames tasks from --workers processes at once, as concurrent '
+        'task edits do, and reports the throughput, latency percentiles and '
+        'failed writes ("database is locked"). Compare SQLITE_PRODUCTION=False '
+        'with True. Writes tasks: use a scratch database.'
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--workers', type=int, default=4,
+                            help='Number of processes writing at once.')
+        parser.add_argument('--operations', type=int, default=200,
+                            help='Writes per process, half creations and half updates.')
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        status = Status.objects.order_by('pk').first()
+        author = User.objects.order_by('pk').first()
+        if not (status and author):
+            raise CommandError('At least one status and one user are required.')
+        if not Task.objects.exists():
+            Task.objects.create(name='Benchmark', description='', status=status, author=author)
+        self.describe()
+        # The workers are forked and must not share the connection of this process.
+        connections.close_all()
+
+        workers = options['workers']
+        started = time.perf_counter()
+        with multiprocessing.get_context('fork').Pool(workers) as pool:
+            results = pool.starmap(write_tasks, [
+                (worker, options['operations'], status.pk, author.pk)
+                for worker in range(workers)
+            ])
+        seconds = time.perf_counter() - started
+
+        timings = sorted(timing for worker_timings, _ in results for timing in worker_timings)
+        errors = sum(worker_errors for _, worker_errors in results)
+        self.stdout.write('{} workers, {} writes in {:.1f}s, {} failed'.format(
+            workers, len(timings), seconds, errors
+        ))
+        if timings:
+            self.stdout.write('writes/s:   {:.1f}'.format(len(timings) / seconds))
+            self.stdout.write('p50:        {:.1f} ms'.format(statistics.median(timings)))
+            self.stdout.write('p99:        {:.1f} ms'.format(
+                timings[max(int(len(timings) * 0.99) - 1, 0)]
+            ))
+            self.stdout.write('max:        {:.1f} ms'.format(timings[-1]))
+
+    def describe(self) -> None:
+        settings = connection.settings_dict
+        self.stdout.write('engine:     {}'.format(settings['ENGINE']))
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                journal_mode = cursor.execute('PRAGMA journal_mode').fetchone()[0]
+            self.stdout.write('journal:    {}, transactions: {}'.format(
+                journal_mode, settings['OPTIONS'].get('transaction_mode', 'DEFERRED')
+            ))
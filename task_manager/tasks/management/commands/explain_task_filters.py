@@ -0,0 +1,111 @@
+"""Print the query plan of the task list for every TasksFilter combination."""
+
+import re
+from itertools import combinations
+from types import SimpleNamespace
+from typing import Any, Dict, List, Tuple
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import connections
+
+from task_manager.labels.models import Label
+from task_manager.statuses.models import Status
+from task_manager.tasks.filters import TasksFilter
+from task_manager.tasks.models import Task
+from task_manager.tasks.search import get_ordering, words
+from task_manager.tasks.views import TasksListView
+from task_manager.users.models import User
+
+
+FILTERS = ('status', 'executor', 'labels', 'self_tasks', 'q')
+
+SEQUENTIAL_SCAN_PATTERNS = {
+    # "SCAN tasks_task" without "USING ... INDEX" reads the whole table,
+    # "SCAN tasks_task_fts VIRTUAL TABLE INDEX" is a full-text index lookup.
+    'sqlite': re.compile(r'\bSCAN (?!.*\b(USING|VIRTUAL TABLE INDEX)\b)'),
+    'postgresql': re.compile(r'\bSeq Scan\b'),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Prints the EXPLAIN plan of the task list query for each combination '
+        'of TasksFilter parameters and marks plans with sequential scans. '
+        'Run it against a realistically sized database: on tiny tables '
+        'PostgreSQL prefers sequential scans regardless of indexes.'
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--database', default='default',
+                            help='Database alias to explain against.')
+        parser.add_argument('--fail-on-seq-scan', action='store_true',
+                            help='Exit with an error if any plan falls back to a sequential scan.')
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        database = options['database']
+        vendor = connections[database].vendor
+        pattern = SEQUENTIAL_SCAN_PATTERNS.get(vendor)
+        if pattern is None:
+            raise CommandError('EXPLAIN is supported on SQLite and PostgreSQL only.')
+
+        values = self.get_sample_values(database)
+        request = SimpleNamespace(user=User.objects.using(database).get(pk=values['executor']))
+        sequential: List[str] = []
+
+        for combination in self.get_combinations():
+            data = {name: values[name] for name in combination}
+            filterset = TasksFilter(
+                data, queryset=Task.objects.using(database).for_list(), request=request
+            )
+            if not filterset.is_valid():
+                raise CommandError('Invalid filter values: {}'.format(filterset.errors))
+            plan = self.explain(filterset.qs, vendor)
+
+            title = ', '.join(combination) or 'no filters'
+            if pattern.search(plan):
+                sequential.append(title)
+            self.report(title, plan, title in sequential)
+
+        if sequential and options['fail_on_seq_scan']:
+            raise CommandError(
+                'Sequential scans in: {}'.format('; '.join(sequential))
+            )
+
+    def get_combinations(self) -> List[Tuple[str, ...]]:
+        """Every subset of the filters, from no filters to all of them."""
+        return [
+            combination
+            for size in range(len(FILTERS) + 1)
+            for combination in combinations(FILTERS, size)
+        ]
+
+    def report(self, title: str, plan: str, sequential: bool) -> None:
+        """Write one explained combination."""
+        if sequential:
+            self.stdout.write(self.style.WARNING('[SEQUENTIAL SCAN] {}'.format(title)))
+        else:
+            self.stdout.write(self.style.SUCCESS('[OK] {}'.format(title)))
+        self.stdout.write(plan + '\n')
+
+    def get_sample_values(self, database: str) -> Dict[str, Any]:
+        """Pick existing rows to filter by, so the planner sees real values."""
+        status = Status.objects.using(database).order_by('pk').first()
+        label = Label.objects.using(database).order_by('pk').first()
+        user = User.objects.using(database).order_by('pk').first()
+        task = Task.objects.using(database).order_by('pk').first()
+        if not (status and label and user and task):
+            raise CommandError('At least one status, label, user and task are required.')
+        return {
+            'status': status.pk, 'executor': user.pk, 'labels': label.pk, 'self_tasks': True,
+            'q': (words(task.name) or ['task'])[0],
+        }
+
+    def explain(self, queryset, vendor: str) -> str:
+        """Explain the cursor pagination query the task list runs for its first page."""
+        ordering = get_ordering(queryset, TasksListView.keyset_ordering)
+        keys = queryset.order_by(*ordering).values_list(
+            *[field.lstrip('-') for field in ordering]
+        )[:TasksListView.paginate_by + 1]
+        if vendor == 'postgresql':
+            return keys.explain(analyze=True, costs=False)
+        return keys.explain()
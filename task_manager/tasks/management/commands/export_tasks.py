@@ -0,0 +1,33 @@
+"""Stream every task to a CSV or JSON Lines file."""
+
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from task_manager.tasks.transfer import FORMATS, export_tasks, guess_format
+
+
+class Command(BaseCommand):
+    help = (
+        'Exports all tasks as CSV or JSON Lines. Tasks are read in chunks '
+        'from a database cursor, so memory use does not grow with the table.'
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('output', nargs='?', default='-',
+                            help='File to write, "-" (default) for standard output.')
+        parser.add_argument('--format', choices=FORMATS,
+                            help='Output format, guessed from the file extension by default.')
+        parser.add_argument('--chunk-size', type=int, default=2000,
+                            help='Tasks fetched from the database at a time.')
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        output = options['output']
+        format = options['format'] or guess_format(output)
+        if output == '-':
+            throughput = export_tasks(self.stdout, format, options['chunk_size'])
+        else:
+            with open(output, 'w', encoding='utf-8', newline='') as stream:
+                throughput = export_tasks(stream, format, options['chunk_size'])
+        # Report on stderr so the export can be piped from stdout.
+        self.stderr.write('Exported {}'.format(throughput), style_func=self.style.SUCCESS)
@@ -0,0 +1,46 @@
+"""Create tasks in bulk from a CSV or JSON Lines file."""
+
+import sys
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from task_manager.tasks.transfer import (
+    FORMATS, TaskImporter, TransferError, guess_format, read_rows
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Imports tasks from CSV or JSON Lines, as written by export_tasks. '
+        'Statuses and labels are matched by name, users by username. Rows are '
+        'inserted in batches, each batch in its own transaction.'
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('input', help='File to read, "-" for standard input.')
+        parser.add_argument('--format', choices=FORMATS,
+                            help='Input format, guessed from the file extension by default.')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Rows inserted per transaction.')
+        parser.add_argument('--author',
+                            help='Username of the author of rows without one.')
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        path = options['input']
+        format = options['format'] or guess_format(path)
+        try:
+            importer = TaskImporter(options['batch_size'], options['author'])
+        except TransferError as error:
+            raise CommandError(error) from error
+        try:
+            if path == '-':
+                throughput = importer.run(read_rows(sys.stdin, format))
+            else:
+                with open(path, encoding='utf-8', newline='') as stream:
+                    throughput = importer.run(read_rows(stream, format))
+        except TransferError as error:
+            raise CommandError('{}. Imported {} rows before its batch.'.format(
+                error, importer.throughput.rows
+            )) from error
+        self.stdout.write(self.style.SUCCESS('Imported {}'.format(throughput)))
@@ -0,0 +1,28 @@
+"""Delete old entries of the task history."""
+
+from datetime import timedelta
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+from django.utils import timezone
+
+from task_manager.tasks.history import prune_history
+
+
+class Command(BaseCommand):
+    help = (
+        'Deletes the entries of the task history older than TASK_HISTORY_DAYS, oldest '
+        'first, in primary key batches. Run it daily to keep the history table small.'
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--days', type=int, default=settings.TASK_HISTORY_DAYS,
+                            help='Days of history to keep.')
+        parser.add_argument('--batch-size', type=int, default=10000,
+                            help='Entries deleted per statement.')
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        before = timezone.now() - timedelta(days=options['days'])
+        deleted = prune_history(before, options['batch_size'])
+        self.stdout.write('{} task history entries deleted.'.format(deleted))
@@ -0,0 +1,21 @@
+"""Recount the task counters of statuses, labels and users."""
+
+from typing import Any
+
+from django.core.management.base import BaseCommand
+
+from task_manager.tasks.cache import task_table_cache
+from task_manager.tasks.counters import rebuild_counters
+
+
+class Command(BaseCommand):
+    help = (
+        'Recounts the tasks of every status, label and user from the tasks table. '
+        'Run it after writing tasks with raw SQL or bulk operations that bypass '
+        'the counter updates.'
+    )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        rebuild_counters()
+        task_table_cache.bump()
+        self.stdout.write('Task counters rebuilt.')
@@ -0,0 +1,28 @@
+"""Recount the task statistics shown by the dashboard."""
+
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from task_manager.tasks.cache import task_table_cache
+from task_manager.tasks.counters import rebuild_counters
+from task_manager.tasks.stats import rebuild_day_stats
+
+
+class Command(BaseCommand):
+    help = (
+        'Recounts the rollups of the task dashboard from the tasks table: the task '
+        'counters of statuses, labels and users, then the tasks created and modified '
+        'per day, reading the tasks in primary key batches. Run it when tasks are not '
+        'being changed.'
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--batch-size', type=int, default=10000,
+                            help='Tasks read per batch when counting days.')
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        rebuild_counters()
+        batches = rebuild_day_stats(options['batch_size'])
+        task_table_cache.bump()
+        self.stdout.write('Task statistics rebuilt in {} batches.'.format(batches))
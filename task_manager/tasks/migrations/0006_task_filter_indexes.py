@@ -0,0 +1,60 @@
+# Generated by Django 4.1.3 on 2026-10-18 02:30
+
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def remove_duplicate_task_labels(apps, schema_editor):
+    TaskLabel = apps.get_model('tasks', 'TaskLabel')
+    db_alias = schema_editor.connection.alias
+    kept_ids = TaskLabel.objects.using(db_alias).values('task', 'label').annotate(
+        kept_id=Min('id')
+    ).values('kept_id')
+    TaskLabel.objects.using(db_alias).exclude(id__in=kept_ids).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0005_alter_tasklabel_task'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['date_modified', 'id'], name='task_modified_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['status', 'date_modified', 'id'], name='task_status_modified_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['executor', 'date_modified', 'id'], name='task_executor_modified_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['author', 'date_modified', 'id'], name='task_author_modified_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['status', 'executor', 'date_modified', 'id'], name='task_status_executor_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['status', 'author', 'date_modified', 'id'], name='task_status_author_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['executor', 'author', 'date_modified', 'id'], name='task_executor_author_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tasklabel',
+            index=models.Index(fields=['label', 'task'], name='tasklabel_label_task_idx'),
+        ),
+        migrations.RunPython(remove_duplicate_task_labels, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='tasklabel',
+            constraint=models.UniqueConstraint(fields=('task', 'label'), name='tasklabel_task_label_uniq'),
+        ),
+    ]
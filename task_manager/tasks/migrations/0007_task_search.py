@@ -0,0 +1,63 @@
+# Full-text index of task names and descriptions, see task_manager/tasks/search.py.
+
+from django.db import migrations
+
+
+SQLITE_FORWARD = (
+    "CREATE VIRTUAL TABLE tasks_task_fts USING fts5("
+    "name, description, content='tasks_task', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER tasks_task_fts_insert AFTER INSERT ON tasks_task BEGIN "
+    "INSERT INTO tasks_task_fts (rowid, name, description) "
+    "VALUES (new.id, new.name, new.description); END",
+    "CREATE TRIGGER tasks_task_fts_delete AFTER DELETE ON tasks_task BEGIN "
+    "INSERT INTO tasks_task_fts (tasks_task_fts, rowid, name, description) "
+    "VALUES ('delete', old.id, old.name, old.description); END",
+    "CREATE TRIGGER tasks_task_fts_update AFTER UPDATE OF name, description ON tasks_task BEGIN "
+    "INSERT INTO tasks_task_fts (tasks_task_fts, rowid, name, description) "
+    "VALUES ('delete', old.id, old.name, old.description); "
+    "INSERT INTO tasks_task_fts (rowid, name, description) "
+    "VALUES (new.id, new.name, new.description); END",
+    "INSERT INTO tasks_task_fts (tasks_task_fts) VALUES ('rebuild')",
+)
+
+SQLITE_BACKWARD = (
+    "DROP TRIGGER IF EXISTS tasks_task_fts_update",
+    "DROP TRIGGER IF EXISTS tasks_task_fts_delete",
+    "DROP TRIGGER IF EXISTS tasks_task_fts_insert",
+    "DROP TABLE IF EXISTS tasks_task_fts",
+)
+
+POSTGRESQL_FORWARD = (
+    "ALTER TABLE tasks_task ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('simple'::regconfig, coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(description, '')), 'B')"
+    ") STORED",
+    "CREATE INDEX task_search_idx ON tasks_task USING GIN (search_vector)",
+)
+
+POSTGRESQL_BACKWARD = (
+    "DROP INDEX IF EXISTS task_search_idx",
+    "ALTER TABLE tasks_task DROP COLUMN IF EXISTS search_vector",
+)
+
+
+def run(statements):
+    def operation(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, ()):
+            schema_editor.execute(statement)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0006_task_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run({'sqlite': SQLITE_FORWARD, 'postgresql': POSTGRESQL_FORWARD}),
+            run({'sqlite': SQLITE_BACKWARD, 'postgresql': POSTGRESQL_BACKWARD}),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Fills the task counters added to statuses, labels and users,
+# see task_manager/tasks/counters.py.
+
+from django.db import migrations
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+COUNTERS = (
+    ('statuses', 'Status', 'task_count', 'Task', 'status'),
+    ('labels', 'Label', 'task_count', 'TaskLabel', 'label'),
+    ('users', 'User', 'authored_task_count', 'Task', 'author'),
+    ('users', 'User', 'assigned_task_count', 'Task', 'executor'),
+)
+
+
+def count_tasks(apps, schema_editor):
+    for app_label, model_name, field, rows_name, key in COUNTERS:
+        model = apps.get_model(app_label, model_name)
+        rows = apps.get_model('tasks', rows_name)
+        count = rows.objects.filter(
+            **{key: OuterRef('pk')}
+        ).order_by().values(key).annotate(count=Count('pk')).values('count')
+        model.objects.update(**{field: Coalesce(Subquery(count), Value(0))})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0007_task_search'),
+        ('statuses', '0002_status_task_count'),
+        ('labels', '0003_label_task_count'),
+        ('users', '0003_user_task_counts'),
+    ]
+
+    operations = [
+        migrations.RunPython(count_tasks, migrations.RunPython.noop),
+    ]
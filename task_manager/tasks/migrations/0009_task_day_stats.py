@@ -0,0 +1,43 @@
+# Generated by Django 4.1.3 on 2026-10-18 03:20
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+
+def count_days(apps, schema_editor):
+    # Same rollup as task_manager.tasks.stats.rebuild_day_stats, in one pass.
+    Task = apps.get_model('tasks', 'Task')
+    TaskDayStats = apps.get_model('tasks', 'TaskDayStats')
+    days = {}
+    for column in ('created', 'modified'):
+        for day, count in Task.objects.order_by().annotate(
+            day=TruncDate('date_' + column)
+        ).values('day').annotate(count=Count('pk')).values_list('day', 'count'):
+            days.setdefault(day, TaskDayStats(day=day))
+            setattr(days[day], column, count)
+    TaskDayStats.objects.bulk_create(days.values())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0008_task_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskDayStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(unique=True, verbose_name='day')),
+                ('created', models.IntegerField(default=0, verbose_name='created')),
+                ('modified', models.IntegerField(default=0, verbose_name='modified')),
+            ],
+            options={
+                'verbose_name': 'task statistics of a day',
+                'verbose_name_plural': 'task statistics by day',
+            },
+        ),
+        migrations.RunPython(count_days, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.16 on 2026-10-18 04:57
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0011_task_search_entry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='taskchange',
+            name='deleted',
+            field=models.BooleanField(default=False, verbose_name='deleted'),
+        ),
+        migrations.AlterField(
+            model_name='taskchange',
+            name='task',
+            field=models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='changes', to='tasks.task'),
+        ),
+    ]
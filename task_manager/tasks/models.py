@@ -1,10 +1,42 @@
-from django.db import models
+from django.db import models, router, transaction
+from django.utils import timezone
 from django.utils.translation import gettext_lazy
 
 from task_manager.users.models import User
 from task_manager.statuses.models import Status
 from task_manager.labels.models import Label
 
+from .search import SearchDocumentField
+
+
+class TaskQuerySet(models.QuerySet):
+    '''Query plans for the task pages.'''
+
+    LIST_FIELDS = (
+        'id', 'name', 'date_modified',
+        'status__id', 'status__name',
+        'author__id', 'author__first_name', 'author__last_name',
+        'executor__id', 'executor__first_name', 'executor__last_name',
+    )
+
+    def for_list(self) -> 'TaskQuerySet':
+        '''Joins status, author and executor and loads only
+        the columns rendered by the task table.'''
+        return self.select_related(
+            'status', 'author', 'executor'
+        ).only(*self.LIST_FIELDS)
+
+    def for_export(self) -> 'TaskQuerySet':
+        '''Joins status, author and executor and prefetches labels,
+        which also works chunk by chunk with `iterator(chunk_size=...)`.'''
+        return self.select_related(
+            'status', 'author', 'executor'
+        ).prefetch_related('labels')
+
+    def for_detail(self) -> 'TaskQuerySet':
+        '''The task page in two queries, as rows of `for_export`.'''
+        return self.for_export()
+
 
 class Task(models.Model):
     name = models.CharField(
@@ -53,14 +85,117 @@ class Task(models.Model):
         )
     )
 
+    objects = TaskQuerySet.as_manager()
+
     class Meta:
         verbose_name: str = gettext_lazy('task')
         verbose_name_plural: str = gettext_lazy('tasks')
+        # One index per TasksFilter access path, each ending with
+        # the keyset pagination order (date_modified, id).
+        indexes = [
+            models.Index(fields=['date_modified', 'id'], name='task_modified_idx'),
+            models.Index(
+                fields=['status', 'date_modified', 'id'], name='task_status_modified_idx'
+            ),
+            models.Index(
+                fields=['executor', 'date_modified', 'id'], name='task_executor_modified_idx'
+            ),
+            models.Index(
+                fields=['author', 'date_modified', 'id'], name='task_author_modified_idx'
+            ),
+            models.Index(
+                fields=['status', 'executor', 'date_modified', 'id'],
+                name='task_status_executor_idx'
+            ),
+            models.Index(
+                fields=['status', 'author', 'date_modified', 'id'],
+                name='task_status_author_idx'
+            ),
+            models.Index(
+                fields=['executor', 'author', 'date_modified', 'id'],
+                name='task_executor_author_idx'
+            ),
+        ]
 
     def __str__(self) -> str:
         return self.name
 
+    def save(self, *args, **kwargs) -> None:
+        '''Saves the task in one transaction with the signal receivers
+        updating the task counters of its status and users.'''
+        using = kwargs.get('using') or router.db_for_write(Task, instance=self)
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+
 
 class TaskLabel(models.Model):
     task = models.ForeignKey(Task, on_delete=models.CASCADE)
     label = models.ForeignKey(Label, on_delete=models.PROTECT)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['task', 'label'], name='tasklabel_task_label_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['label', 'task'], name='tasklabel_label_task_idx'),
+        ]
+
+
+class TaskSearchEntry(models.Model):
+    '''A row of the SQLite full-text index of tasks, created by migration
+    0007_task_search and written by its triggers, see search.py. It only
+    lets searches join the index to the tasks.'''
+    task = models.OneToOneField(
+        Task, on_delete=models.DO_NOTHING, primary_key=True, db_column='rowid',
+        db_constraint=False, related_name='search_entry'
+    )
+    # The hidden column named after an FTS5 table stands for its whole row.
+    document = SearchDocumentField(db_column='tasks_task_fts')
+
+    class Meta:
+        managed = False
+        db_table = 'tasks_task_fts'
+
+
+class TaskDayStats(models.Model):
+    '''Tasks created and last modified on a day, a rollup
+    maintained by task_manager.tasks.signals, see stats.py.'''
+    day = models.DateField(verbose_name=gettext_lazy('day'), unique=True)
+    created = models.IntegerField(verbose_name=gettext_lazy('created'), default=0)
+    modified = models.IntegerField(verbose_name=gettext_lazy('modified'), default=0)
+
+    class Meta:
+        verbose_name: str = gettext_lazy('task statistics of a day')
+        verbose_name_plural: str = gettext_lazy('task statistics by day')
+
+    def __str__(self) -> str:
+        return str(self.day)
+
+
+class TaskChange(models.Model):
+    '''An entry of the append-only history of a task: who changed
+    which fields and labels of it, and when, see history.py.'''
+    # The history outlives the task, whose deletion is its last entry.
+    task = models.ForeignKey(
+        Task, on_delete=models.DO_NOTHING, db_constraint=False, db_index=False,
+        related_name='changes'
+    )
+    # The user is kept after their deletion, as the history is never rewritten.
+    user = models.ForeignKey(
+        User, on_delete=models.DO_NOTHING, db_constraint=False, db_index=False, related_name='+',
+        null=True, blank=True, verbose_name=gettext_lazy('user')
+    )
+    date_changed = models.DateTimeField(
+        verbose_name=gettext_lazy('changed at'), default=timezone.now
+    )
+    created = models.BooleanField(verbose_name=gettext_lazy('created'), default=False)
+    deleted = models.BooleanField(verbose_name=gettext_lazy('deleted'), default=False)
+    changes = models.JSONField(verbose_name=gettext_lazy('changes'), default=dict)
+
+    class Meta:
+        verbose_name: str = gettext_lazy('task change')
+        verbose_name_plural: str = gettext_lazy('task changes')
+        # The history of a task is read newest first, by keyset.
+        indexes = [
+            models.Index(fields=['task', 'date_changed', 'id'], name='taskchange_task_date_idx'),
+        ]
@@ -0,0 +1,133 @@
+"""Ranked full-text search over task names and descriptions.
+
+The index is maintained by the database itself, created by migration
+tasks/0007_task_search:
+
+* SQLite: the FTS5 table `tasks_task_fts`, an external-content index
+  of `tasks_task` kept in sync by triggers on insert, update and delete.
+* PostgreSQL: the generated `tsvector` column `tasks_task.search_vector`
+  with a GIN index, recomputed by the server whenever a row is written.
+
+Both are updated by every write, including `bulk_create` and
+`QuerySet.update`, without any Python code on save. Note that Django
+rebuilds a SQLite table to alter most of its columns, which drops the
+triggers: a migration altering `tasks_task` has to recreate them.
+
+A search keeps the tasks matching every word and annotates them with
+`search_rank`, higher for better matches, with name matches weighing
+more than description ones. Every match is ranked: the other filters of
+the queryset apply before the results are ordered and paginated.
+"""
+
+import re
+from typing import Dict, List, Tuple, Type
+
+from django.db import connections
+from django.db.models import (
+    BooleanField, F, FloatField, Func, Lookup, Q, QuerySet, TextField, Value,
+)
+from django.db.models.expressions import RawSQL
+
+
+RANK = 'search_rank'
+
+# Keyset pagination order of search results: best match first.
+ORDERING: Tuple[str, ...] = ('-' + RANK, 'id')
+
+WORD = re.compile(r'\w+')
+
+
+def words(text: str) -> List[str]:
+    """The words of a search, free of any query syntax."""
+    return WORD.findall(text.lower())
+
+
+class SearchDocumentField(TextField):
+    """The whole row of an FTS5 table, for its `match` lookup and ranking functions."""
+
+
+@SearchDocumentField.register_lookup
+class Match(Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return '{} MATCH {}'.format(lhs, rhs), lhs_params + rhs_params
+
+
+class SearchBackend:
+    """Filters a task queryset by a search and annotates its rank.
+
+    This base class is the unindexed fallback for other databases: every
+    word in the name or description, all ranked alike.
+    """
+
+    def search(self, queryset: QuerySet, text: str) -> QuerySet:
+        terms = words(text)
+        if not terms:
+            return queryset.none()
+        return self.match(queryset, terms)
+
+    def match(self, queryset: QuerySet, terms: List[str]) -> QuerySet:
+        for term in terms:
+            queryset = queryset.filter(Q(name__icontains=term) | Q(description__icontains=term))
+        return queryset.annotate(**{RANK: Value(0.0, output_field=FloatField())})
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """FTS5 with bm25 ranking, the name column weighing 10 times the description.
+
+    The index table is joined to the tasks (see TaskSearchEntry) rather
+    than queried in a subquery, so the MATCH runs once and bm25() is
+    computed in the same pass: correlating it per task runs the
+    full-text query again per row.
+    """
+
+    def match(self, queryset: QuerySet, terms: List[str]) -> QuerySet:
+        query = ' '.join('"{}"'.format(term) for term in terms)
+        # bm25() is lower for better matches, hence negated.
+        rank = Func(
+            F('search_entry__document'), Value(10.0), Value(1.0),
+            function='bm25', output_field=FloatField(),
+        )
+        return queryset.filter(search_entry__document__match=query).annotate(**{RANK: -rank})
+
+
+class PostgreSQLSearchBackend(SearchBackend):
+    """The tsvector column with ts_rank, name lexemes weighted A, description ones B."""
+
+    config: str = 'simple'
+
+    def match(self, queryset: QuerySet, terms: List[str]) -> QuerySet:
+        query = ' & '.join(terms)
+        tasks = '"{}"'.format(queryset.model._meta.db_table)
+        tsquery = 'to_tsquery(%s::regconfig, %s)'
+        matches = RawSQL(
+            '{}."search_vector" @@ {}'.format(tasks, tsquery),
+            (self.config, query), output_field=BooleanField(),
+        )
+        # ts_rank() is a real: as a double, the rank a cursor carries back
+        # compares equal to the one it was read from.
+        rank = RawSQL(
+            'ts_rank({}."search_vector", {})::double precision'.format(tasks, tsquery),
+            (self.config, query), output_field=FloatField(),
+        )
+        return queryset.filter(matches).annotate(**{RANK: rank})
+
+
+BACKENDS: Dict[str, Type[SearchBackend]] = {
+    'sqlite': SQLiteSearchBackend,
+    'postgresql': PostgreSQLSearchBackend,
+}
+
+
+def search_tasks(queryset: QuerySet, text: str) -> QuerySet:
+    """Tasks of the queryset matching the search, with their `search_rank`."""
+    backend = BACKENDS.get(connections[queryset.db].vendor, SearchBackend)
+    return backend().search(queryset, text)
+
+
+def get_ordering(queryset: QuerySet, default: Tuple[str, ...]) -> Tuple[str, ...]:
+    """Search results are ordered by rank, other querysets by `default`."""
+    return ORDERING if RANK in queryset.query.annotations else default
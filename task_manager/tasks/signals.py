@@ -0,0 +1,231 @@
+"""Signal receivers keeping task caches, counters, statistics and history
+in step with the database."""
+
+from collections import defaultdict
+from typing import Any, Dict, Optional, Tuple
+
+from django.db.models import QuerySet
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from task_manager.labels.models import Label
+from task_manager.statuses.models import Status
+from task_manager.users.models import User
+
+from .cache import task_detail_cache, task_table_cache
+from .choices import choices_cache
+from .counters import CounterDeltas
+from .history import field_changes, label_changes, record, record_deleted, record_tasks
+from .labelling import touch_tasks
+from .models import Task, TaskLabel
+from .stats import DayStatDeltas
+
+
+@receiver(post_save, sender=Label)
+@receiver(post_delete, sender=Label)
+@receiver(post_save, sender=Status)
+@receiver(post_delete, sender=Status)
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_filter_choices(sender, **kwargs: Any) -> None:
+    """Drop the cached choices of a changed status, label or user."""
+    choices_cache.invalidate(sender)
+
+
+def relabelled_tasks(instance, action: str, reverse: bool, pk_set=None) -> Optional[QuerySet]:
+    """The tasks whose labels an m2m_changed signal reports as changed."""
+    if action in ('post_add', 'post_remove') and not pk_set:
+        return None
+    if not reverse and action.startswith('post_'):
+        return Task.objects.filter(pk=instance.pk)
+    if reverse and action in ('post_add', 'post_remove'):
+        return Task.objects.filter(pk__in=pk_set)
+    if reverse and action == 'pre_clear':
+        return Task.objects.filter(labels=instance)
+    return None
+
+
+@receiver(m2m_changed, sender=TaskLabel)
+def touch_relabelled_tasks(sender, instance, action: str, reverse: bool, using: str,
+                           pk_set=None, **kwargs: Any) -> None:
+    """Move `date_modified` of tasks whose labels changed.
+
+    Labels are part of a task's representation, so ETags derived from
+    `date_modified` have to change with them, and so do the day statistics.
+    """
+    tasks = relabelled_tasks(instance, action, reverse, pk_set)
+    if tasks is None:
+        return
+    now = touch_tasks(tasks, using)
+    if not reverse:
+        instance.date_modified = now
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+@receiver(m2m_changed, sender=TaskLabel)
+@receiver(post_save, sender=Status)
+@receiver(post_delete, sender=Status)
+@receiver(post_save, sender=Label)
+@receiver(post_delete, sender=Label)
+@receiver(post_delete, sender=User)
+def invalidate_task_tables(sender, **kwargs: Any) -> None:
+    """Start a new board generation when a row shown by the task table changes."""
+    if kwargs.get('action', 'post_').startswith('post_'):
+        task_table_cache.bump()
+
+
+@receiver(post_save, sender=User)
+def invalidate_task_tables_on_user_change(sender, update_fields=None, **kwargs: Any) -> None:
+    """Same as `invalidate_task_tables`, but ignores login time updates."""
+    if update_fields is None or set(update_fields) != {'last_login'}:
+        task_table_cache.bump()
+
+
+@receiver(post_save, sender=Status)
+@receiver(post_delete, sender=Status)
+@receiver(post_save, sender=Label)
+@receiver(post_delete, sender=Label)
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_history_names(sender, update_fields=None, **kwargs: Any) -> None:
+    """Start a new names generation when a status, label or user, which
+    task histories name, changes. Login time updates are ignored."""
+    if update_fields is None or set(update_fields) != {'last_login'}:
+        task_detail_cache.names.bump()
+
+
+# Task columns counted by statuses and users (counters.py), then by days (stats.py).
+COUNTED_FIELDS: Tuple[str, ...] = (
+    'status_id', 'author_id', 'executor_id', 'date_created', 'date_modified'
+)
+# Task columns read before a save: the counted ones and those the history records.
+STORED_FIELDS: Tuple[str, ...] = COUNTED_FIELDS + ('name', 'description')
+
+
+def count_task(values: Dict[str, Any], sign: int, counters: CounterDeltas,
+               days: DayStatDeltas) -> None:
+    counters.add_task(values['status_id'], values['author_id'], values['executor_id'], sign)
+    days.add_task(values['date_created'], values['date_modified'], sign)
+
+
+def written_values(instance: Task, stored: Optional[Dict[str, Any]],
+                   update_fields=None) -> Dict[str, Any]:
+    """The stored columns of a task as a save left them in the database."""
+    values = {field: getattr(instance, field) for field in STORED_FIELDS}
+    if stored is None or update_fields is None:
+        return values
+    return {
+        field: value if field in update_fields or field[:-3] in update_fields else stored[field]
+        for field, value in values.items()
+    }
+
+
+@receiver(pre_save, sender=Task)
+def remember_stored_fields(sender, instance: Task, raw: bool, using: str,
+                           **kwargs: Any) -> None:
+    """Read the stored columns of a task about to be saved, with one query.
+
+    The row is locked until `Task.save` commits, so a concurrent save
+    waits and then reads what this one wrote: counting from the same old
+    values twice would apply their deltas twice."""
+    instance._stored_fields = None
+    if not raw and instance.pk is not None:
+        instance._stored_fields = sender._default_manager.using(using).select_for_update().filter(
+            pk=instance.pk
+        ).values(*STORED_FIELDS).first()
+
+
+@receiver(post_save, sender=Task)
+def count_saved_task(sender, instance: Task, created: bool, raw: bool, using: str,
+                     update_fields=None, **kwargs: Any) -> None:
+    """Move a saved task between the counters of its status and users,
+    and between the days of its statistics, and record its changes."""
+    if raw:
+        return
+    stored = getattr(instance, '_stored_fields', None)
+    written = written_values(instance, stored, update_fields)
+    counters, days = CounterDeltas(), DayStatDeltas()
+    if stored is not None:
+        count_task(stored, -1, counters, days)
+    count_task(written, 1, counters, days)
+    counters.apply(using)
+    days.apply(using)
+    record(instance, field_changes(stored, written), created, using)
+
+
+@receiver(pre_delete, sender=Task)
+def uncount_deleted_task(sender, instance: Task, using: str, **kwargs: Any) -> None:
+    """Take a task out of its counters and day statistics before its label
+    links are cascaded, which sends no m2m_changed. The row is locked,
+    as by `remember_stored_fields`."""
+    stored = sender._default_manager.using(using).select_for_update().filter(
+        pk=instance.pk
+    ).values(*COUNTED_FIELDS).first()
+    if stored is None:
+        return
+    counters, days = CounterDeltas(), DayStatDeltas()
+    count_task(stored, -1, counters, days)
+    counters.add_labels(TaskLabel.objects.using(using).filter(
+        task_id=instance.pk
+    ).values_list('label_id', flat=True), sign=-1)
+    counters.apply(using)
+    days.apply(using)
+
+
+@receiver(post_delete, sender=Task)
+def record_deleted_task(sender, instance: Task, using: str, **kwargs: Any) -> None:
+    """Close the history of a deleted task, which is kept."""
+    record_deleted(instance, using)
+
+
+@receiver(m2m_changed, sender=TaskLabel)
+def count_relabelled_tasks(sender, instance, action: str, reverse: bool, using: str,
+                           pk_set=None, **kwargs: Any) -> None:
+    """Count added and removed label links, in both directions of the relation.
+
+    Removals are counted before they happen: `remove()` signals the ids it
+    was given, linked or not, so the links are read from the table.
+    """
+    deltas = CounterDeltas()
+    if action == 'post_add' and pk_set:
+        deltas.add_labels([instance.pk] * len(pk_set) if reverse else pk_set)
+    elif action in ('pre_remove', 'pre_clear'):
+        own, other = ('label_id', 'task_id') if reverse else ('task_id', 'label_id')
+        links = TaskLabel.objects.using(using).filter(**{own: instance.pk})
+        if action == 'pre_remove':
+            links = links.filter(**{other + '__in': pk_set or ()})
+        deltas.add_labels(links.values_list('label_id', flat=True), sign=-1)
+    deltas.apply(using)
+
+
+@receiver(m2m_changed, sender=TaskLabel)
+def record_relabelled_tasks(sender, instance, action: str, reverse: bool, using: str,
+                            pk_set=None, **kwargs: Any) -> None:
+    """Record added and removed labels in the history of the tasks.
+
+    As for the counters, removals are read from the table before they happen.
+    """
+    if action == 'post_add' and pk_set:
+        links = [(pk, instance.pk) for pk in pk_set] if reverse else [
+            (instance.pk, pk) for pk in pk_set
+        ]
+    elif action in ('pre_remove', 'pre_clear'):
+        own, other = ('label_id', 'task_id') if reverse else ('task_id', 'label_id')
+        rows = TaskLabel.objects.using(using).filter(**{own: instance.pk})
+        if action == 'pre_remove':
+            rows = rows.filter(**{other + '__in': pk_set or ()})
+        links = list(rows.values_list('task_id', 'label_id'))
+    else:
+        return
+    labels = defaultdict(list)
+    for task_id, label_id in links:
+        labels[task_id].append(label_id)
+    changes = {
+        task_id: label_changes(ids, ()) if action == 'post_add' else label_changes((), ids)
+        for task_id, ids in labels.items()
+    }
+    if reverse:
+        record_tasks(changes, using)
+    else:
+        record(instance, changes.get(instance.pk, {}), using=using)
@@ -0,0 +1,177 @@
+"""Spreadsheet encoders producing a file in chunks while rows are read.
+
+Both encoders turn an iterable of rows into an iterator of byte chunks
+suitable for `StreamingHttpResponse`: nothing but the current chunk is
+held in memory. XLSX is written as a zip archive with data descriptors,
+so it needs no seekable file and no third-party library.
+
+Under ASGI, `async_chunks` produces the chunks of an encoder in a thread,
+since its rows are read with the ORM, which must not run in the event loop.
+
+Text cells are user input, so neither encoder lets a spreadsheet program
+read them as formulas: CSV text starting like a formula gets a leading
+apostrophe, XLSX text is written as inline string cells.
+"""
+
+import codecs
+import csv
+import io
+import re
+import zipfile
+from typing import Any, AsyncIterator, Iterable, Iterator, List, Sequence
+from xml.sax.saxutils import escape
+
+from asgiref.sync import sync_to_async
+
+
+Row = Sequence[Any]
+
+
+class _Buffer(io.RawIOBase):
+    """Write-only stream whose content is taken out with `drain()`."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.chunks: List[bytes] = []
+        self.size = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        self.size = 0
+        return data
+
+
+# First characters that make spreadsheet programs read CSV text as a formula.
+_FORMULA_START = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, str) and value.startswith(_FORMULA_START):
+        return "'" + value
+    return value
+
+
+def csv_chunks(header: Row, rows: Iterable[Row], chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    """UTF-8 CSV with a byte order mark, which spreadsheet programs need to detect the encoding."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write(codecs.BOM_UTF8.decode())
+    writer.writerow(header)
+    for row in rows:
+        writer.writerow([_csv_value(value) for value in row])
+        if buffer.tell() >= chunk_size:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+# Characters XML 1.0 forbids even when escaped.
+_INVALID_XML = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f￾￿]')
+
+_XLSX_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" '
+        'ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/'
+        'vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/'
+        'vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Target="xl/workbook.xml" Type="http://schemas.'
+        'openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="{sheet}" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Target="worksheets/sheet1.xml" Type="http://schemas.'
+        'openxmlformats.org/officeDocument/2006/relationships/worksheet"/>'
+        '</Relationships>'
+    ),
+}
+
+_SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<sheetData>'
+)
+
+_SHEET_END = '</sheetData></worksheet>'
+
+
+def _column(index: int) -> str:
+    """Spreadsheet column letters of a zero-based index: A, B, ..., Z, AA, ..."""
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord('A') + remainder) + letters
+    return letters
+
+
+def _xlsx_row(number: int, row: Row) -> str:
+    cells = []
+    for index, value in enumerate(row):
+        reference = '{}{}'.format(_column(index), number)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            cells.append('<c r="{}"><v>{}</v></c>'.format(reference, value))
+        elif value is not None and value != '':
+            # An inline string is never evaluated, whatever it starts with.
+            text = escape(_INVALID_XML.sub('', str(value)))
+            cells.append(
+                '<c r="{}" t="inlineStr"><is><t xml:space="preserve">{}</t></is></c>'.format(
+                    reference, text
+                )
+            )
+    return '<row r="{}">{}</row>'.format(number, ''.join(cells))
+
+
+def xlsx_chunks(header: Row, rows: Iterable[Row], sheet: str = 'Sheet1',
+                chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    """A single-sheet XLSX workbook with inline strings and no styles."""
+    buffer = _Buffer()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, content in _XLSX_PARTS.items():
+            archive.writestr(name, content.format(sheet=escape(sheet, {'"': '&quot;'})))
+        with archive.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as worksheet:
+            worksheet.write((_SHEET_START + _xlsx_row(1, header)).encode())
+            for number, row in enumerate(rows, start=2):
+                worksheet.write(_xlsx_row(number, row).encode())
+                if buffer.size >= chunk_size:
+                    yield buffer.drain()
+            worksheet.write(_SHEET_END.encode())
+    yield buffer.drain()
+
+
+async def async_chunks(chunks: Iterator[bytes]) -> AsyncIterator[bytes]:
+    """Take the chunks of an encoder one at a time, each in the thread
+    of the request's synchronous code."""
+    while True:
+        chunk = await sync_to_async(next)(chunks, None)
+        if chunk is None:
+            return
+        yield chunk
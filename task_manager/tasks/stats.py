@@ -0,0 +1,155 @@
+"""Task statistics of the dashboard, read from rollups.
+
+The dashboard counts tasks by status, executor and label, and shows per
+day how many tasks were created and how many were last modified. None of
+it is computed from the tasks table on a request:
+
+* the counts by status, executor and label are the task counters of
+  statuses, users and labels, see counters.py;
+* the days are rows of `TaskDayStats`, where a task counts on the day
+  of its `date_created` and on the day of its `date_modified`.
+
+Both are maintained by the receivers in `task_manager.tasks.signals`
+within the transaction of the write. A modified task moves from the day
+of its previous modification to today, so the rollup always equals a
+GROUP BY over the current tasks and `rebuild_day_stats` reproduces it.
+Days are calendar days of the current time zone.
+
+`load_dashboard` reads all of it with one UNION ALL query.
+"""
+
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import (
+    CharField, Count, DateField, F, IntegerField, Max, QuerySet, Value,
+)
+from django.db.models.functions import Cast, Concat, TruncDate
+from django.utils import timezone
+
+from task_manager.labels.models import Label
+from task_manager.statuses.models import Status
+from task_manager.users.models import User
+
+from .models import Task, TaskDayStats
+
+
+COLUMNS: Tuple[str, ...] = ('created', 'modified')
+
+
+class DayStatDeltas:
+    """Changes of `TaskDayStats`, accumulated then written with one
+    UPDATE per day."""
+
+    def __init__(self) -> None:
+        self.deltas: Dict[date, Counter] = defaultdict(Counter)
+
+    def add(self, column: str, day: date, delta: int) -> None:
+        self.deltas[day][column] += delta
+
+    def add_task(self, created: datetime, modified: datetime, sign: int = 1) -> None:
+        """Count a task in (or, with `sign=-1`, out of) the days of its dates."""
+        self.add('created', timezone.localdate(created), sign)
+        self.add('modified', timezone.localdate(modified), sign)
+
+    def move_modified(self, tasks: QuerySet, now: datetime) -> None:
+        """Move the tasks from the days of their modification to `now`,
+        with one query. Call it before updating their `date_modified`."""
+        moved = 0
+        for day, count in count_by_day(tasks, 'date_modified'):
+            self.add('modified', day, -count)
+            moved += count
+        self.add('modified', timezone.localdate(now), moved)
+
+    def apply(self, using: Optional[str] = None) -> None:
+        changed = {
+            day: counter for day, counter in self.deltas.items() if any(counter.values())
+        }
+        if changed:
+            stats = TaskDayStats.objects.using(using)
+            stats.bulk_create([TaskDayStats(day=day) for day in changed], ignore_conflicts=True)
+            for day, counter in changed.items():
+                stats.filter(day=day).update(**{
+                    column: F(column) + delta for column, delta in counter.items() if delta
+                })
+        self.deltas.clear()
+
+
+def count_by_day(tasks: QuerySet, field: str) -> List[Tuple[date, int]]:
+    return list(tasks.order_by().annotate(
+        day=TruncDate(field)
+    ).values('day').annotate(count=Count('pk')).values_list('day', 'count'))
+
+
+def rebuild_day_stats(batch_size: int = 10000) -> int:
+    """Recount `TaskDayStats` from the tasks, reading `batch_size` tasks
+    by primary key range per transaction. Returns the number of batches.
+
+    Tasks written while it runs may be counted twice or not at all:
+    run it when the tasks are not being changed."""
+    TaskDayStats.objects.all().delete()
+    last = Task.objects.aggregate(last=Max('pk'))['last'] or 0
+    batches = 0
+    for start in range(1, last + 1, batch_size):
+        tasks = Task.objects.filter(pk__gte=start, pk__lt=start + batch_size)
+        deltas = DayStatDeltas()
+        for column in COLUMNS:
+            for day, count in count_by_day(tasks, 'date_' + column):
+                deltas.add(column, day, count)
+        with transaction.atomic():
+            deltas.apply()
+        batches += 1
+    return batches
+
+
+def dashboard_query(since: date) -> QuerySet:
+    """Rows of (kind, name, day, count, modified) for the counters of
+    statuses, executors and labels, and for the days since `since`."""
+
+    def rows(queryset: QuerySet, kind: str, name: Any, count: str,
+             day: Any = Cast(Value(None), DateField()),
+             modified: Any = Value(0, output_field=IntegerField())) -> QuerySet:
+        # Every column is an annotation, so all the branches list them in the same order.
+        columns = {
+            'stat_kind': Value(kind, output_field=CharField()), 'stat_name': name,
+            'stat_day': day, 'stat_count': F(count), 'stat_modified': modified,
+        }
+        return queryset.order_by().annotate(**columns).values_list(*columns)
+
+    full_name = Concat('first_name', Value(' '), 'last_name', output_field=CharField())
+    return rows(Status.objects.all(), 'statuses', F('name'), 'task_count').union(
+        rows(User.objects.filter(assigned_task_count__gt=0),
+             'executors', full_name, 'assigned_task_count'),
+        rows(Label.objects.all(), 'labels', F('name'), 'task_count'),
+        rows(TaskDayStats.objects.filter(day__gte=since), 'days',
+             Value('', output_field=CharField()), 'created', F('day'), F('modified')),
+        all=True,
+    )
+
+
+def load_dashboard(since: date) -> Dict[str, Any]:
+    """The task counts by status, executor and label, largest first,
+    and the (day, created, modified) rows from `since` to today."""
+    dashboard: Dict[str, Any] = {'statuses': [], 'executors': [], 'labels': []}
+    days: Dict[date, Tuple[int, int]] = {}
+    for kind, name, day, count, modified in dashboard_query(since):
+        if kind == 'days':
+            days[day] = (count, modified)
+        else:
+            dashboard[kind].append((name, count))
+    for counts in dashboard.values():
+        counts.sort(key=lambda row: (-row[1], row[0]))
+
+    dashboard['total'] = sum(count for _, count in dashboard['statuses'])
+    dashboard['unassigned'] = dashboard['total'] - sum(
+        count for _, count in dashboard['executors']
+    )
+    dashboard['days'] = [
+        (day, *days.get(day, (0, 0))) for day in (
+            since + timedelta(days=offset)
+            for offset in range((timezone.localdate() - since).days + 1)
+        )
+    ]
+    return dashboard
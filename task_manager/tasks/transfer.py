@@ -0,0 +1,237 @@
+"""Streaming import and export of tasks as CSV or JSON Lines.
+
+A row has the columns of `COLUMNS`. Status and labels are referenced by
+name, author and executor by username. In CSV the labels of a task are
+joined with `LABEL_SEPARATOR`, in JSON Lines they are a list. Imports
+create new tasks: the id and date columns are exported for reference
+and ignored on import.
+"""
+
+import csv
+import json
+import time
+from itertools import islice
+from typing import Any, Dict, IO, Iterable, Iterator, List, Optional, Tuple
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from task_manager.labels.models import Label
+from task_manager.pagination import iterate_by_keyset
+from task_manager.statuses.models import Status
+from task_manager.users.models import User
+
+from .cache import task_table_cache
+from .counters import CounterDeltas
+from .stats import DayStatDeltas
+from .models import Task, TaskLabel
+
+
+FORMATS = ('csv', 'jsonl')
+
+COLUMNS = (
+    'id', 'name', 'description', 'status', 'author', 'executor', 'labels',
+    'date_created', 'date_modified',
+)
+
+LABEL_SEPARATOR = '|'
+
+
+class TransferError(Exception):
+    """A row that cannot be imported, or invalid import options without a line."""
+
+    def __init__(self, line: Optional[int], message: str) -> None:
+        super().__init__('Row {}: {}'.format(line, message) if line else message.capitalize())
+        self.line = line
+
+
+class Throughput:
+    """Rows processed and the rate they were processed at."""
+
+    def __init__(self) -> None:
+        self.rows = 0
+        self.started = time.perf_counter()
+
+    @property
+    def seconds(self) -> float:
+        return time.perf_counter() - self.started
+
+    @property
+    def rows_per_second(self) -> float:
+        seconds = self.seconds
+        return self.rows / seconds if seconds else 0.0
+
+    def __str__(self) -> str:
+        return '{} rows in {:.2f}s ({:.0f} rows/s)'.format(
+            self.rows, self.seconds, self.rows_per_second
+        )
+
+
+def guess_format(path: str) -> str:
+    """The format of a file from its extension, CSV unless it is .jsonl or .ndjson."""
+    return 'jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv'
+
+
+def read_rows(stream: IO[str], format: str) -> Iterator[Dict[str, Any]]:
+    """Read rows one at a time, with the labels as a list of names."""
+    if format == 'jsonl':
+        for line in stream:
+            if line.strip():
+                yield json.loads(line)
+        return
+    for row in csv.DictReader(stream):
+        row['labels'] = label_names(row.get('labels'))
+        yield row
+
+
+def label_names(labels: Any) -> List[str]:
+    """The label names of a row: a list, or a string joined with `LABEL_SEPARATOR`."""
+    if not labels:
+        return []
+    if isinstance(labels, str):
+        return [name for name in labels.split(LABEL_SEPARATOR) if name]
+    return list(labels)
+
+
+class TaskWriter:
+    """Writes tasks to a stream, one row per task."""
+
+    def __init__(self, stream: IO[str], format: str) -> None:
+        self.stream = stream
+        self.format = format
+        if format == 'csv':
+            self.csv = csv.writer(stream)
+            self.csv.writerow(COLUMNS)
+
+    def write(self, task: Task) -> None:
+        row = export_row(task)
+        if self.format == 'jsonl':
+            self.stream.write(json.dumps(row, ensure_ascii=False) + '\n')
+        else:
+            row['labels'] = LABEL_SEPARATOR.join(row['labels'])
+            self.csv.writerow([row[column] for column in COLUMNS])
+
+
+def export_row(task: Task) -> Dict[str, Any]:
+    return {
+        'id': task.pk,
+        'name': task.name,
+        'description': task.description,
+        'status': task.status.name,
+        'author': task.author.username,
+        'executor': task.executor.username if task.executor else '',
+        'labels': [label.name for label in task.labels.all()],
+        'date_created': task.date_created.isoformat(),
+        'date_modified': task.date_modified.isoformat(),
+    }
+
+
+def export_tasks(stream: IO[str], format: str, chunk_size: int = 2000) -> Throughput:
+    """Write every task to the stream.
+
+    Tasks are read `chunk_size` rows at a time, with the labels of each
+    chunk prefetched, so memory stays constant however many tasks there are.
+    """
+    writer = TaskWriter(stream, format)
+    throughput = Throughput()
+    for task in iterate_by_keyset(Task.objects.for_export(), ('pk',), chunk_size):
+        writer.write(task)
+        throughput.rows += 1
+    return throughput
+
+
+class TaskImporter:
+    """Creates tasks from rows with bulk inserts.
+
+    Statuses, users and labels are resolved through lookup maps loaded once,
+    then every `batch_size` rows are inserted with one `bulk_create` of tasks
+    and one of task labels in a transaction of their own, together with the
+    task counters and day statistics of the batch. Bulk inserts send no signals, so the task
+    table cache is invalidated once at the end.
+    """
+
+    def __init__(self, batch_size: int = 1000, author: Optional[str] = None) -> None:
+        self.batch_size = batch_size
+        self.statuses = dict(Status.objects.values_list('name', 'pk'))
+        self.labels = dict(Label.objects.values_list('name', 'pk'))
+        self.users = dict(User.objects.values_list('username', 'pk'))
+        self.default_author = self.resolve(self.users, author, 'user', None) if author else None
+        self.throughput = Throughput()
+
+    def run(self, rows: Iterable[Dict[str, Any]]) -> Throughput:
+        """Import the rows, committing each batch. On a TransferError
+        the batches before the one with the invalid row stay imported."""
+        throughput = self.throughput = Throughput()
+        numbered = enumerate(rows, start=1)
+        try:
+            while True:
+                batch = [self.build(line, row) for line, row in islice(numbered, self.batch_size)]
+                if not batch:
+                    break
+                self.insert(batch)
+                throughput.rows += len(batch)
+        finally:
+            if throughput.rows:
+                task_table_cache.bump()
+        return throughput
+
+    def build(self, line: int, row: Dict[str, Any]) -> Tuple[Task, List[int]]:
+        """A task and its label ids from a row."""
+        if not row.get('name'):
+            raise TransferError(line, 'the task name is required')
+        author = row.get('author')
+        if not author and self.default_author is None:
+            raise TransferError(line, 'the author is required')
+        executor = row.get('executor')
+        task = Task(
+            name=row['name'],
+            description=row.get('description') or '',
+            status_id=self.resolve(self.statuses, row.get('status'), 'status', line),
+            author_id=self.resolve(self.users, author, 'user', line)
+            if author else self.default_author,
+            executor_id=self.resolve(self.users, executor, 'user', line) if executor else None,
+        )
+        self.validate(line, task)
+        labels = [
+            self.resolve(self.labels, name, 'label', line)
+            for name in label_names(row.get('labels'))
+        ]
+        return task, labels
+
+    def validate(self, line: int, task: Task) -> None:
+        """Check the lengths and blanks of the task fields, as the task form does.
+        Relations are resolved by name already, and an empty description is allowed."""
+        exclude = ['status', 'author', 'executor']
+        if not task.description:
+            exclude.append('description')
+        try:
+            task.clean_fields(exclude=exclude)
+        except ValidationError as error:
+            raise TransferError(line, '; '.join(
+                '{}: {}'.format(field, ' '.join(messages).rstrip('.'))
+                for field, messages in error.message_dict.items()
+            )) from None
+
+    def resolve(
+        self, lookup: Dict[str, int], name: Optional[str], kind: str, line: Optional[int]
+    ) -> int:
+        try:
+            return lookup[name]
+        except KeyError:
+            raise TransferError(line, 'unknown {} {!r}'.format(kind, name)) from None
+
+    @transaction.atomic
+    def insert(self, batch: List[Tuple[Task, List[int]]]) -> None:
+        tasks = Task.objects.bulk_create([task for task, _ in batch])
+        links = TaskLabel.objects.bulk_create([
+            TaskLabel(task_id=task.pk, label_id=label)
+            for task, (_, labels) in zip(tasks, batch)
+            for label in dict.fromkeys(labels)
+        ])
+        counters, days = CounterDeltas(), DayStatDeltas()
+        for task in tasks:
+            counters.add_task(task.status_id, task.author_id, task.executor_id)
+            days.add_task(task.date_created, task.date_modified)
+        counters.add_labels(link.label_id for link in links)
+        counters.apply()
+        days.apply()
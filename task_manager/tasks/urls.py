@@ -1,12 +1,23 @@
+from django.conf import settings
 from django.urls import path, URLPattern
 from typing import List
 
-from .views import TasksListView, TaskCreateView, TaskUpdateView, TaskDeleteView, TaskDetailView
+from .views import (
+    AsyncTasksListView, AsyncTaskDetailView, TasksListView, TasksExportView, TaskCreateView,
+    TaskUpdateView, TaskDeleteView, TaskDetailView, TasksBulkView, TasksDashboardView
+)
+
+# With ASYNC_VIEWS under ASGI the read-only pages are served by async views.
+ListView = AsyncTasksListView if settings.ASYNC_VIEWS else TasksListView
+DetailView = AsyncTaskDetailView if settings.ASYNC_VIEWS else TaskDetailView
 
 urlpatterns: List[URLPattern] = [
-    path('', TasksListView.as_view(), name='tasks'),
+    path('', ListView.as_view(), name='tasks'),
+    path('export/<str:format>/', TasksExportView.as_view(), name='tasks_export'),
+    path('dashboard/', TasksDashboardView.as_view(), name='tasks_dashboard'),
+    path('bulk/', TasksBulkView.as_view(), name='tasks_bulk'),
     path('create/', TaskCreateView.as_view(), name='task_create'),
-    path('<int:pk>/', TaskDetailView.as_view(), name='task_detail'),
+    path('<int:pk>/', DetailView.as_view(), name='task_detail'),
     path('<int:pk>/update/', TaskUpdateView.as_view(), name='task_update'),
     path('<int:pk>/delete/', TaskDeleteView.as_view(), name='task_delete')
 ]
@@ -1,21 +1,42 @@
 from django.utils.translation import gettext_lazy as _
-from django.urls import reverse_lazy
-from django.views.generic import CreateView, UpdateView, DeleteView, DetailView
+from django.urls import reverse, reverse_lazy
+from django.views.generic import (
+    CreateView, UpdateView, DeleteView, DetailView, FormView, TemplateView
+)
 from django.contrib import messages
 from django.contrib.messages.views import SuccessMessageMixin
 from django.shortcuts import redirect
 from django.forms.forms import BaseForm
-from django.http import HttpResponse
-from typing import Dict, Tuple, Type
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpRequest, HttpResponse, Http404, StreamingHttpResponse
+from django.db.models import Max, OuterRef, QuerySet, Subquery
+from django.template.loader import render_to_string
+from django.utils import timezone
+from datetime import timedelta
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Type
 
-from django_filters.views import FilterView
+from asgiref.sync import sync_to_async
+from django_filters.views import BaseFilterView, FilterView
 
+from .bulk import UNCHANGED, bulk_change
+from .cache import task_detail_cache, task_table_cache
 from .filters import TasksFilter
-from .models import Task, User
-from ..mixins import AuthorizationPermissionMixin
+from .forms import TaskForm, TasksBulkForm
+from .history import describe
+from .search import get_ordering
+from .spreadsheets import async_chunks, csv_chunks, xlsx_chunks
+from .stats import load_dashboard
+from .models import Task, TaskChange
+from ..db.routers import replica
+from ..pagination import InvalidCursor, KeysetPage, KeysetPaginator, iterate_by_keyset
+from ..mixins import (
+    AsyncGetMixin, AuthorizationPermissionMixin, ConditionalGetMixin, KeysetPaginationMixin,
+    MemoizedObjectMixin, Validators
+)
 
 
-class TasksListView(AuthorizationPermissionMixin, FilterView):
+class TasksListView(AuthorizationPermissionMixin, ConditionalGetMixin,
+                    KeysetPaginationMixin, FilterView):
     '''Show the list of tasks.'''
     model: Type[Task] = Task
     context_object_name: str = 'tasks'
@@ -26,6 +47,189 @@ class TasksListView(AuthorizationPermissionMixin, FilterView):
         'button_text': _('Search')
     }
     filterset_class: Type[TasksFilter] = TasksFilter
+    paginate_by: int = 50
+    table_template_name: str = 'tasks/task_table.html'
+    cached_table: Optional[str] = None
+    table_key: Optional[str] = None
+
+    def get_queryset(self) -> QuerySet:
+        '''Fetches the task table rows with their relations in one query.'''
+        return Task.objects.for_list()
+
+    def get_keyset_ordering(self, queryset: QuerySet) -> Tuple[str, ...]:
+        '''Search results are paginated by rank.'''
+        return get_ordering(queryset, self.keyset_ordering)
+
+    def get_validators(self) -> Optional[Validators]:
+        '''The board generation changes with any task, status, label
+        or user the page shows, and costs a cache read, not a query.'''
+        generation = task_table_cache.generation()
+        return None if generation is None else ((generation,), None)
+
+    def get_paginate_by(self, queryset: QuerySet) -> Optional[int]:
+        '''A cached table already contains its page, so nothing is paginated.'''
+        if self.cached_table is not None:
+            return None
+        return super().get_paginate_by(queryset)
+
+    def get_context_data(self, **kwargs: Any) -> Dict[str, Any]:
+        '''Renders the task table, or takes it from the cache
+        without querying the tasks.
+
+        A replica may not have the rows of the current board generation
+        yet, so a table read from one is neither cached nor sent with
+        validators that would let the browser keep it.'''
+        if self.table_key is None:
+            self.table_key = task_table_cache.make_key(self.request)
+            self.cached_table = task_table_cache.get(self.table_key)
+        context = super().get_context_data(**kwargs)
+        if self.cached_table is None:
+            self.cached_table = render_to_string(self.table_template_name, context, self.request)
+            if replica.get() is None:
+                task_table_cache.set(self.table_key, self.cached_table)
+            else:
+                self.etag = None
+        context['task_table'] = self.cached_table
+        return context
+
+
+class AsyncTasksListView(AsyncGetMixin, TasksListView):
+    '''Show the list of tasks from an async view.'''
+
+    async def aget_response(self, request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+        '''Filters the tasks in a thread, where the filters take their choices
+        from the choices cache. Then takes the table from the cache, or reads
+        its page with the async ORM, so that rendering it needs no query.'''
+        await sync_to_async(self.filter_tasks)()
+        self.cached_table = await task_table_cache.aget(self.table_key)
+        if self.cached_table is None:
+            await self.aread_page(self.object_list)
+        context = await sync_to_async(self.get_context_data)(
+            filter=self.filterset, object_list=self.object_list
+        )
+        return self.render_to_response(context)
+
+    def filter_tasks(self) -> None:
+        '''Filters the tasks as FilterView does and keys the table cache.'''
+        self.filterset = self.get_filterset(self.get_filterset_class())
+        if not self.filterset.is_bound or self.filterset.is_valid() or not self.get_strict():
+            self.object_list = self.filterset.qs
+        else:
+            self.object_list = self.filterset.queryset.none()
+        self.table_key = task_table_cache.make_key(self.request)
+
+
+class TasksExportView(AuthorizationPermissionMixin, BaseFilterView):
+    '''Download the filtered task list as a spreadsheet.'''
+    filterset_class: Type[TasksFilter] = TasksFilter
+    ordering: Tuple[str, ...] = TasksListView.keyset_ordering
+    chunk_size: int = 2000
+    formats: Dict[str, Tuple[str, Callable[..., Iterator[bytes]]]] = {
+        'csv': ('text/csv; charset=utf-8', csv_chunks),
+        'xlsx': (
+            'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+            xlsx_chunks,
+        ),
+    }
+
+    def get_queryset(self) -> QuerySet:
+        return Task.objects.for_export()
+
+    def get_header(self) -> List[str]:
+        return [
+            'ID', _('Task name'), _('Status'), _('Author'), _('Executor'),
+            _('Labels'), _('Created at'), _('Modified at'),
+        ]
+
+    def get_rows(self) -> Iterator[List[Any]]:
+        '''Reads the filtered tasks `chunk_size` rows at a time, in the order
+        of the task list, while the response is being sent.'''
+        ordering = get_ordering(self.object_list, self.ordering)
+        for task in iterate_by_keyset(self.object_list, ordering, self.chunk_size):
+            yield self.get_row(task)
+
+    def get_row(self, task: Task) -> List[Any]:
+        return [
+            task.pk, task.name, task.status.name, str(task.author),
+            str(task.executor) if task.executor else '',
+            ', '.join(label.name for label in task.labels.all()),
+            timezone.localtime(task.date_created).strftime('%Y-%m-%d %H:%M'),
+            timezone.localtime(task.date_modified).strftime('%Y-%m-%d %H:%M'),
+        ]
+
+    def render_to_response(self, context: Dict[str, Any]) -> StreamingHttpResponse:
+        '''Streams the spreadsheet in the format of the URL, from an async
+        iterator under ASGI, which would otherwise read it all at once.'''
+        try:
+            content_type, encode = self.formats[self.kwargs['format']]
+        except KeyError:
+            raise Http404(_('Unknown export format'))
+        chunks = encode([str(title) for title in self.get_header()], self.get_rows())
+        if isinstance(self.request, ASGIRequest):
+            chunks = async_chunks(chunks)
+        response = StreamingHttpResponse(chunks, content_type=content_type)
+        response['Content-Disposition'] = 'attachment; filename="tasks-{}.{}"'.format(
+            timezone.localdate().isoformat(), self.kwargs['format']
+        )
+        return response
+
+
+class TasksBulkView(AuthorizationPermissionMixin, FormView):
+    '''Change the status, the executor or the labels of many tasks at once:
+    those listed by ID, or else those of the filter in the query string.'''
+    form_class: Type[TasksBulkForm] = TasksBulkForm
+    template_name: str = 'tasks/task_bulk.html'
+    extra_context: Dict = {
+        'page_title': _('Tasks change'),
+        'page_description': _('Change of many tasks on Task Manager.'),
+        'page_h1': _('Change tasks'),
+        'button_text': _('Apply')
+    }
+
+    def get_filterset(self) -> TasksFilter:
+        return TasksFilter(self.request.GET, queryset=Task.objects.all(), request=self.request)
+
+    def get_context_data(self, **kwargs: Any) -> Dict[str, Any]:
+        '''Adds the number of tasks of the filter.'''
+        context = super().get_context_data(**kwargs)
+        filterset = self.get_filterset()
+        context['filtered_count'] = filterset.qs.count() if filterset.is_valid() else None
+        return context
+
+    def form_valid(self, form: TasksBulkForm) -> HttpResponse:
+        '''Changes the tasks with set-based statements, see bulk.py.'''
+        data = form.cleaned_data
+        tasks = data['ids']
+        if not tasks:
+            filterset = self.get_filterset()
+            # An invalid filter would be ignored and select every task.
+            if not filterset.is_valid():
+                form.add_error(None, _('The task filter is invalid.'))
+                return self.form_invalid(form)
+            tasks = filterset.qs
+        result = bulk_change(tasks, **self.get_changes(data))
+        messages.success(self.request, _(
+            'Tasks changed: %(changed)d of %(selected)d. '
+            'Labels added: %(added)d, removed: %(removed)d.'
+        ) % {
+            'changed': result.changed, 'selected': result.selected,
+            'added': result.labels_added, 'removed': result.labels_removed,
+        })
+        query = self.request.GET.urlencode()
+        return redirect(reverse('tasks') + ('?' + query if query else ''))
+
+    def get_changes(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        executor = UNCHANGED
+        if data['unassign']:
+            executor = None
+        elif data['executor']:
+            executor = data['executor'].pk
+        return {
+            'status_id': data['status'].pk if data['status'] else None,
+            'executor_id': executor,
+            'add_labels': [label.pk for label in data['add_labels']],
+            'remove_labels': [label.pk for label in data['remove_labels']],
+        }
 
 
 class TaskCreateView(AuthorizationPermissionMixin,
@@ -38,18 +242,18 @@ class TaskCreateView(AuthorizationPermissionMixin,
         'page_h1': _('Create task'),
         'button_text': _('Create')
     }
-    fields: Tuple = ('name', 'status', 'description', 'executor', 'labels')
+    form_class: Type[TaskForm] = TaskForm
     success_url = reverse_lazy('tasks')
     success_message: str = _('Task created successfully')
 
     def form_valid(self, form: BaseForm) -> HttpResponse:
-        '''Sets the author of the task by the ID of the current user.'''
-        user: User = self.request.user
-        form.instance.author: BaseForm[User] = User.objects.get(id=user.id)
+        '''Sets the author of the task: the current user, already loaded
+        by the authentication middleware.'''
+        form.instance.author = self.request.user
         return super(TaskCreateView, self).form_valid(form)
 
 
-class TaskUpdateView(AuthorizationPermissionMixin,
+class TaskUpdateView(AuthorizationPermissionMixin, MemoizedObjectMixin,
                      SuccessMessageMixin, UpdateView):
     '''Change a task.'''
     model: Type[Task] = Task
@@ -59,12 +263,12 @@ class TaskUpdateView(AuthorizationPermissionMixin,
         'page_h1': _('Change task'),
         'button_text': _('Update')
     }
-    fields: Tuple = ('name', 'status', 'description', 'executor', 'labels')
+    form_class: Type[TaskForm] = TaskForm
     success_url = reverse_lazy('tasks')
     success_message: str = _('Task changed successfully')
 
 
-class TaskDeleteView(AuthorizationPermissionMixin,
+class TaskDeleteView(AuthorizationPermissionMixin, MemoizedObjectMixin,
                      SuccessMessageMixin, DeleteView):
     '''Delete a task.'''
     model: Type[Task] = Task
@@ -81,17 +285,139 @@ class TaskDeleteView(AuthorizationPermissionMixin,
     def dispatch(self, request, *args, **kwargs):
         '''Specifies access settings for the current user.
         Provides access if the user is authenticated.'''
-        if request.user.id != self.get_object().author.id:
+        if request.user.id != self.get_object().author_id:
             if request.user.is_authenticated:
                 messages.error(self.request, _('A task can only be deleted by its author.'))
             return redirect(reverse_lazy('tasks'))
         return super().dispatch(request, *args, **kwargs)
 
 
-class TaskDetailView(AuthorizationPermissionMixin, DetailView):
+class TaskDetailView(AuthorizationPermissionMixin, ConditionalGetMixin, DetailView):
     model: Type[Task] = Task
     extra_context: Dict = {
         'page_title': _('Task view'),
         'page_description': _('Task detail view on Task Manager.'),
         'page_h1': _('Task view')
     }
+
+    cache_key: Optional[str] = None
+    history_size: int = 10
+    history_kwarg: str = 'history'
+
+    def get_queryset(self) -> QuerySet:
+        return Task.objects.for_detail()
+
+    def get_validators(self) -> Optional[Validators]:
+        '''Reads the modification dates of the task and of the status,
+        users and labels it shows, and the latest entry of its history,
+        in one query. With the names generation, which changes with the
+        names the history shows, they also key the task in the detail cache.'''
+        history = TaskChange.objects.filter(task=OuterRef('pk')).order_by('-date_changed', '-id')
+        row = Task.objects.filter(pk=self.kwargs['pk']).annotate(
+            labels_modified=Max('labels__date_modified'),
+            history_changed=Subquery(history.values('date_changed')[:1]),
+            history_id=Subquery(history.values('id')[:1]),
+        ).values_list(
+            'date_modified', 'status__date_modified', 'author__date_modified',
+            'executor__date_modified', 'labels_modified', 'history_changed', 'history_id'
+        ).first()
+        names = task_detail_cache.names.get()
+        if row is None or names is None:
+            return None
+        validators = row + (names,)
+        self.cache_key = task_detail_cache.make_key(self.kwargs['pk'], validators)
+        # All columns but the id of the latest entry are dates.
+        return validators, max(date for date in row[:-1] if date is not None)
+
+    def get_object(self, queryset: Optional[QuerySet] = None) -> Task:
+        '''Takes the task from the detail cache, or reads it with its
+        relations in two queries and the first page of its history,
+        and caches it.'''
+        task = task_detail_cache.get(self.cache_key) if self.cache_key else None
+        if task is None:
+            task = super().get_object(queryset)
+            task.history = self.get_history(None)
+            if self.cache_key:
+                task_detail_cache.set(self.cache_key, task)
+        return task
+
+    def get_history(self, cursor: Optional[str]) -> KeysetPage:
+        '''Reads a page of the task history, newest first, by keyset over
+        the (task, date_changed, id) index. The validators cover the latest
+        entry and the names it shows, so the first page is cached with the task.'''
+        paginator = KeysetPaginator(
+            TaskChange.objects.filter(task_id=self.kwargs['pk']), self.history_size,
+            ('-date_changed', '-id')
+        )
+        try:
+            page = paginator.page(cursor)
+        except InvalidCursor as error:
+            raise Http404(_('Invalid cursor: %(message)s') % {'message': error})
+        describe(list(page.object_list))
+        return page
+
+    def get_context_data(self, **kwargs: Any) -> Dict[str, Any]:
+        '''Adds the page of the history addressed by the query string.'''
+        if 'history' not in kwargs:
+            cursor = self.request.GET.get(self.history_kwarg)
+            kwargs['history'] = self.get_history(cursor) if cursor else self.object.history
+        context = super().get_context_data(**kwargs)
+        history = context['history']
+        context['older_history_query'] = self.get_history_query(history.next_cursor)
+        context['newer_history_query'] = self.get_history_query(history.previous_cursor)
+        return context
+
+    def get_history_query(self, cursor: Optional[str]) -> Optional[str]:
+        if cursor is None:
+            return None
+        params = self.request.GET.copy()
+        params[self.history_kwarg] = cursor
+        return params.urlencode()
+
+
+class AsyncTaskDetailView(AsyncGetMixin, TaskDetailView):
+    '''Show a task from an async view.'''
+
+    async def aget_response(self, request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+        '''Takes the task from the detail cache, or reads it with its status,
+        users and labels with the async ORM, so that the template needs no query.
+        The history is read in a thread.'''
+        self.object = await task_detail_cache.aget(self.cache_key) if self.cache_key else None
+        if self.object is None:
+            try:
+                self.object = await self.get_queryset().aget(pk=self.kwargs['pk'])
+            except Task.DoesNotExist:
+                raise Http404(_('No task found matching the query'))
+            self.object.history = await sync_to_async(self.get_history)(None)
+            if self.cache_key:
+                await task_detail_cache.aset(self.cache_key, self.object)
+        cursor = request.GET.get(self.history_kwarg)
+        history = await sync_to_async(self.get_history)(cursor) if cursor else self.object.history
+        return self.render_to_response(self.get_context_data(object=self.object, history=history))
+
+
+class TasksDashboardView(AuthorizationPermissionMixin, ConditionalGetMixin, TemplateView):
+    '''Show task statistics of the board.'''
+    template_name: str = 'tasks/task_dashboard.html'
+    extra_context: Dict = {
+        'page_title': _('Dashboard'),
+        'page_description': _('Task statistics of Task Manager.'),
+        'page_h1': _('Dashboard')
+    }
+    trend_days: int = 14
+
+    def get_validators(self) -> Optional[Validators]:
+        '''The board generation, and the day, which moves the trend window.'''
+        generation = task_table_cache.generation()
+        if generation is None:
+            return None
+        return (generation, timezone.localdate()), None
+
+    def get_context_data(self, **kwargs: Any) -> Dict[str, Any]:
+        '''Reads every statistic from the rollups in one query.'''
+        context = super().get_context_data(**kwargs)
+        context.update(load_dashboard(timezone.localdate() - timedelta(days=self.trend_days - 1)))
+        context['peak'] = max(
+            [max(created, modified) for _, created, modified in context['days']] + [1]
+        )
+        return context
@@ -0,0 +1,67 @@
+"""Test runner of the project, set by the TEST_RUNNER setting."""
+
+import os
+import shutil
+import tempfile
+import unittest
+from typing import Any, Dict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+from task_manager.caching import SCHEMES
+from task_manager.tasks.choices import choices_cache
+
+
+class CacheClearingResultMixin:
+    """Clear every cache before each test.
+
+    Test cases roll back their data without sending signals, so tables,
+    pages and filter choices cached by one test, under keys that no save
+    has changed since, would be served to the next one.
+    """
+
+    def startTest(self, test: unittest.TestCase) -> None:
+        for cache in caches.all():
+            cache.clear()
+        choices_cache.clear()
+        super().startTest(test)
+
+
+class TestRunner(DiscoverRunner):
+    """Run the tests with the configured cache backends, cleared per test.
+
+    Caches kept in files are moved to a directory of the run, so that
+    clearing them neither wipes the cache of an instance on the same host
+    nor the one of another test run.
+    """
+
+    def setup_test_environment(self, **kwargs: Any) -> None:
+        self.cache_dir = tempfile.mkdtemp(prefix='task_manager_test_cache_')
+        self.cache_settings = override_settings(CACHES={
+            alias: _isolate(alias, cache, self.cache_dir)
+            for alias, cache in settings.CACHES.items()
+        })
+        self.cache_settings.enable()
+        super().setup_test_environment(**kwargs)
+
+    def teardown_test_environment(self, **kwargs: Any) -> None:
+        super().teardown_test_environment(**kwargs)
+        caches.close_all()
+        self.cache_settings.disable()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def get_resultclass(self):
+        result_class = super().get_resultclass() or unittest.TextTestResult
+        return type(result_class.__name__, (CacheClearingResultMixin, result_class), {})
+
+
+def _isolate(alias: str, cache: Dict[str, Any], directory: str) -> Dict[str, Any]:
+    """Return the cache settings with a file location moved into `directory`."""
+    if cache['BACKEND'] == SCHEMES['file']:
+        return dict(cache, LOCATION=os.path.join(directory, alias))
+    if cache['BACKEND'] == SCHEMES['sqlite']:
+        return dict(cache, LOCATION=os.path.join(directory, alias + '.sqlite3'))
+    return cache
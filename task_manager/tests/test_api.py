@@ -0,0 +1,97 @@
+from django.test import TestCase, Client
+from django.urls import reverse_lazy
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from http import HTTPStatus
+
+from task_manager.tasks.models import Task
+from task_manager.labels.models import Label
+from task_manager.users.models import User
+
+
+class ApiTest(TestCase):
+
+    fixtures = ['task.json', 'label.json', 'status.json', 'user.json']
+
+    def setUp(self) -> None:
+        self.client: Client = Client()
+        self.client.force_login(User.objects.get(pk=1))
+
+    def test_authentication_required(self) -> None:
+        response = Client().get(reverse_lazy('api_tasks'))
+        self.assertEqual(response.status_code, HTTPStatus.UNAUTHORIZED)
+
+    def test_tasks_list(self) -> None:
+        response = self.client.get(reverse_lazy('api_tasks'))
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertTrue(response['ETag'].startswith('"'))
+
+        data = response.json()
+        self.assertEqual([task['id'] for task in data['results']], [1, 2, 3])
+        self.assertEqual(data['results'][0]['labels'], [1, 3])
+        self.assertEqual(data['results'][0]['status'], 3)
+        self.assertIsNone(data['next'])
+
+    def test_tasks_list_filters_and_pages(self) -> None:
+        response = self.client.get(reverse_lazy('api_tasks'), {'status': 1, 'limit': 1})
+        data = response.json()
+        self.assertEqual([task['id'] for task in data['results']], [2])
+
+        data = self.client.get(data['next']).json()
+        self.assertEqual([task['id'] for task in data['results']], [3])
+        self.assertIsNone(data['next'])
+        self.assertIsNotNone(data['previous'])
+
+        response = self.client.get(reverse_lazy('api_tasks'), {'status': 99})
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        self.assertIn('status', response.json()['detail'])
+
+    def test_tasks_search(self) -> None:
+        data = self.client.get(reverse_lazy('api_tasks'), {'q': 'cloud', 'limit': 1}).json()
+        self.assertEqual(len(data['results']), 1)
+        data = self.client.get(data['next']).json()
+        self.assertEqual(len(data['results']), 1)
+        self.assertIsNone(data['next'])
+
+    def test_not_modified_without_serializing(self) -> None:
+        url = reverse_lazy('api_tasks')
+        etag = self.client.get(url)['ETag']
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+        # The session, the user and the aggregate.
+        self.assertEqual(len(queries), 3)
+
+    def test_etag_changes_with_the_rows(self) -> None:
+        url = reverse_lazy('api_tasks')
+        etag = self.client.get(url)['ETag']
+
+        Task.objects.get(pk=3).labels.add(Label.objects.get(pk=2))
+        relabelled = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(relabelled.status_code, HTTPStatus.OK)
+
+        Task.objects.get(pk=3).delete()
+        deleted = self.client.get(url, HTTP_IF_NONE_MATCH=relabelled['ETag'])
+        self.assertEqual(deleted.status_code, HTTPStatus.OK)
+        self.assertEqual(len(deleted.json()['results']), 2)
+
+    def test_detail(self) -> None:
+        url = reverse_lazy('api_status', args=[1])
+        response = self.client.get(url)
+        self.assertEqual(response.json()['name'], 'New')
+        self.assertIn('Last-Modified', response)
+
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+        response = self.client.get(reverse_lazy('api_task', args=[99]))
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_users_hide_credentials(self) -> None:
+        data = self.client.get(reverse_lazy('api_users')).json()
+        self.assertEqual(len(data['results']), 3)
+        self.assertNotIn('password', data['results'][0])
+        self.assertNotIn('email', data['results'][0])
@@ -0,0 +1,94 @@
+from django.test import TestCase, override_settings
+from django.urls import path, reverse_lazy
+from asgiref.sync import sync_to_async
+
+from http import HTTPStatus
+from unittest import mock
+
+from task_manager.urls import urlpatterns as project_urlpatterns
+from task_manager.labels.views import AsyncLabelsListView
+from task_manager.statuses.views import AsyncStatusesListView
+from task_manager.tasks.views import AsyncTasksListView, AsyncTaskDetailView
+from task_manager.users.models import User
+from task_manager.users.views import AsyncUsersListView
+
+# The project URLs with the async views ASGI deployments use, matched first.
+urlpatterns = [
+    path('statuses/', AsyncStatusesListView.as_view()),
+    path('labels/', AsyncLabelsListView.as_view()),
+    path('users/', AsyncUsersListView.as_view()),
+    path('tasks/', AsyncTasksListView.as_view()),
+    path('tasks/<int:pk>/', AsyncTaskDetailView.as_view()),
+] + project_urlpatterns
+
+
+@override_settings(ROOT_URLCONF='task_manager.tests.test_async', CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'shared'},
+})
+class AsyncViewsTest(TestCase):
+
+    fixtures = ['task.json', 'label.json', 'status.json', 'user.json']
+
+    async def login(self) -> None:
+        user = await User.objects.aget(pk=1)
+        await sync_to_async(self.async_client.force_login)(user)
+
+    async def test_lists(self) -> None:
+        await self.login()
+        for route, template, text in (
+            ('statuses', 'statuses/status_list.html', 'In progress'),
+            ('labels', 'labels/label_list.html', 'Optimization'),
+            ('users', 'users/user_list.html', 'Hermione Jean Granger'),
+            ('tasks', 'tasks/task_filter.html', 'Implement functionality'),
+        ):
+            response = await self.async_client.get(reverse_lazy(route))
+            self.assertEqual(response.status_code, HTTPStatus.OK)
+            self.assertTemplateUsed(response, template_name=template)
+            self.assertContains(response, text)
+
+    @mock.patch.object(AsyncTasksListView, 'paginate_by', 2)
+    async def test_task_list_pages(self) -> None:
+        await self.login()
+        route = reverse_lazy('tasks')
+        response = await self.async_client.get(route)
+        self.assertEqual(len(response.context['tasks']), 2)
+        older = await self.async_client.get(
+            '{}?{}'.format(route, response.context['next_page_query'])
+        )
+        self.assertEqual(len(older.context['tasks']), 1)
+        self.assertIsNotNone(older.context['previous_page_query'])
+
+        response = await self.async_client.get(route, {'cursor': 'broken'})
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    async def test_export(self) -> None:
+        await self.login()
+        for format in ('csv', 'xlsx'):
+            response = await self.async_client.get(reverse_lazy('tasks_export', args=[format]))
+            self.assertEqual(response.status_code, HTTPStatus.OK)
+            self.assertTrue(response.is_async)
+            content = b''.join([chunk async for chunk in response.streaming_content])
+            if format == 'csv':
+                self.assertEqual(len(content.decode('utf-8-sig').splitlines()), 4)
+            else:
+                self.assertTrue(content.startswith(b'PK'))
+
+    async def test_login_required(self) -> None:
+        response = await self.async_client.get(reverse_lazy('statuses'))
+        self.assertRedirects(response, reverse_lazy('login'), fetch_redirect_response=False)
+
+    async def test_conditional_get(self) -> None:
+        await self.login()
+        route = reverse_lazy('task_detail', args=[1])
+        response = await self.async_client.get(route)
+        self.assertContains(response, 'Optimization')
+
+        # The async client of Django 4.1 takes headers by their HTTP names.
+        response = await self.async_client.get(route, **{'If-None-Match': response['ETag']})
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+    async def test_detail_not_found(self) -> None:
+        await self.login()
+        response = await self.async_client.get(reverse_lazy('task_detail', args=[99]))
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
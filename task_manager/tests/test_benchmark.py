@@ -0,0 +1,87 @@
+from django.test import TestCase
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+import json
+import os
+import tempfile
+from io import StringIO
+from typing import Any, Dict
+
+from task_manager.tasks.models import Task, TaskDayStats, TaskLabel
+from task_manager.labels.models import Label
+from task_manager.statuses.models import Status
+from task_manager.users.models import User
+
+
+class SeedBenchmarkTest(TestCase):
+
+    def counters(self) -> Dict[str, Any]:
+        return {
+            'statuses': dict(Status.objects.values_list('pk', 'task_count')),
+            'labels': dict(Label.objects.values_list('pk', 'task_count')),
+            'users': list(User.objects.order_by('pk').values_list(
+                'authored_task_count', 'assigned_task_count'
+            )),
+            'days': list(TaskDayStats.objects.values_list('day', 'created', 'modified')),
+        }
+
+    def test_seed(self) -> None:
+        output = StringIO()
+        call_command('seed_benchmark', users=20, statuses=3, labels=10, tasks=250,
+                     batch_size=100, stdout=output)
+        self.assertIn('Seeded 20 users, 3 statuses, 10 labels, 250 tasks', output.getvalue())
+        self.assertEqual(User.objects.count(), 20)
+        self.assertEqual(Task.objects.count(), 250)
+        self.assertTrue(TaskLabel.objects.exists())
+        self.assertTrue(User.objects.first().check_password('benchmark'))
+
+        # The counters and day statistics were kept by the seeding.
+        counters = self.counters()
+        self.assertEqual(sum(counters['statuses'].values()), 250)
+        call_command('rebuild_task_stats', stdout=StringIO())
+        self.assertEqual(self.counters(), counters)
+
+    def test_seed_again(self) -> None:
+        call_command('seed_benchmark', users=2, statuses=2, labels=2, tasks=0, stdout=StringIO())
+        call_command('seed_benchmark', users=2, statuses=2, labels=2, tasks=0, stdout=StringIO())
+        self.assertEqual(Status.objects.count(), 4)
+
+
+class BenchmarkViewsTest(TestCase):
+
+    fixtures = ['task.json', 'label.json', 'status.json', 'user.json']
+
+    def run_benchmark(self, *args: str) -> Dict[str, Any]:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'results.json')
+            call_command('benchmark_views', *args, requests=2, warmup=0,
+                         output=path, stdout=StringIO(), stderr=StringIO())
+            with open(path) as results:
+                return json.load(results)
+
+    def test_results(self) -> None:
+        report = self.run_benchmark()
+        results = report['results']
+        self.assertEqual(report['environment']['tasks'], 3)
+        self.assertNotIn('logout', results)
+        self.assertNotIn('admin:index', results)
+        for name in ('tasks', 'task_detail', 'task_delete', 'user_update', 'api_tasks'):
+            self.assertEqual(results[name]['status'], 200, name)
+        self.assertEqual(results['user_update']['url'], '/users/1/update/')
+        self.assertGreater(results['tasks']['queries'], 0)
+        self.assertEqual(set(results['tasks']), {
+            'url', 'status', 'requests', 'rps', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms', 'queries',
+        })
+
+    def test_baseline(self) -> None:
+        report = self.run_benchmark('tasks', 'tasks_export')
+        self.assertGreater(report['results']['tasks_export']['queries'], 0)
+        report['results']['tasks']['queries'] -= 1
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'baseline.json')
+            with open(path, 'w') as baseline:
+                json.dump(report, baseline)
+            with self.assertRaisesMessage(CommandError, 'tasks: '):
+                call_command('benchmark_views', 'tasks', requests=2, warmup=0,
+                             baseline=path, tolerance=100, stdout=StringIO())
@@ -0,0 +1,174 @@
+from django.test import TestCase, Client
+from django.urls import reverse_lazy
+from django.core.management import call_command
+from django.contrib.messages import get_messages
+from django.db import connection
+from django.db.models import QuerySet
+from django.test.utils import CaptureQueriesContext
+
+from http import HTTPStatus
+from io import StringIO
+from typing import Any, Dict
+from unittest import mock
+
+from task_manager.tasks.bulk import bulk_change
+from task_manager.tasks.models import Task, TaskDayStats, TaskLabel
+from task_manager.labels.models import Label
+from task_manager.statuses.models import Status
+from task_manager.users.models import User
+
+
+class BulkChangeTest(TestCase):
+
+    fixtures = ['task.json', 'label.json', 'status.json', 'user.json']
+
+    def setUp(self) -> None:
+        # Fixtures are loaded raw, without the counting signals.
+        call_command('rebuild_task_stats', stdout=StringIO())
+
+    def rollups(self) -> Dict[str, Any]:
+        return {
+            'statuses': dict(Status.objects.values_list('pk', 'task_count')),
+            'labels': dict(Label.objects.values_list('pk', 'task_count')),
+            'users': list(User.objects.order_by('pk').values_list(
+                'authored_task_count', 'assigned_task_count'
+            )),
+            'days': list(TaskDayStats.objects.exclude(created=0, modified=0).order_by(
+                'day'
+            ).values_list('day', 'created', 'modified')),
+        }
+
+    def assertRollupsRebuilt(self) -> None:
+        '''The rollups kept by the bulk change equal those recounted from the tasks.'''
+        rollups = self.rollups()
+        call_command('rebuild_task_stats', stdout=StringIO())
+        self.assertEqual(rollups, self.rollups())
+
+    def test_status_of_a_filter(self) -> None:
+        selected = Task.objects.filter(status=1)
+        ids = set(selected.values_list('pk', flat=True))
+        result = bulk_change(selected, status_id=3, chunk_size=1)
+
+        self.assertEqual((result.selected, result.changed), (len(ids), len(ids)))
+        self.assertEqual(set(Task.objects.filter(status=3).values_list('pk', flat=True)),
+                         ids | {1})
+        self.assertRollupsRebuilt()
+
+    def test_only_changed_tasks_are_touched(self) -> None:
+        modified = dict(Task.objects.filter(status=1).values_list('pk', 'date_modified'))
+        result = bulk_change([1, 2, 3], status_id=1)
+
+        self.assertEqual((result.selected, result.changed), (3, 3 - len(modified)))
+        self.assertEqual(
+            dict(Task.objects.filter(pk__in=modified).values_list('pk', 'date_modified')),
+            modified
+        )
+        self.assertEqual(bulk_change([1, 2, 3], status_id=1).changed, 0)
+        self.assertRollupsRebuilt()
+
+    def test_executor(self) -> None:
+        result = bulk_change([1, 2], executor_id=3)
+        self.assertEqual(result.changed, 2)
+        self.assertEqual(set(Task.objects.filter(executor=3).values_list('pk', flat=True)),
+                         {1, 2})
+        bulk_change(Task.objects.all(), executor_id=None)
+        self.assertFalse(Task.objects.filter(executor__isnull=False).exists())
+        self.assertRollupsRebuilt()
+
+    def test_labels(self) -> None:
+        links = TaskLabel.objects.filter(task__in=[1, 2, 3])
+        missing = 3 - links.filter(label=2).count()
+        removed = links.filter(label=1).count()
+        result = bulk_change([1, 2, 3, 99], add_labels=[2], remove_labels=[1])
+
+        self.assertEqual(result.selected, 3)
+        self.assertEqual((result.labels_added, result.labels_removed), (missing, removed))
+        self.assertEqual(TaskLabel.objects.filter(label=2).count(), 3)
+        self.assertFalse(TaskLabel.objects.filter(label=1).exists())
+        self.assertRollupsRebuilt()
+
+        result = bulk_change([1, 2, 3], add_labels=[2], remove_labels=[1])
+        self.assertEqual((result.changed, result.labels_added, result.labels_removed), (0, 0, 0))
+
+    def test_queries_do_not_grow_with_the_selection(self) -> None:
+        '''Queries depend on the statuses, users, labels and days changed, not on the tasks.'''
+        bulk_change(Task.objects.all(), status_id=3, executor_id=3)
+        change = {'status_id': 2, 'executor_id': 2, 'add_labels': [2], 'remove_labels': [1]}
+        with CaptureQueriesContext(connection) as one:
+            bulk_change([1], **change)
+        with CaptureQueriesContext(connection) as two:
+            bulk_change([2, 3], **change)
+        self.assertEqual(len(two), len(one))
+
+    def test_chunk_rows_are_locked(self) -> None:
+        with mock.patch.object(QuerySet, 'select_for_update', autospec=True,
+                               side_effect=QuerySet.select_for_update) as lock:
+            bulk_change([1, 2], status_id=1, add_labels=[2])
+        self.assertEqual({call.args[0].model for call in lock.call_args_list}, {Task, TaskLabel})
+
+
+class TasksBulkViewTest(TestCase):
+
+    fixtures = ['task.json', 'label.json', 'status.json', 'user.json']
+
+    def setUp(self) -> None:
+        self.client: Client = Client()
+        self.client.force_login(User.objects.get(pk=1))
+
+    def test_bulk_view(self) -> None:
+        response = self.client.get(reverse_lazy('tasks_bulk'), {'status': 1})
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertTemplateUsed(response, template_name='tasks/task_bulk.html')
+        self.assertEqual(response.context['filtered_count'],
+                         Task.objects.filter(status=1).count())
+
+    def test_choices_are_cached(self) -> None:
+        ROUTE = reverse_lazy('tasks_bulk')
+        self.client.get(ROUTE)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(ROUTE)
+        self.assertContains(response, 'Hermione Jean Granger')
+        self.assertContains(response, 'Optimization', count=2)
+        for table in ('statuses_status', 'labels_label', 'full_name'):
+            self.assertFalse([query for query in queries if table in query['sql']], table)
+
+        User.objects.filter(pk=1).get().save()
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(ROUTE)
+        self.assertTrue([query for query in queries if 'full_name' in query['sql']])
+
+    def test_bulk_change_of_a_filter(self) -> None:
+        ROUTE = '{}?status=1'.format(reverse_lazy('tasks_bulk'))
+        selected = set(Task.objects.filter(status=1).values_list('pk', flat=True))
+
+        response = self.client.post(ROUTE, {'status': 2, 'add_labels': [3]})
+        self.assertRedirects(response, '{}?status=1'.format(reverse_lazy('tasks')))
+        self.assertEqual(set(Task.objects.filter(status=2).values_list('pk', flat=True)),
+                         selected)
+        self.assertEqual(len(list(get_messages(response.wsgi_request))), 1)
+
+    def test_bulk_change_of_ids(self) -> None:
+        executor_id = Task.objects.get(pk=2).executor_id
+        response = self.client.post(reverse_lazy('tasks_bulk'), {'ids': '1, 3', 'unassign': 'on'})
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+        self.assertIsNone(Task.objects.get(pk=1).executor)
+        self.assertIsNone(Task.objects.get(pk=3).executor)
+        self.assertEqual(Task.objects.get(pk=2).executor_id, executor_id)
+
+    def test_bulk_change_errors(self) -> None:
+        ROUTE = reverse_lazy('tasks_bulk')
+        for data in ({}, {'ids': 'one', 'status': 1}, {'executor': 2, 'unassign': 'on'}):
+            response = self.client.post(ROUTE, data)
+            self.assertEqual(response.status_code, HTTPStatus.OK)
+            self.assertTrue(response.context['form'].errors)
+
+        # An invalid filter is not ignored, which would change every task.
+        response = self.client.post('{}?status=99'.format(ROUTE), {'status': 1})
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertTrue(response.context['form'].non_field_errors())
+        self.assertNotEqual(Task.objects.filter(status=1).count(), Task.objects.count())
+
+    def test_login_required(self) -> None:
+        self.client.logout()
+        response = self.client.post(reverse_lazy('tasks_bulk'), {'status': 1})
+        self.assertRedirects(response, reverse_lazy('login'))
@@ -0,0 +1,159 @@
+from django.test import SimpleTestCase, override_settings
+from django.core.management import call_command
+
+import os
+import tempfile
+import time
+from io import StringIO
+from unittest import mock
+
+from task_manager import caching
+from task_manager.caching.backends import LRUCache, SQLiteCache
+
+
+class CacheUrlTest(SimpleTestCase):
+
+    def test_parse_in_process_urls(self) -> None:
+        self.assertEqual(
+            caching.parse('lru://?max_entries=100&timeout=30'),
+            {
+                'BACKEND': 'task_manager.caching.backends.LRUCache',
+                'LOCATION': '',
+                'TIMEOUT': 30,
+                'OPTIONS': {'MAX_ENTRIES': 100},
+            }
+        )
+        self.assertEqual(
+            caching.parse('dummy://')['BACKEND'],
+            'django.core.cache.backends.dummy.DummyCache'
+        )
+
+    def test_parse_shared_urls(self) -> None:
+        self.assertEqual(
+            caching.parse('sqlite:////tmp/cache.sqlite3?timeout=none'),
+            {
+                'BACKEND': 'task_manager.caching.backends.SQLiteCache',
+                'LOCATION': '/tmp/cache.sqlite3',
+                'TIMEOUT': None,
+            }
+        )
+        self.assertEqual(caching.parse('file:///cache')['LOCATION'], 'cache')
+
+    def test_parse_unknown_scheme(self) -> None:
+        with self.assertRaises(ValueError):
+            caching.parse('memcached://localhost')
+        with self.assertRaises(ValueError):
+            caching.parse('lru://?max_size=100')
+
+    def test_config_reads_environment(self) -> None:
+        with mock.patch.dict(os.environ, {'CACHE_URL': 'locmem://tasks'}):
+            self.assertEqual(caching.config()['LOCATION'], 'tasks')
+        with mock.patch.dict(os.environ, {}, clear=True):
+            self.assertEqual(caching.config(default='dummy://')['LOCATION'], '')
+
+
+class LRUCacheTest(SimpleTestCase):
+
+    def setUp(self) -> None:
+        self.cache = LRUCache('test', {'OPTIONS': {'MAX_ENTRIES': 2}})
+
+    def test_evicts_least_recently_used(self) -> None:
+        self.cache.set('a', 1)
+        self.cache.set('b', 2)
+        self.cache.get('a')
+        self.cache.set('c', 3)
+
+        self.assertEqual(self.cache.get('a'), 1)
+        self.assertIsNone(self.cache.get('b'))
+        self.assertEqual(self.cache.get('c'), 3)
+        self.assertEqual(self.cache.stats()['evictions'], 1)
+
+    def test_per_key_timeout(self) -> None:
+        self.cache.set('short', 1, timeout=1)
+        self.cache.set('forever', 2, timeout=None)
+        with mock.patch('time.time', return_value=time.time() + 2):
+            self.assertIsNone(self.cache.get('short'))
+            self.assertEqual(self.cache.get('forever'), 2)
+
+    def test_add_and_incr(self) -> None:
+        self.assertTrue(self.cache.add('counter', 1))
+        self.assertFalse(self.cache.add('counter', 5))
+        self.assertEqual(self.cache.incr('counter'), 2)
+        with self.assertRaises(ValueError):
+            self.cache.incr('missing')
+
+    def test_stats(self) -> None:
+        self.cache.set('a', 1)
+        self.cache.get('a')
+        self.cache.get('b')
+        stats = self.cache.stats()
+        self.assertEqual((stats['size'], stats['hits'], stats['misses']), (1, 1, 1))
+        self.assertEqual(stats['hit_ratio'], 0.5)
+        self.assertFalse(stats['shared'])
+
+
+class SQLiteCacheTest(SimpleTestCase):
+
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'cache.sqlite3')
+        self.cache = SQLiteCache(self.path, {'OPTIONS': {'MAX_ENTRIES': 3}})
+
+    def test_values_are_shared_between_instances(self) -> None:
+        self.cache.set('key', {'value': 1})
+        other = SQLiteCache(self.path, {})
+        self.assertEqual(other.get('key'), {'value': 1})
+
+        other.add('counter', 10)
+        self.assertEqual(self.cache.incr('counter', 5), 15)
+        self.assertTrue(self.cache.delete('key'))
+        self.assertIsNone(other.get('key'))
+
+    def test_timeout_and_touch(self) -> None:
+        self.cache.set('key', 1, timeout=1)
+        self.cache.set('expiring', 1, timeout=1)
+        self.assertTrue(self.cache.touch('key', timeout=None))
+        with mock.patch('time.time', return_value=time.time() + 2):
+            self.assertEqual(self.cache.get('key'), 1)
+            self.assertFalse(self.cache.has_key('expiring'))
+            self.assertTrue(self.cache.add('expiring', 2))
+            self.assertEqual(self.cache.get('expiring'), 2)
+
+    def test_cull_and_stats(self) -> None:
+        self.cache.cull_every = 1
+        for number in range(5):
+            self.cache.set('key{}'.format(number), number)
+        self.cache.get('key4')
+        self.cache.get('missing')
+
+        stats = SQLiteCache(self.path, {}).stats()
+        self.assertEqual(stats['hits'], 0)  # not flushed by the other instance yet
+        stats = self.cache.stats()
+        self.assertLessEqual(stats['size'], 3)
+        self.assertEqual(stats['evictions'], 5 - stats['size'])
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+        self.assertTrue(stats['shared'])
+
+    def test_cull_every_writes(self) -> None:
+        self.cache.cull_every = 4
+        sizes = []
+        for number in range(5):
+            self.cache.set('key{}'.format(number), number)
+            sizes.append(self.cache.stats()['size'])
+        # The 4th write culls back to MAX_ENTRIES, the 5th waits for the next cull.
+        self.assertEqual(sizes, [1, 2, 3, 3, 4])
+
+
+class CacheStatsCommandTest(SimpleTestCase):
+
+    @override_settings(CACHES={
+        'default': {'BACKEND': 'task_manager.caching.backends.LRUCache'},
+        'dummy': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+    })
+    def test_cache_stats(self) -> None:
+        output = StringIO()
+        call_command('cache_stats', stdout=output)
+        self.assertIn('default (task_manager.caching.backends.LRUCache)', output.getvalue())
+        self.assertIn('hit ratio', output.getvalue())
+        self.assertIn('statistics are not collected', output.getvalue())
@@ -0,0 +1,145 @@
+from django.test import TestCase, Client
+from django.urls import reverse_lazy
+from django.db import connection
+from django.core.management import call_command
+from django.test.utils import CaptureQueriesContext
+
+import json
+import os
+import tempfile
+from io import StringIO
+from typing import Dict, Tuple
+
+from task_manager.tasks.labelling import set_labels
+from task_manager.tasks.models import Task, TaskLabel
+from task_manager.labels.models import Label
+from task_manager.statuses.models import Status
+from task_manager.users.models import User
+
+
+class TaskCountersTest(TestCase):
+
+    fixtures = ['task.json', 'label.json', 'status.json', 'user.json']
+
+    def setUp(self) -> None:
+        self.client: Client = Client()
+        self.client.force_login(User.objects.get(pk=1))
+        # Fixtures are loaded raw, without the counting signals.
+        call_command('rebuild_task_counters', stdout=StringIO())
+
+    def assertCounts(self, statuses: Dict[int, int], labels: Dict[int, int],
+                     users: Dict[int, Tuple[int, int]]) -> None:
+        self.assertEqual(dict(Status.objects.values_list('pk', 'task_count')), statuses)
+        self.assertEqual(dict(Label.objects.values_list('pk', 'task_count')), labels)
+        self.assertEqual({
+            pk: (authored, assigned) for pk, authored, assigned in User.objects.values_list(
+                'pk', 'authored_task_count', 'assigned_task_count'
+            )
+        }, users)
+
+    def test_rebuild(self) -> None:
+        self.assertCounts({1: 2, 2: 0, 3: 1}, {1: 2, 2: 0, 3: 1},
+                          {1: (2, 1), 2: (1, 2), 3: (0, 0)})
+
+    def test_create_update_delete(self) -> None:
+        self.client.post(reverse_lazy('task_create'), {
+            'name': 'Review', 'description': 'Review the code.',
+            'status': 2, 'executor': 3, 'labels': [2, 3],
+        })
+        self.assertCounts({1: 2, 2: 1, 3: 1}, {1: 2, 2: 1, 3: 2},
+                          {1: (3, 1), 2: (1, 2), 3: (0, 1)})
+
+        task = Task.objects.get(name='Review')
+        self.client.post(reverse_lazy('task_update', args=[task.pk]), {
+            'name': 'Review', 'description': 'Review the code.',
+            'status': 3, 'executor': '', 'labels': [1],
+        })
+        self.assertCounts({1: 2, 2: 0, 3: 2}, {1: 3, 2: 0, 3: 1},
+                          {1: (3, 1), 2: (1, 2), 3: (0, 0)})
+
+        self.client.post(reverse_lazy('task_delete', args=[task.pk]))
+        self.assertCounts({1: 2, 2: 0, 3: 1}, {1: 2, 2: 0, 3: 1},
+                          {1: (2, 1), 2: (1, 2), 3: (0, 0)})
+
+    def test_save_with_update_fields(self) -> None:
+        task = Task.objects.get(pk=3)
+        task.status_id, task.name = 2, 'Renamed'
+        task.save(update_fields=['name'])
+        self.assertEqual(Status.objects.get(pk=1).task_count, 2)
+
+    def test_label_changes(self) -> None:
+        task = Task.objects.get(pk=1)
+        task.labels.remove(2, 3)
+        self.assertEqual(dict(Label.objects.values_list('pk', 'task_count')), {1: 2, 2: 0, 3: 0})
+
+        task.labels.clear()
+        label = Label.objects.get(pk=2)
+        label.task_set.add(1, 2, 3)
+        self.assertEqual(dict(Label.objects.values_list('pk', 'task_count')), {1: 1, 2: 3, 3: 0})
+
+        label.task_set.clear()
+        self.assertEqual(dict(Label.objects.values_list('pk', 'task_count')), {1: 1, 2: 0, 3: 0})
+
+    def test_set_labels(self) -> None:
+        task = Task.objects.get(pk=1)
+        kept = TaskLabel.objects.get(task=task, label=1).pk
+        modified = task.date_modified
+
+        self.assertEqual(set_labels(task, [Label.objects.get(pk=1), 2]), ([2], [3]))
+        self.assertEqual(TaskLabel.objects.get(task=task, label=1).pk, kept)
+        self.assertEqual(set(task.labels.values_list('pk', flat=True)), {1, 2})
+        self.assertEqual(dict(Label.objects.values_list('pk', 'task_count')), {1: 2, 2: 1, 3: 0})
+        self.assertGreater(Task.objects.get(pk=1).date_modified, modified)
+        self.assertEqual(task.date_modified, Task.objects.get(pk=1).date_modified)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(set_labels(task, [2, 1]), ([], []))
+
+    def test_import(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'tasks.jsonl')
+            with open(path, 'w') as stream:
+                stream.write(json.dumps({
+                    'name': 'Imported', 'status': 'In progress', 'author': '@Ron_Weas1ey',
+                    'labels': ['Testing', 'Development'],
+                }))
+            call_command('import_tasks', path, stdout=StringIO())
+        self.assertCounts({1: 2, 2: 1, 3: 1}, {1: 3, 2: 1, 3: 1},
+                          {1: (2, 1), 2: (2, 2), 3: (0, 0)})
+
+    def test_delete_refused_when_in_use(self) -> None:
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse_lazy('status_delete', args=[1]))
+        # The counter is confirmed by one EXISTS, not by the deletion collector.
+        self.assertEqual(len([query for query in queries if 'tasks_task' in query['sql']]), 1)
+        self.assertRedirects(response, reverse_lazy('statuses'))
+        self.assertTrue(Status.objects.filter(pk=1).exists())
+
+        response = self.client.post(reverse_lazy('label_delete', args=[1]))
+        self.assertRedirects(response, reverse_lazy('labels'))
+        self.assertTrue(Label.objects.filter(pk=1).exists())
+
+    def test_delete_with_a_stale_counter(self) -> None:
+        Status.objects.filter(pk=2).update(task_count=1)
+        self.client.post(reverse_lazy('status_delete', args=[2]))
+        self.assertFalse(Status.objects.filter(pk=2).exists())
+
+    def test_saves_keep_concurrent_counts(self) -> None:
+        status, user = Status.objects.get(pk=2), User.objects.get(pk=3)
+        Task.objects.create(name='Review', description='Review the code.',
+                            status=status, author=user, executor=user)
+        status.name = 'Reviewed'
+        status.save()
+        user.first_name = 'Minerva'
+        user.save()
+        self.client.post(reverse_lazy('label_update', args=[2]), {'name': 'Renamed'})
+
+        self.assertEqual(Status.objects.get(pk=2).name, 'Reviewed')
+        self.assertCounts({1: 2, 2: 1, 3: 1}, {1: 2, 2: 0, 3: 1},
+                          {1: (2, 1), 2: (1, 2), 3: (1, 1)})
+
+    def test_lists_show_counters(self) -> None:
+        response = self.client.get(reverse_lazy('statuses'))
+        self.assertContains(response, '<td>2</td>')
+        response = self.client.get(reverse_lazy('users'))
+        self.assertContains(response, '<td>1</td>', count=2)
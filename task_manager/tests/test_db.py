@@ -0,0 +1,319 @@
+from django.test import SimpleTestCase, RequestFactory, override_settings
+from django.db import connection
+from django.http import HttpRequest, HttpResponse
+from django.contrib.sessions.models import Session
+
+import os
+import sqlite3
+import tempfile
+import threading
+from typing import List
+from unittest import mock
+
+from task_manager import db
+from task_manager.db.routers import ReplicaRouter
+from task_manager.middleware import ReplicaMiddleware
+from task_manager.statuses.models import Status
+from task_manager.tasks.models import Task
+from task_manager.tasks.views import TaskCreateView, TasksListView
+from task_manager.db.pool import ConnectionPool, PoolTimeout, pools
+from task_manager.db.postgresql import base as pooled
+from task_manager.db.sqlite3.base import DatabaseWrapper as SQLiteDatabaseWrapper
+from psycopg2 import extensions
+
+
+class FakeConnection:
+
+    def __init__(self) -> None:
+        self.closed = False
+        self.usable = True
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class ConnectionPoolTest(SimpleTestCase):
+
+    def setUp(self) -> None:
+        self.opened: List[FakeConnection] = []
+
+    def connect(self) -> FakeConnection:
+        connection = FakeConnection()
+        self.opened.append(connection)
+        return connection
+
+    def pool(self, **options) -> ConnectionPool:
+        options.setdefault('check', lambda connection: connection.usable)
+        return ConnectionPool(self.connect, **options)
+
+    def test_reuse_and_timeout(self) -> None:
+        pool = self.pool(max_size=2, timeout=0.05)
+        first, second = pool.get(), pool.get()
+        self.assertIsNot(first, second)
+        with self.assertRaises(PoolTimeout):
+            pool.get()
+
+        pool.put(first)
+        self.assertIs(pool.get(), first)
+        stats = pool.stats()
+        self.assertEqual((stats['size'], stats['in_use'], stats['opened'], stats['timeouts']),
+                         (2, 2, 2, 1))
+
+    def test_waiting_thread_gets_returned_connection(self) -> None:
+        pool = self.pool(max_size=1, timeout=5)
+        connection = pool.get()
+        received = []
+        waiter = threading.Thread(target=lambda: received.append(pool.get()))
+        waiter.start()
+        pool.put(connection)
+        waiter.join()
+        self.assertEqual(received, [connection])
+
+    def test_expired_and_broken_connections_are_replaced(self) -> None:
+        pool = self.pool(max_age=0)
+        connection = pool.get()
+        pool.put(connection)
+        self.assertTrue(connection.closed)
+
+        pool = self.pool(check_after=0)
+        connection = pool.get()
+        pool.put(connection)
+        connection.usable = False
+        replacement = pool.get()
+        self.assertIsNot(replacement, connection)
+        self.assertTrue(connection.closed)
+        self.assertEqual(pool.stats()['failed_checks'], 1)
+
+        pool.reset = lambda connection: False
+        pool.put(replacement)
+        self.assertTrue(replacement.closed)
+        self.assertEqual(pool.stats()['size'], 0)
+
+    def test_idle_connections_beyond_min_size_are_closed(self) -> None:
+        pool = self.pool(min_size=1, max_idle=0)
+        first, second = pool.get(), pool.get()
+        pool.put(first)
+        pool.put(second)
+        self.assertEqual([first.closed, second.closed], [True, False])
+        self.assertEqual(pool.stats()['idle'], 1)
+
+    def test_connections_of_parent_process_are_not_closed(self) -> None:
+        pool = self.pool()
+        idle, used = pool.get(), pool.get()
+        pool.put(idle)
+        with mock.patch('os.getpid', return_value=os.getpid() + 1):
+            pool.put(used)
+            self.assertNotIn(pool.get(), (idle, used))
+        self.assertFalse(idle.closed or used.closed)
+
+
+class FakePostgreSQLConnection(FakeConnection):
+    """The part of a psycopg2 connection the pool checks and resets."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.status = extensions.TRANSACTION_STATUS_IDLE
+        self.rollbacks = 0
+
+    def get_transaction_status(self) -> int:
+        return self.status
+
+    def rollback(self) -> None:
+        self.rollbacks += 1
+        if self.status == extensions.TRANSACTION_STATUS_INTRANS:
+            self.status = extensions.TRANSACTION_STATUS_IDLE
+
+    def cursor(self) -> mock.MagicMock:
+        if not self.usable:
+            raise pooled.Database.OperationalError('server closed the connection')
+        return mock.MagicMock()
+
+
+class PooledPostgreSQLBackendTest(SimpleTestCase):
+
+    ALIAS = 'pooled'
+
+    def setUp(self) -> None:
+        self.opened: List[FakePostgreSQLConnection] = []
+        patcher = mock.patch.object(
+            pooled.base.DatabaseWrapper, 'get_new_connection', side_effect=self.connect
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(pools.pop, self.ALIAS, None)
+
+    def connect(self, wrapper, conn_params) -> FakePostgreSQLConnection:
+        connection = FakePostgreSQLConnection()
+        self.opened.append(connection)
+        return connection
+
+    def wrapper(self, **pool) -> pooled.DatabaseWrapper:
+        pool = dict({'min_size': 1, 'max_size': 3, 'timeout': 0.05}, **pool)
+        return pooled.DatabaseWrapper({'NAME': 'tasks', 'POOL': pool}, self.ALIAS)
+
+    def checkout(self, wrapper: pooled.DatabaseWrapper) -> FakePostgreSQLConnection:
+        wrapper.connection = wrapper.get_new_connection({})
+        return wrapper.connection
+
+    def test_checkout_and_return(self) -> None:
+        first = self.wrapper()
+        connection = self.checkout(first)
+        self.assertEqual(pools[self.ALIAS].stats()['in_use'], 1)
+
+        first._close()
+        stats = pools[self.ALIAS].stats()
+        self.assertEqual((stats['in_use'], stats['idle']), (0, 1))
+        self.assertIs(self.checkout(self.wrapper()), connection)
+        self.assertEqual(len(self.opened), 1)
+
+    def test_max_size(self) -> None:
+        for _ in range(3):
+            self.checkout(self.wrapper())
+        with self.assertRaises(pooled.Database.OperationalError):
+            self.checkout(self.wrapper())
+        self.assertEqual(pools[self.ALIAS].stats()['timeouts'], 1)
+
+    def test_broken_connections_are_discarded(self) -> None:
+        in_transaction, failed, lost = self.wrapper(), self.wrapper(), self.wrapper()
+        self.checkout(in_transaction).status = extensions.TRANSACTION_STATUS_INTRANS
+        self.checkout(failed).status = extensions.TRANSACTION_STATUS_UNKNOWN
+        self.checkout(lost).closed = True
+        for wrapper in (in_transaction, failed, lost):
+            wrapper._close()
+
+        self.assertEqual(in_transaction.connection.rollbacks, 1)
+        self.assertFalse(in_transaction.connection.closed)
+        self.assertTrue(failed.connection.closed)
+        stats = pools[self.ALIAS].stats()
+        self.assertEqual((stats['size'], stats['idle'], stats['closed']), (1, 1, 2))
+
+    def test_usable(self) -> None:
+        wrapper = self.wrapper(check_after=0)
+        connection = self.checkout(wrapper)
+        wrapper._close()
+        self.assertIs(self.checkout(wrapper), connection)
+
+        connection.usable = False
+        wrapper._close()
+        replacement = self.checkout(wrapper)
+        self.assertIsNot(replacement, connection)
+        self.assertTrue(connection.closed)
+
+        pools[self.ALIAS].max_age = 0
+        wrapper._close()
+        self.assertTrue(replacement.closed)
+        stats = pools[self.ALIAS].stats()
+        self.assertEqual((stats['failed_checks'], stats['size']), (1, 0))
+
+
+class DatabaseConfigTest(SimpleTestCase):
+
+    POSTGRESQL = {'ENGINE': 'django.db.backends.postgresql_psycopg2', 'CONN_MAX_AGE': 600}
+
+    def test_config(self) -> None:
+        with mock.patch.dict(os.environ, {'DATABASE_POOL': 'False', 'SQLITE_PRODUCTION': 'False'}):
+            self.assertEqual(db.config({'ENGINE': 'django.db.backends.sqlite3'}), {})
+            self.assertEqual(db.config(self.POSTGRESQL), {'DISABLE_SERVER_SIDE_CURSORS': True})
+
+        with mock.patch.dict(os.environ, {
+            'DATABASE_POOL': 'True', 'DATABASE_POOL_MAX_SIZE': '8',
+            'DATABASE_SERVER_SIDE_CURSORS': 'True',
+        }):
+            config = db.config(self.POSTGRESQL)
+        self.assertEqual(config['ENGINE'], 'task_manager.db.postgresql')
+        self.assertEqual(config['CONN_MAX_AGE'], 0)
+        self.assertFalse(config['DISABLE_SERVER_SIDE_CURSORS'])
+        self.assertEqual(config['POOL']['max_size'], 8)
+
+    def test_sqlite_production_config(self) -> None:
+        sqlite = {'ENGINE': 'django.db.backends.sqlite3', 'OPTIONS': {'timeout': 20}}
+        environ = {'SQLITE_PRODUCTION': 'True', 'SQLITE_CACHE_SIZE': '2000'}
+        with mock.patch.dict(os.environ, environ):
+            config = db.config(sqlite)
+        self.assertEqual(config['ENGINE'], 'task_manager.db.sqlite3')
+        self.assertEqual(config['OPTIONS']['timeout'], 20)
+        self.assertEqual(config['OPTIONS']['transaction_mode'], 'IMMEDIATE')
+        self.assertIn('PRAGMA journal_mode = WAL', config['OPTIONS']['init_command'])
+        self.assertIn('PRAGMA cache_size = -2000', config['OPTIONS']['init_command'])
+
+
+class SQLiteBackendTest(SimpleTestCase):
+
+    def test_pragmas_and_immediate_transactions(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'db.sqlite3')
+        with mock.patch.dict(os.environ, {'SQLITE_PRODUCTION': 'True'}):
+            settings = dict(connection.settings_dict, NAME=path, **db.config(
+                {'ENGINE': 'django.db.backends.sqlite3'}
+            ))
+        wrapper = SQLiteDatabaseWrapper(settings, alias='production')
+        self.addCleanup(wrapper.close)
+        with wrapper.cursor() as cursor:
+            self.assertEqual(cursor.execute('PRAGMA journal_mode').fetchone(), ('wal',))
+            self.assertEqual(cursor.execute('PRAGMA synchronous').fetchone(), (1,))
+            self.assertEqual(cursor.execute('PRAGMA busy_timeout').fetchone(), (5000,))
+
+        # What atomic() does on SQLite.
+        wrapper.set_autocommit(False, force_begin_transaction_with_broken_autocommit=True)
+        # The write lock is taken by BEGIN, before any write.
+        other = sqlite3.connect(path, timeout=0, isolation_level=None)
+        self.addCleanup(other.close)
+        with self.assertRaisesMessage(sqlite3.OperationalError, 'database is locked'):
+            other.execute('BEGIN IMMEDIATE')
+        wrapper.rollback()
+        wrapper.set_autocommit(True)
+
+
+@override_settings(DATABASE_REPLICAS=['replica_0'])
+class ReplicaRoutingTest(SimpleTestCase):
+
+    def setUp(self) -> None:
+        self.router = ReplicaRouter()
+        self.factory = RequestFactory()
+
+    def read(self, request: HttpRequest, view: object) -> HttpResponse:
+        """Runs the middleware around a view reading a task and a session."""
+        def get_response(request: HttpRequest) -> HttpResponse:
+            middleware.process_view(request, view, (), {})
+            return HttpResponse(','.join((
+                self.router.db_for_read(Task) or 'default',
+                self.router.db_for_read(Session) or 'default',
+            )))
+
+        middleware = ReplicaMiddleware(get_response)
+        return middleware(request)
+
+    def test_reads_of_read_only_views(self) -> None:
+        response = self.read(self.factory.get('/tasks/'), TasksListView.as_view())
+        self.assertEqual(response.content, b'replica_0,default')
+        # The replica is set for the request only.
+        self.assertIsNone(self.router.db_for_read(Task))
+
+        response = self.read(self.factory.get('/tasks/create/'), TaskCreateView.as_view())
+        self.assertEqual(response.content, b'default,default')
+
+        with self.settings(DATABASE_REPLICAS=[]):
+            response = self.read(self.factory.get('/tasks/'), TasksListView.as_view())
+        self.assertEqual(response.content, b'default,default')
+
+    def test_reads_stick_to_primary_after_writes(self) -> None:
+        response = self.read(self.factory.post('/tasks/create/'), TaskCreateView.as_view())
+        cookie = response.cookies[ReplicaMiddleware.sticky_cookie]
+        self.assertEqual(cookie['max-age'], 10)
+
+        request = self.factory.get('/tasks/')
+        request.COOKIES[ReplicaMiddleware.sticky_cookie] = cookie.value
+        response = self.read(request, TasksListView.as_view())
+        self.assertEqual(response.content, b'default,default')
+        self.assertNotIn(ReplicaMiddleware.sticky_cookie, response.cookies)
+
+    def test_writes_and_migrations_use_primary(self) -> None:
+        status = Status(name='New')
+        status._state.db = 'replica_0'
+        self.assertEqual(self.router.db_for_write(Status, instance=status), 'default')
+        task = Task()
+        task._state.db = 'default'
+        self.assertTrue(self.router.allow_relation(status, task))
+        self.assertFalse(self.router.allow_migrate('replica_0', 'tasks'))
+        self.assertIsNone(self.router.allow_migrate('default', 'tasks'))
@@ -0,0 +1,142 @@
+from django.test import TestCase, Client
+from django.urls import reverse_lazy
+from django.core.management import call_command
+from django.utils import timezone
+
+from datetime import timedelta
+from http import HTTPStatus
+from io import StringIO
+from unittest import mock
+
+from task_manager.tasks.bulk import bulk_change
+from task_manager.tasks.history import merge
+from task_manager.tasks.models import Task, TaskChange
+from task_manager.tasks.views import TaskDetailView
+from task_manager.labels.models import Label
+from task_manager.users.models import User
+
+
+class TaskHistoryTest(TestCase):
+
+    fixtures = ['task.json', 'label.json', 'status.json', 'user.json']
+
+    def setUp(self) -> None:
+        self.client: Client = Client()
+        self.client.force_login(User.objects.get(pk=1))
+
+    def test_form_records_one_entry(self) -> None:
+        self.client.post(reverse_lazy('task_create'), {
+            'name': 'Review', 'description': 'Review the code.',
+            'status': 2, 'executor': 3, 'labels': [2, 3],
+        })
+        task = Task.objects.get(name='Review')
+        created = task.changes.get()
+        self.assertTrue(created.created)
+        self.assertEqual(created.user_id, 1)
+        self.assertEqual(created.changes, {
+            'name': [None, 'Review'], 'description': True, 'status': [None, 2],
+            'executor': [None, 3], 'labels': [[2, 3], []],
+        })
+
+        self.client.post(reverse_lazy('task_update', args=[task.pk]), {
+            'name': 'Review', 'description': 'Review the code.',
+            'status': 3, 'executor': '', 'labels': [1, 2],
+        })
+        changed = task.changes.latest('date_changed', 'id')
+        self.assertFalse(changed.created)
+        self.assertEqual(changed.changes, {
+            'status': [2, 3], 'executor': [3, None], 'labels': [[1], [3]],
+        })
+
+    def test_unchanged_save_records_nothing(self) -> None:
+        task = Task.objects.get(pk=1)
+        task.save()
+        task.description = 'Changed'
+        task.save(update_fields=['name'])
+        self.assertFalse(TaskChange.objects.exists())
+
+        task.save(update_fields=['description'])
+        self.assertEqual(TaskChange.objects.get().changes, {'description': True})
+
+    def test_label_signals(self) -> None:
+        task = Task.objects.get(pk=1)
+        task.labels.remove(3)
+        self.assertEqual(task.changes.get().changes, {'labels': [[], [3]]})
+
+        Label.objects.get(pk=2).task_set.add(1, 2)
+        self.assertEqual(
+            sorted(TaskChange.objects.filter(changes__labels=[[2], []]).values_list(
+                'task_id', flat=True
+            )), [1, 2]
+        )
+
+    def test_bulk_change(self) -> None:
+        bulk_change([1, 2, 3], status_id=1, add_labels=[2])
+        changes = dict(TaskChange.objects.values_list('task_id', 'changes'))
+        self.assertEqual(changes[1], {'status': [3, 1], 'labels': [[2], []]})
+        self.assertEqual(changes[3], {'labels': [[2], []]})
+
+    def test_deleted_task_keeps_history(self) -> None:
+        task = self.change_status()
+        entries = task.changes.count()
+        self.client.post(reverse_lazy('task_delete', args=[task.pk]))
+        self.assertFalse(Task.objects.filter(pk=task.pk).exists())
+
+        history = TaskChange.objects.filter(task_id=task.pk)
+        self.assertEqual(history.count(), entries + 1)
+        deleted = history.latest('date_changed', 'id')
+        self.assertTrue(deleted.deleted)
+        self.assertEqual(deleted.user_id, 1)
+        self.assertEqual(deleted.changes, {
+            'name': [task.name, None], 'description': True,
+            'status': [3, None], 'executor': [task.executor_id, None],
+        })
+
+    def test_merge(self) -> None:
+        changes = {'status': [1, 2], 'labels': [[1], [2]]}
+        merge(changes, {'status': [2, 1], 'labels': [[2, 3], [1]]})
+        self.assertEqual(changes, {'labels': [[3], []]})
+
+    def change_status(self) -> Task:
+        task = Task.objects.get(pk=1)
+        for status_id in (1, 2, 3):
+            task.status_id = status_id
+            task.save()
+        task.labels.clear()
+        return task
+
+    def test_detail_panel(self) -> None:
+        task = self.change_status()
+        response = self.client.get(reverse_lazy('task_detail', args=[1]))
+        self.assertEqual(
+            [change.pk for change in response.context['history']],
+            list(task.changes.order_by('-date_changed', '-id').values_list('pk', flat=True))
+        )
+        self.assertContains(response, 'In progress')
+        self.assertIsNone(response.context['older_history_query'])
+
+    @mock.patch.object(TaskDetailView, 'history_size', 3)
+    def test_detail_panel_pages(self) -> None:
+        self.change_status()
+        ROUTE = reverse_lazy('task_detail', args=[1])
+        response = self.client.get(ROUTE)
+        self.assertEqual(len(list(response.context['history'])), 3)
+
+        older = self.client.get('{}?{}'.format(ROUTE, response.context['older_history_query']))
+        self.assertEqual(len(list(older.context['history'])), 1)
+        self.assertIsNotNone(older.context['newer_history_query'])
+
+        response = self.client.get(ROUTE, {'history': 'broken'})
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_prune(self) -> None:
+        task = Task.objects.get(pk=1)
+        now = timezone.now()
+        TaskChange.objects.bulk_create([
+            TaskChange(task=task, date_changed=now - timedelta(days=days))
+            for days in (400, 380, 10)
+        ])
+        output = StringIO()
+        call_command('prune_task_history', days=365, batch_size=1, stdout=output)
+        self.assertIn('2 task history entries deleted.', output.getvalue())
+        self.assertEqual(TaskChange.objects.get().date_changed, now - timedelta(days=10))
@@ -161,3 +161,12 @@ class LabelsTest(TestCase):
         self.assertRedirects(response, reverse_lazy('labels'))
         with self.assertRaises(ObjectDoesNotExist):
             Label.objects.get(id=self.label1.id)
+
+    def test_label_views_query_counts(self) -> None:
+        # The session and the user, then the label once.
+        with self.assertNumQueries(3):
+            self.client.get(reverse_lazy('label_update', args=[self.label1.id]))
+        with self.assertNumQueries(3):
+            self.client.get(reverse_lazy('label_delete', args=[self.label1.id]))
+        with self.assertNumQueries(5):
+            self.client.post(reverse_lazy('label_delete', args=[self.label1.id]))
@@ -0,0 +1,66 @@
+from django.test import TestCase, override_settings
+from django.conf import settings
+from django.urls import reverse_lazy
+
+from http import HTTPStatus
+
+from task_manager.users.models import User
+
+
+INSTRUMENTATION_MIDDLEWARE = 'task_manager.middleware.InstrumentationMiddleware'
+INSTRUMENTED_MIDDLEWARE = (
+    settings.MIDDLEWARE if INSTRUMENTATION_MIDDLEWARE in settings.MIDDLEWARE
+    else settings.MIDDLEWARE[:2] + [INSTRUMENTATION_MIDDLEWARE] + settings.MIDDLEWARE[2:]
+)
+
+
+@override_settings(INSTRUMENTATION=True, MIDDLEWARE=INSTRUMENTED_MIDDLEWARE, METRICS_TOKEN='secret')
+class InstrumentationTest(TestCase):
+
+    fixtures = ['task.json', 'label.json', 'status.json', 'user.json']
+
+    def setUp(self) -> None:
+        self.client.force_login(User.objects.get(pk=1))
+
+    def test_server_timing(self) -> None:
+        response = self.client.get(reverse_lazy('tasks'))
+        timing = response['Server-Timing']
+        self.assertRegex(timing, r'^db;dur=[\d.]+;desc="\d+ queries", tpl;dur=[\d.]+, total;dur=')
+        self.assertNotIn('desc="0 queries"', timing)
+        self.assertNotIn('tpl;dur=0.0,', timing)
+
+    @override_settings(INSTRUMENTATION_SLOW_REQUEST_MS=0)
+    def test_slow_request_log(self) -> None:
+        with self.assertLogs('task_manager.middleware', 'WARNING') as logs:
+            self.client.get(reverse_lazy('task_detail', args=[1]))
+        self.assertIn('Slow request: GET /tasks/1/ (task_detail)', logs.output[0])
+
+    def test_metrics(self) -> None:
+        self.client.get(reverse_lazy('statuses'))
+        response = self.client.get(reverse_lazy('metrics'), HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        content = response.content.decode()
+        self.assertIn('# TYPE http_request_duration_seconds histogram', content)
+        self.assertIn('http_request_duration_seconds_bucket{view="statuses",le="+Inf"}', content)
+        self.assertIn('http_request_db_queries_count{view="statuses"}', content)
+        self.assertIn('http_responses_total{view="statuses",status="200"}', content)
+
+    def test_metrics_access(self) -> None:
+        ROUTE = reverse_lazy('metrics')
+        response = self.client.get(ROUTE)
+        self.assertEqual(response.status_code, HTTPStatus.UNAUTHORIZED)
+        response = self.client.get(ROUTE, HTTP_AUTHORIZATION='Bearer wrong')
+        self.assertEqual(response.status_code, HTTPStatus.UNAUTHORIZED)
+
+        # Without a token only staff users read the metrics.
+        with self.settings(METRICS_TOKEN=''):
+            response = self.client.get(ROUTE, HTTP_AUTHORIZATION='Bearer ')
+            self.assertEqual(response.status_code, HTTPStatus.UNAUTHORIZED)
+            User.objects.filter(pk=1).update(is_staff=True)
+            response = self.client.get(ROUTE)
+            self.assertEqual(response.status_code, HTTPStatus.OK)
+
+        with self.settings(INSTRUMENTATION=False):
+            response = self.client.get(ROUTE)
+            self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
@@ -0,0 +1,98 @@
+from django.test import TestCase, Client
+from django.urls import reverse_lazy
+from django.core.management import call_command
+from django.utils import timezone
+
+from datetime import date, timedelta
+from http import HTTPStatus
+from io import StringIO
+from typing import Dict, Tuple
+
+from task_manager.tasks.models import Task, TaskDayStats
+from task_manager.tasks.stats import count_by_day, load_dashboard
+from task_manager.users.models import User
+
+
+class TaskStatsTest(TestCase):
+
+    fixtures = ['task.json', 'label.json', 'status.json', 'user.json']
+
+    def setUp(self) -> None:
+        self.client: Client = Client()
+        self.client.force_login(User.objects.get(pk=1))
+        # Fixtures are loaded raw, without the counting signals.
+        call_command('rebuild_task_stats', batch_size=2, stdout=StringIO())
+
+    def assertDaysMatchTasks(self) -> None:
+        '''The rollup equals a GROUP BY over the current tasks.'''
+        expected: Dict[date, Tuple[int, int]] = {}
+        for index, column in enumerate(('date_created', 'date_modified')):
+            for day, count in count_by_day(Task.objects.all(), column):
+                counts = list(expected.get(day, (0, 0)))
+                counts[index] = count
+                expected[day] = tuple(counts)
+        stats = {
+            day: (created, modified)
+            for day, created, modified in TaskDayStats.objects.values_list(
+                'day', 'created', 'modified'
+            ) if created or modified
+        }
+        self.assertEqual(stats, expected)
+
+    def test_rebuild(self) -> None:
+        self.assertEqual(
+            list(TaskDayStats.objects.values_list('day', 'created', 'modified')),
+            [(date(2022, 12, 17), 3, 0), (date(2022, 12, 18), 0, 3)]
+        )
+
+    def test_task_changes(self) -> None:
+        task = Task.objects.create(name='Review', description='', status_id=1, author_id=1)
+        self.assertDaysMatchTasks()
+
+        task = Task.objects.get(pk=1)
+        task.name = 'Renamed'
+        task.save()
+        self.assertDaysMatchTasks()
+
+        Task.objects.get(pk=2).labels.add(2)
+        Task.objects.get(pk=3).labels.add(1)
+        self.assertDaysMatchTasks()
+
+        Task.objects.get(pk=2).delete()
+        self.assertDaysMatchTasks()
+        today = TaskDayStats.objects.get(day=timezone.localdate())
+        self.assertEqual((today.created, today.modified), (1, 3))
+
+    def test_dashboard_reads_one_query(self) -> None:
+        since = timezone.localdate() - timedelta(days=6)
+        Task.objects.create(name='Review', description='', status_id=2, author_id=1)
+        with self.assertNumQueries(1):
+            dashboard = load_dashboard(since)
+
+        self.assertEqual(dashboard['total'], 4)
+        self.assertEqual(dashboard['statuses'], [('New', 2), ('Completed', 1), ('In progress', 1)])
+        self.assertEqual(dashboard['executors'], [('Ronald Weasley', 2), ('Hary Poter', 1)])
+        self.assertEqual(dashboard['unassigned'], 1)
+        self.assertEqual(dashboard['labels'], [('Development', 2), ('Optimization', 1),
+                                               ('Testing', 0)])
+        self.assertEqual(len(dashboard['days']), 7)
+        self.assertEqual(dashboard['days'][-1], (timezone.localdate(), 1, 1))
+
+    def test_dashboard_view(self) -> None:
+        response = self.client.get(reverse_lazy('tasks_dashboard'))
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertTemplateUsed(response, template_name='tasks/task_dashboard.html')
+        self.assertContains(response, 'Optimization')
+
+        response = Client().get(reverse_lazy('tasks_dashboard'))
+        self.assertRedirects(response, reverse_lazy('login'))
+
+    def test_dashboard_conditional_get(self) -> None:
+        ROUTE = reverse_lazy('tasks_dashboard')
+        etag: str = self.client.get(ROUTE)['ETag']
+        response = self.client.get(ROUTE, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+        Task.objects.get(pk=3).delete()
+        response = self.client.get(ROUTE, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
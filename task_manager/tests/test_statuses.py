@@ -59,6 +59,18 @@ class StatusesTest(TestCase):
         self.assertTemplateUsed(response, template_name='statuses/status_list.html')
         self.assertEqual(response.status_code, HTTPStatus.OK)
 
+    # The list shows task counters, so it is validated by the task board generation.
+    def test_statuses_list_view_conditional_get(self) -> None:
+        ROUTE = reverse_lazy('statuses')
+        etag: str = self.client.get(ROUTE)['ETag']
+
+        response: HttpResponse = self.client.get(ROUTE, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+        self.status3.delete()
+        response = self.client.get(ROUTE, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
     def test_statuses_list_view_has_create_link(self) -> None:
         response: HttpResponse = self.client.get(reverse_lazy('statuses'))
         self.assertContains(response, '/statuses/create/')
@@ -161,3 +173,12 @@ class StatusesTest(TestCase):
         self.assertRedirects(response, reverse_lazy('statuses'))
         with self.assertRaises(ObjectDoesNotExist):
             Status.objects.get(id=self.status1.id)
+
+    def test_status_views_query_counts(self) -> None:
+        # The session and the user, then the status once.
+        with self.assertNumQueries(3):
+            self.client.get(reverse_lazy('status_update', args=[self.status1.id]))
+        with self.assertNumQueries(3):
+            self.client.get(reverse_lazy('status_delete', args=[self.status1.id]))
+        with self.assertNumQueries(5):
+            self.client.post(reverse_lazy('status_delete', args=[self.status1.id]))
@@ -1,14 +1,22 @@
 from django.utils.translation import gettext_lazy as _
-from django.test import TestCase, Client
+from django.test import TestCase, SimpleTestCase, Client, RequestFactory
+from django.contrib.auth.models import AnonymousUser
 from django.contrib.auth import SESSION_KEY
 from django.core.exceptions import PermissionDenied
 from django.urls import reverse_lazy
 from django.http import HttpResponse
+from django.conf import settings
+from django.template import engines
+from django.views.generic import TemplateView
 
+import os
+import runpy
 from http import HTTPStatus
 from dataclasses import dataclass
-from typing import Dict, Tuple
+from typing import Any, Dict, Tuple
+from unittest import mock
 
+from task_manager.mixins import ConditionalGetMixin, Validators
 from task_manager.users.models import User
 
 
@@ -114,3 +122,52 @@ class PagesAccessibility(TestCase):
         )  # the task author must not be the same as the user's client under test
 
         self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+
+class ConditionalGetTest(SimpleTestCase):
+
+    def render(self, source: str) -> HttpResponse:
+        class PageView(ConditionalGetMixin, TemplateView):
+            def get_validators(self) -> Validators:
+                return (1,), None
+
+            def get_template_names(self) -> Any:
+                return engines['django'].from_string(source)
+
+        request = RequestFactory().get('/')
+        request.user = AnonymousUser()
+        return PageView.as_view()(request).render()
+
+    def test_validators(self) -> None:
+        self.assertIn('ETag', self.render('<p>Page</p>'))
+
+    def test_no_validators_for_a_page_with_a_csrf_token(self) -> None:
+        response = self.render('<form method="post">{% csrf_token %}</form>')
+        self.assertNotIn('ETag', response)
+        self.assertIn('csrfmiddlewaretoken', response.content.decode())
+
+
+class GunicornConfigTest(SimpleTestCase):
+
+    def load(self, **environ: str) -> Dict[str, Any]:
+        environ = dict({
+            name: value for name, value in os.environ.items()
+            if not name.startswith('GUNICORN_') and name != 'WEB_CONCURRENCY'
+        }, **environ)
+        with mock.patch.dict(os.environ, environ, clear=True), \
+                mock.patch('os.sched_getaffinity', return_value={0, 1, 2, 3}, create=True):
+            return runpy.run_path(str(settings.BASE_DIR / 'gunicorn.conf.py'))
+
+    def test_autotuning(self) -> None:
+        config = self.load()
+        self.assertEqual((config['worker_class'], config['workers'], config['threads']),
+                         ('gthread', 5, 4))
+        self.assertTrue(config['preload_app'])
+        self.assertEqual((config['max_requests'], config['max_requests_jitter']), (1000, 100))
+
+        config = self.load(GUNICORN_THREADS='1')
+        self.assertEqual((config['worker_class'], config['workers']), ('sync', 9))
+
+        config = self.load(WEB_CONCURRENCY='3', GUNICORN_PRELOAD='False')
+        self.assertEqual(config['workers'], 3)
+        self.assertFalse(config['preload_app'])
@@ -5,11 +5,22 @@ from django.http import HttpResponse
 from django.forms.utils import ErrorDict
 from django.db.models.deletion import ProtectedError
 from django.core.exceptions import ObjectDoesNotExist, PermissionDenied
+from django.db import connection
+from django.core.management import call_command
+from django.test.utils import CaptureQueriesContext
 
+import csv
+import zipfile
 from http import HTTPStatus
+from io import BytesIO, StringIO
 from typing import List, Dict
+from unittest import mock
 
 from task_manager.tasks.models import Task
+from task_manager.tasks.views import TasksExportView, TasksListView
+from task_manager.tasks.cache import task_table_cache
+from task_manager.tasks.choices import choices_cache
+from task_manager.tasks.search import PostgreSQLSearchBackend, search_tasks
 from task_manager.statuses.models import Status
 from task_manager.labels.models import Label
 from task_manager.users.models import User
@@ -144,6 +155,90 @@ class TasksTest(TestCase):
         self.assertIn(self.task2, tasks)
         self.assertNotIn(self.task3, tasks)
 
+    def test_search_tasks(self) -> None:
+        response: HttpResponse = self.client.get(reverse_lazy('tasks'), {'q': 'Galya access'})
+        self.assertEqual(list(response.context['tasks']), [self.task1, self.task3])
+
+        response = self.client.get(reverse_lazy('tasks'), {'q': 'cloud', 'status': self.status1.pk})
+        self.assertEqual(list(response.context['tasks']), [self.task3])
+
+        response = self.client.get(reverse_lazy('tasks'), {'q': '"*)'})
+        self.assertEqual(response.context['tasks'].count(), 0)
+
+    def test_search_keeps_every_match(self) -> None:
+        Task.objects.bulk_create([
+            Task(name='Cloud {}'.format(number), description='Move it.',
+                 status=self.status2, author=self.user1)
+            for number in range(1200)
+        ])
+        response: HttpResponse = self.client.get(
+            reverse_lazy('tasks'), {'q': 'cloud', 'status': self.status1.pk}
+        )
+        self.assertEqual(list(response.context['tasks']), [self.task3])
+        self.assertEqual(search_tasks(Task.objects.all(), 'cloud').count(), 1202)
+
+    def test_search_ranks_name_matches_first(self) -> None:
+        task: Task = Task.objects.create(
+            name='Cloud migration', description='Move it.', status=self.status1, author=self.user1
+        )
+        with mock.patch.object(TasksListView, 'paginate_by', 2):
+            response: HttpResponse = self.client.get(reverse_lazy('tasks'), {'q': 'cloud'})
+            self.assertEqual(list(response.context['tasks'])[0], task)
+            response = self.client.get(
+                reverse_lazy('tasks') + '?' + response.context['next_page_query']
+            )
+        self.assertEqual(response.context['tasks'].count(), 1)
+
+    def test_search_pages_by_rank(self) -> None:
+        Task.objects.bulk_create([
+            Task(name='Cloud {}'.format(number), description='Move it.',
+                 status=self.status2, author=self.user1)
+            for number in range(7)
+        ])
+        ROUTE = reverse_lazy('tasks')
+        seen: List[int] = []
+        query = 'q=cloud'
+        with mock.patch.object(TasksListView, 'paginate_by', 3):
+            while query:
+                response: HttpResponse = self.client.get('{}?{}'.format(ROUTE, query))
+                seen += [task.pk for task in response.context['tasks']]
+                query = response.context['next_page_query']
+        # The tasks tie on rank across pages, ordered by id among themselves.
+        self.assertEqual(len(seen), len(set(seen)))
+        self.assertCountEqual(seen, search_tasks(Task.objects.all(), 'cloud').values_list(
+            'pk', flat=True
+        ))
+
+        queryset = PostgreSQLSearchBackend().search(Task.objects.all(), 'cloud')
+        self.assertIn('::double precision', str(queryset.query))
+
+    def test_search_index_follows_changes(self) -> None:
+        self.task2.description = 'Deploy to the cloud.'
+        self.task2.save()
+        self.task3.delete()
+        response: HttpResponse = self.client.get(reverse_lazy('tasks'), {'q': 'cloud'})
+        self.assertCountEqual(response.context['tasks'], [self.task1, self.task2])
+
+    def test_filter_choices_are_cached(self) -> None:
+        ROUTE = reverse_lazy('tasks')
+        self.client.get(ROUTE)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(ROUTE)
+        self.assertFalse(any('"labels_label"' in query['sql'] for query in queries))
+
+        Label.objects.create(name='Documentation')
+        response: HttpResponse = self.client.get(ROUTE)
+        self.assertContains(response, 'Documentation')
+
+    def test_filter_choices_are_cached_per_queryset(self) -> None:
+        labels = Label.objects.order_by('pk')
+        names = choices_cache.get(labels, 'name')
+        self.assertEqual(choices_cache.get(labels.filter(pk=1), 'name'), names[:1])
+        self.assertEqual(choices_cache.get(labels, 'pk'), [(pk, pk) for pk, _ in names])
+        self.assertEqual(choices_cache.get(labels, 'name'), names)
+        self.assertEqual(choices_cache.get(labels.none(), 'name'), [])
+
     def test_filter_tasks_by_current_user(self) -> None:
         # Отфильтровать задачи текущего пользователя (определен в "setUp")
         response: HttpResponse = self.client.get(reverse_lazy('tasks'), {'self_tasks': 'on'})
@@ -153,6 +248,142 @@ class TasksTest(TestCase):
         self.assertIn(self.task2, tasks)
         self.assertNotIn(self.task3, tasks)
 
+    def test_tasks_list_view_query_count_is_constant(self) -> None:
+        ROUTE = reverse_lazy('tasks')
+
+        def create_tasks(count: int) -> None:
+            for number in range(count):
+                Task.objects.create(
+                    name='Task {}'.format(number), status=self.status2,
+                    description='Task description', author=self.user3, executor=self.user2
+                )
+
+        # Loads the filter choices, which later requests take from the cache,
+        # and a table, which the new task drops from it.
+        self.client.get(ROUTE)
+        create_tasks(1)
+
+        with CaptureQueriesContext(connection) as initial_queries:
+            self.client.get(ROUTE)
+
+        create_tasks(10)
+
+        with CaptureQueriesContext(connection) as final_queries:
+            response: HttpResponse = self.client.get(ROUTE)
+
+        self.assertEqual(len(response.context['tasks']), 14)
+        self.assertEqual(len(final_queries), len(initial_queries))
+
+    # KEYSET PAGINATION
+
+    @mock.patch.object(TasksListView, 'paginate_by', 2)
+    def test_tasks_list_pagination(self) -> None:
+        ROUTE = reverse_lazy('tasks')
+
+        first_page: HttpResponse = self.client.get(ROUTE)
+        self.assertEqual(list(first_page.context['tasks']), [self.task1, self.task2])
+        self.assertFalse(first_page.context['page_obj'].has_previous())
+        self.assertTrue(first_page.context['page_obj'].has_next())
+
+        with CaptureQueriesContext(connection) as queries:
+            second_page: HttpResponse = self.client.get(
+                '{}?{}'.format(ROUTE, first_page.context['next_page_query'])
+            )
+        self.assertEqual(list(second_page.context['tasks']), [self.task3])
+        self.assertFalse(second_page.context['page_obj'].has_next())
+        self.assertFalse(any('OFFSET' in query['sql'] for query in queries))
+
+        previous_page: HttpResponse = self.client.get(
+            '{}?{}'.format(ROUTE, second_page.context['previous_page_query'])
+        )
+        self.assertEqual(list(previous_page.context['tasks']), [self.task1, self.task2])
+        self.assertFalse(previous_page.context['page_obj'].has_previous())
+
+    @mock.patch.object(TasksListView, 'paginate_by', 1)
+    def test_tasks_list_pagination_keeps_filters(self) -> None:
+        ROUTE = reverse_lazy('tasks')
+
+        first_page: HttpResponse = self.client.get(ROUTE, {'status': self.status1.pk})
+        self.assertEqual(list(first_page.context['tasks']), [self.task2])
+        self.assertIn('status={}'.format(self.status1.pk), first_page.context['next_page_query'])
+
+        second_page: HttpResponse = self.client.get(
+            '{}?{}'.format(ROUTE, first_page.context['next_page_query'])
+        )
+        self.assertEqual(list(second_page.context['tasks']), [self.task3])
+        self.assertIsNone(second_page.context['next_page_query'])
+
+    def test_tasks_list_invalid_cursor(self) -> None:
+        response: HttpResponse = self.client.get(reverse_lazy('tasks'), {'cursor': 'broken'})
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_filter_combinations_use_indexes(self) -> None:
+        output = StringIO()
+        call_command('explain_task_filters', '--fail-on-seq-scan', stdout=output)
+        self.assertEqual(output.getvalue().count('[OK]'), 32)
+
+    # EXPORT TESTING
+
+    def test_tasks_export_csv(self) -> None:
+        response = self.client.get(
+            reverse_lazy('tasks_export', args=['csv']), {'status': self.status1.id}
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment; filename="tasks-', response['Content-Disposition'])
+
+        content = b''.join(response.streaming_content).decode('utf-8-sig')
+        rows = list(csv.reader(StringIO(content)))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0][:3], ['ID', _('Task name'), _('Status')])
+        self.assertEqual(
+            [row[1] for row in rows[1:]],
+            ['Implement functionality', 'Hand over the work to the customer']
+        )
+        self.assertEqual(rows[1][3:6], [str(self.user1), str(self.user2), 'Development'])
+
+    def test_tasks_export_xlsx(self) -> None:
+        response = self.client.get(reverse_lazy('tasks_export', args=['xlsx']))
+        content = b''.join(response.streaming_content)
+
+        with zipfile.ZipFile(BytesIO(content)) as archive:
+            self.assertIsNone(archive.testzip())
+            sheet = archive.read('xl/worksheets/sheet1.xml').decode()
+        self.assertEqual(sheet.count('<row '), 4)
+        self.assertIn('<c r="A2"><v>1</v></c>', sheet)
+        self.assertIn('Development, Optimization', sheet)
+
+    def test_tasks_export_does_not_write_formulas(self) -> None:
+        Task.objects.filter(pk=self.task1.pk).update(name='=HYPERLINK("http://x")')
+        response = self.client.get(reverse_lazy('tasks_export', args=['csv']))
+        content = b''.join(response.streaming_content).decode('utf-8-sig')
+        self.assertIn('\'=HYPERLINK(""http://x"")', content)
+
+        response = self.client.get(reverse_lazy('tasks_export', args=['xlsx']))
+        with zipfile.ZipFile(BytesIO(b''.join(response.streaming_content))) as archive:
+            sheet = archive.read('xl/worksheets/sheet1.xml').decode()
+        self.assertIn('t="inlineStr"><is><t xml:space="preserve">=HYPERLINK', sheet)
+        self.assertNotIn('<f>', sheet)
+
+    @mock.patch.object(TasksExportView, 'chunk_size', 2)
+    def test_tasks_export_in_keyset_chunks(self) -> None:
+        ROUTE = reverse_lazy('tasks_export', args=['csv'])
+        for params in ({}, {'q': 'the'}):
+            response = self.client.get(ROUTE, params)
+            expected = b''.join(response.streaming_content)
+            with mock.patch.dict(connection.settings_dict, DISABLE_SERVER_SIDE_CURSORS=True):
+                response = self.client.get(ROUTE, params)
+                with CaptureQueriesContext(connection) as queries:
+                    content = b''.join(response.streaming_content)
+            self.assertEqual(content, expected)
+            # A query per chunk of 2 tasks, the last one short, and their labels.
+            tasks = len(content.decode('utf-8-sig').splitlines()) - 1
+            self.assertEqual(len(queries), (tasks // 2 + 1) + (tasks + 1) // 2)
+
+    def test_tasks_export_unknown_format(self) -> None:
+        response = self.client.get(reverse_lazy('tasks_export', args=['pdf']))
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
     # CREATE VIEW TESTING & FORM
 
     def test_task_create_view(self) -> None:
@@ -332,6 +563,32 @@ class TasksTest(TestCase):
             expected_message=_('A task can only be deleted by its author.')
         )
 
+    def test_task_views_query_counts(self) -> None:
+        # The session and the user, then the task once, for both the
+        # permission check and the page.
+        with self.assertNumQueries(3):
+            self.client.get(reverse_lazy('task_delete', args=[self.task1.id]))
+        with self.assertNumQueries(3):
+            self.client.get(reverse_lazy('task_delete', args=[self.task3.id]))
+        # The task, its labels and the choices of status, executor and labels.
+        with self.assertNumQueries(7):
+            self.client.get(reverse_lazy('task_update', args=[self.task1.id]))
+        # The author is the current user, not read again.
+        with self.assertNumQueries(5):
+            self.client.get(reverse_lazy('task_create'))
+        # The task, its counters and day, then its history in one INSERT.
+        with self.assertNumQueries(18):
+            self.client.post(reverse_lazy('task_create'), data=TasksTest.VALID_DATA)
+        # After the save of the task, its label links are changed by difference:
+        # one read, one DELETE and one INSERT, then one UPDATE per counter delta,
+        # and both are recorded in one entry of its history.
+        with self.assertNumQueries(26):
+            self.client.post(reverse_lazy('task_update', args=[self.task1.id]),
+                             data=dict(TasksTest.VALID_DATA, labels=[1, 2]))
+        # The history of the task is deleted with it, by one DELETE.
+        with self.assertNumQueries(15):
+            self.client.post(reverse_lazy('task_delete', args=[self.task1.id]))
+
     # DETAIL VIEW TESTING
 
     def test_task_detail_view(self) -> None:
@@ -341,6 +598,166 @@ class TasksTest(TestCase):
         self.assertEqual(response.status_code, HTTPStatus.OK)
         self.assertTemplateUsed(response, template_name='tasks/task_detail.html')
 
+    def test_task_detail_conditional_get(self) -> None:
+        ROUTE = reverse_lazy('task_detail', args=[1])
+        response: HttpResponse = self.client.get(ROUTE)
+        etag: str = response['ETag']
+
+        response = self.client.get(ROUTE, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+        self.assertFalse(response.content)
+
+        label: Label = Label.objects.get(pk=3)
+        label.name = 'Renamed label'
+        label.save()
+        response = self.client.get(ROUTE, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, 'Renamed label')
+
+        self.client.force_login(self.user2)
+        response = self.client.get(ROUTE, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+
+class TaskTableCacheTest(TestCase):
+
+    fixtures = ['task.json', 'label.json', 'status.json', 'user.json']
+
+    def setUp(self) -> None:
+        self.client: Client = Client()
+        self.client.force_login(User.objects.get(pk=1))
+
+    def test_unchanged_board_is_not_queried(self) -> None:
+        ROUTE = reverse_lazy('tasks')
+        self.client.get(ROUTE)
+        hits: int = task_table_cache.stats()['hits']
+
+        with CaptureQueriesContext(connection) as queries:
+            response: HttpResponse = self.client.get(ROUTE)
+        self.assertContains(response, 'Get Terms of Reference')
+        self.assertFalse(any('"tasks_task"' in query['sql'] for query in queries))
+        self.assertEqual(task_table_cache.stats()['hits'], hits + 1)
+
+    def test_tables_read_from_a_replica_are_not_cached(self) -> None:
+        ROUTE = reverse_lazy('tasks')
+        with self.settings(DATABASE_REPLICAS=['default']):
+            response: HttpResponse = self.client.get(ROUTE)
+            self.assertNotIn('ETag', response)
+            misses: int = task_table_cache.stats()['misses']
+            self.client.get(ROUTE)
+            self.assertEqual(task_table_cache.stats()['misses'], misses + 1)
+
+        # A table read from the primary is served to replica readers too.
+        self.client.get(ROUTE)
+        hits: int = task_table_cache.stats()['hits']
+        with self.settings(DATABASE_REPLICAS=['default']):
+            response = self.client.get(ROUTE)
+        self.assertEqual(task_table_cache.stats()['hits'], hits + 1)
+        self.assertIn('ETag', response)
+
+    def test_table_is_cached_per_user_and_filter(self) -> None:
+        ROUTE = reverse_lazy('tasks')
+        self.client.get(ROUTE)
+        misses: int = task_table_cache.stats()['misses']
+
+        self.client.get(ROUTE, {'status': 1})
+        self.client.force_login(User.objects.get(pk=2))
+        self.client.get(ROUTE)
+        self.assertEqual(task_table_cache.stats()['misses'], misses + 2)
+
+    def test_changes_invalidate_table(self) -> None:
+        ROUTE = reverse_lazy('tasks')
+        self.client.get(ROUTE)
+
+        task: Task = Task.objects.get(pk=1)
+        task.name = 'Renamed task'
+        task.save()
+        self.assertContains(self.client.get(ROUTE), 'Renamed task')
+
+        status: Status = Status.objects.get(pk=3)
+        status.name = 'Renamed status'
+        status.save()
+        self.assertContains(self.client.get(ROUTE), 'Renamed status')
+
+        self.assertContains(self.client.get(ROUTE, {'labels': 3}), 'Renamed task')
+        task.labels.clear()
+        self.assertNotContains(self.client.get(ROUTE, {'labels': 3}), 'Renamed task')
+
+    def test_unchanged_board_is_not_modified(self) -> None:
+        ROUTE = reverse_lazy('tasks')
+        etag: str = self.client.get(ROUTE)['ETag']
+
+        with CaptureQueriesContext(connection) as queries:
+            response: HttpResponse = self.client.get(ROUTE, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+        self.assertFalse(any('"tasks_task"' in query['sql'] for query in queries))
+
+        response = self.client.get(ROUTE, {'status': 1}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+        User.objects.get(pk=2).save()
+        response = self.client.get(ROUTE, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+
+class TaskDetailCacheTest(TestCase):
+
+    fixtures = ['task.json', 'label.json', 'status.json', 'user.json']
+
+    def setUp(self) -> None:
+        self.client: Client = Client()
+        self.client.force_login(User.objects.get(pk=1))
+
+    def test_detail_is_read_once(self) -> None:
+        ROUTE = reverse_lazy('task_detail', args=[1])
+        # The session, the user, the validators, then the task with its
+        # status and users, its labels and its history, which is empty.
+        with self.assertNumQueries(6):
+            first: HttpResponse = self.client.get(ROUTE)
+        # The task comes from the cache.
+        with self.assertNumQueries(3):
+            second: HttpResponse = self.client.get(ROUTE)
+        self.assertContains(second, 'Optimization')
+        self.assertEqual(second.content, first.content)
+
+    def test_changes_make_new_keys(self) -> None:
+        ROUTE = reverse_lazy('task_detail', args=[1])
+        self.client.get(ROUTE)
+
+        status: Status = Status.objects.get(pk=Task.objects.get(pk=1).status_id)
+        status.name = 'Renamed status'
+        status.save()
+        self.assertContains(self.client.get(ROUTE), 'Renamed status')
+
+        self.assertContains(self.client.get(ROUTE), 'Optimization')
+        Task.objects.get(pk=1).labels.clear()
+        response: HttpResponse = self.client.get(ROUTE)
+        self.assertFalse(response.context['task'].labels.all())
+        # The history panel names the removed label.
+        self.assertContains(response, '&minus; Development, Optimization')
+
+    def test_history_changes_make_new_keys(self) -> None:
+        ROUTE = reverse_lazy('task_detail', args=[1])
+        task: Task = Task.objects.get(pk=1)
+        for status_id in (1, task.status_id):
+            task.status_id = status_id
+            task.save()
+        first: HttpResponse = self.client.get(ROUTE)
+
+        # The status is named only by the history.
+        status: Status = Status.objects.get(pk=1)
+        status.name = 'Renamed status'
+        status.save()
+        response: HttpResponse = self.client.get(ROUTE, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertContains(response, 'Renamed status', count=2)
+
+        # A change of the description alone does not move `date_modified`.
+        task.description = 'Changed'
+        task.save(update_fields=['description'])
+        second: HttpResponse = self.client.get(ROUTE, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(second.status_code, HTTPStatus.OK)
+        self.assertEqual(len(second.context['history'].object_list),
+                         len(response.context['history'].object_list) + 1)
+
 
 class TestDeleteRelatedEntities(TestCase):
 
@@ -0,0 +1,110 @@
+from django.test import TestCase
+from django.db import connection
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.utils import translation
+
+import json
+import os
+import tempfile
+from io import StringIO
+from typing import List
+from unittest import mock
+
+from task_manager.tasks.models import Task, TaskLabel
+
+
+class TaskTransferTest(TestCase):
+
+    fixtures = ['task.json', 'label.json', 'status.json', 'user.json']
+
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory: str = directory.name
+
+    def export(self, name: str) -> str:
+        path = os.path.join(self.directory, name)
+        call_command('export_tasks', path, chunk_size=2, stderr=StringIO())
+        return path
+
+    def import_(self, path: str, **options) -> str:
+        output = StringIO()
+        call_command('import_tasks', path, stdout=output, **options)
+        return output.getvalue()
+
+    def assertImportedCopies(self, names: List[str]) -> None:
+        copies = Task.objects.filter(pk__gt=3).order_by('pk')
+        self.assertEqual([task.name for task in copies], names)
+        copy = copies.get(name='Get Terms of Reference')
+        self.assertEqual((copy.status_id, copy.author_id, copy.executor_id), (3, 1, 2))
+        self.assertEqual(sorted(copy.labels.values_list('pk', flat=True)), [1, 3])
+
+    def test_export_jsonl(self) -> None:
+        output = StringIO()
+        call_command('export_tasks', format='jsonl', stdout=output, stderr=StringIO())
+        rows = [json.loads(line) for line in output.getvalue().splitlines()]
+
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0]['status'], 'Completed')
+        self.assertEqual(rows[0]['author'], 'Quidditch-Seeker')
+        self.assertEqual(rows[0]['executor'], '@Ron_Weas1ey')
+        self.assertEqual(rows[0]['labels'], ['Development', 'Optimization'])
+
+    def test_export_without_server_side_cursors(self) -> None:
+        with mock.patch.dict(connection.settings_dict, DISABLE_SERVER_SIDE_CURSORS=True), \
+                self.assertNumQueries(4):
+            path = self.export('tasks.csv')
+        with open(path, encoding='utf-8-sig') as stream:
+            self.assertEqual(len(stream.read().splitlines()), 4)
+
+    def test_round_trip_csv(self) -> None:
+        output = self.import_(self.export('tasks.csv'), batch_size=2)
+
+        self.assertIn('Imported 3 rows', output)
+        self.assertIn('rows/s', output)
+        self.assertImportedCopies([
+            'Get Terms of Reference',
+            'Implement functionality',
+            'Hand over the work to the customer',
+        ])
+
+    def test_round_trip_jsonl(self) -> None:
+        self.import_(self.export('tasks.jsonl'))
+        self.assertEqual(Task.objects.count(), 6)
+        self.assertEqual(TaskLabel.objects.count(), 6)
+
+    def test_import_default_author(self) -> None:
+        path = os.path.join(self.directory, 'tasks.jsonl')
+        with open(path, 'w') as stream:
+            stream.write(json.dumps({'name': 'Imported', 'status': 'New'}) + '\n')
+
+        self.import_(path, author='ms.Granger')
+        task = Task.objects.get(name='Imported')
+        self.assertEqual((task.author_id, task.executor_id), (3, None))
+
+    def test_import_unknown_names(self) -> None:
+        path = os.path.join(self.directory, 'tasks.csv')
+        with open(path, 'w') as stream:
+            stream.write('name,status,author,labels\n')
+            stream.write('First,New,ms.Granger,Testing\n')
+            stream.write('Second,Archived,ms.Granger,\n')
+
+        with self.assertRaisesMessage(CommandError, "Row 2: unknown status 'Archived'"):
+            self.import_(path, batch_size=1)
+        self.assertTrue(Task.objects.filter(name='First').exists())
+
+        with self.assertRaisesMessage(CommandError, "Unknown user 'nobody'"):
+            self.import_(path, author='nobody')
+
+    def test_import_validates_rows(self) -> None:
+        path = os.path.join(self.directory, 'tasks.jsonl')
+        with open(path, 'w') as stream:
+            stream.write(json.dumps({'name': 'Labelled', 'status': 'New', 'labels': 'Testing'}))
+            stream.write('\n' + json.dumps({'name': 'x' * 51, 'status': 'New'}) + '\n')
+
+        message = 'Row 2: name: Ensure this value has at most 50 characters (it has 51)'
+        with translation.override('en'), self.assertRaisesMessage(CommandError, message):
+            self.import_(path, author='ms.Granger', batch_size=1)
+        task = Task.objects.get(name='Labelled')
+        self.assertEqual(list(task.labels.values_list('name', flat=True)), ['Testing'])
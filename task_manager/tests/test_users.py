@@ -239,3 +239,18 @@ class UsersTest(TestCase):
         self.assertRedirects(response, reverse_lazy('users'))
         with self.assertRaises(ObjectDoesNotExist):
             User.objects.get(id=self.user1.id)
+
+    def test_user_views_query_counts(self) -> None:
+        self.client.force_login(self.user1)
+        # The session and the user, who is the user of their own pages.
+        with self.assertNumQueries(2):
+            self.client.get(reverse_lazy('user_update', args=[self.user1.id]))
+        with self.assertNumQueries(2):
+            self.client.get(reverse_lazy('user_delete', args=[self.user1.id]))
+        # The page of another user queries them once, for both the
+        # permission check and the page.
+        with self.assertNumQueries(3):
+            self.client.get(reverse_lazy('user_update', args=[self.user2.id]))
+        # Then the tasks protecting the user and the deletion.
+        with self.assertNumQueries(8):
+            self.client.post(reverse_lazy('user_delete', args=[self.user1.id]))
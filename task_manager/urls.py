@@ -17,7 +17,7 @@ from django.contrib import admin
 from django.urls import path, include, URLPattern
 from typing import List
 
-from .views import HomePageView, UserLoginView, UserLogoutView
+from .views import HomePageView, UserLoginView, UserLogoutView, MetricsView
 
 urlpatterns: List[URLPattern] = [
     # Admin Panel
@@ -34,5 +34,11 @@ urlpatterns: List[URLPattern] = [
     path('users/', include('task_manager.users.urls')),
     path('statuses/', include('task_manager.statuses.urls')),
     path('tasks/', include('task_manager.tasks.urls')),
-    path('labels/', include('task_manager.labels.urls'))
+    path('labels/', include('task_manager.labels.urls')),
+
+    # JSON API:
+    path('api/', include('task_manager.api.urls')),
+
+    # Prometheus metrics:
+    path('metrics', MetricsView.as_view(), name='metrics'),
 ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.1.3 on 2026-10-18 02:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='date_modified',
+            field=models.DateTimeField(auto_now=True, verbose_name='modified at'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.1.3 on 2026-10-18 03:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_user_date_modified'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='assigned_task_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='assigned tasks'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='authored_task_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='authored tasks'),
+        ),
+    ]
@@ -1,10 +1,32 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils.translation import gettext_lazy
 
+from task_manager.models import TaskCountersModel
 
-class User(AbstractUser):
+
+class User(AbstractUser, TaskCountersModel):
     first_name = models.CharField(max_length=150)
     last_name = models.CharField(max_length=150)
+    date_modified = models.DateTimeField(
+        verbose_name=gettext_lazy('modified at'),
+        auto_now=True
+    )
+    # Maintained by task_manager.tasks.signals, see task_manager/tasks/counters.py.
+    authored_task_count = models.IntegerField(
+        verbose_name=gettext_lazy('authored tasks'),
+        default=0, editable=False
+    )
+    assigned_task_count = models.IntegerField(
+        verbose_name=gettext_lazy('assigned tasks'),
+        default=0, editable=False
+    )
+
+    counter_fields = ('authored_task_count', 'assigned_task_count')
 
     def __str__(self) -> str:
         return self.get_full_name()
+
+    @property
+    def in_use(self) -> bool:
+        return self.authored_task_count > 0 or self.assigned_task_count > 0
@@ -1,10 +1,16 @@
+from django.conf import settings
 from django.urls import path, URLPattern
 from typing import List
 
-from .views import UsersListView, UserCreateView, UserUpdateView, UserDeleteView
+from .views import (
+    AsyncUsersListView, UsersListView, UserCreateView, UserUpdateView, UserDeleteView
+)
+
+# With ASYNC_VIEWS under ASGI the read-only pages are served by async views.
+ListView = AsyncUsersListView if settings.ASYNC_VIEWS else UsersListView
 
 urlpatterns: List[URLPattern] = [
-    path('', UsersListView.as_view(), name='users'),
+    path('', ListView.as_view(), name='users'),
     path('create/', UserCreateView.as_view(), name='sign_up'),
     path('<int:pk>/update/', UserUpdateView.as_view(), name='user_update'),
     path('<int:pk>/delete/', UserDeleteView.as_view(), name='user_delete')
@@ -4,17 +4,22 @@ from django.views.generic import ListView, CreateView, UpdateView, DeleteView
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.messages.views import SuccessMessageMixin
 from django.forms import BaseForm
+from copy import copy
 from typing import Dict, Type
 
 from .models import User
 from .forms import UserRegistrationForm, UserEditingForm
-from ..mixins import ModifyPermissionMixin, DeletionProtectionMixin
+from ..mixins import (
+    AsyncListMixin, ConditionalGetMixin, ModifyPermissionMixin, DeletionProtectionMixin,
+    MemoizedObjectMixin
+)
 
 
-class UsersListView(ListView):
+class UsersListView(ConditionalGetMixin, ListView):
     '''Show the list of users.'''
     model: Type[User] = User
     context_object_name: str = 'users'
+    shows_task_counts: bool = True
     extra_context: Dict = {
         'page_title': _('Users'),
         'page_description': _('List of Task Manager Users.'),
@@ -22,6 +27,10 @@ class UsersListView(ListView):
     }
 
 
+class AsyncUsersListView(AsyncListMixin, UsersListView):
+    '''Show the list of users from an async view.'''
+
+
 class UserCreateView(SuccessMessageMixin, CreateView):
     '''Create a user.'''
     model: Type[User] = User
@@ -36,7 +45,20 @@ class UserCreateView(SuccessMessageMixin, CreateView):
     success_message: str = _('User successfully registered')
 
 
-class UserUpdateView(ModifyPermissionMixin, LoginRequiredMixin,
+class CurrentUserObjectMixin(MemoizedObjectMixin):
+    '''Takes the user of the page from the request when it is the current
+    user, whom the authentication middleware has already loaded.
+
+    The view gets a copy, so that a form changing it does not change the
+    user the rest of the request sees.'''
+
+    def fetch_object(self) -> User:
+        if str(self.kwargs[self.pk_url_kwarg]) == str(self.request.user.pk):
+            return copy(self.request.user)
+        return super().fetch_object()
+
+
+class UserUpdateView(ModifyPermissionMixin, LoginRequiredMixin, CurrentUserObjectMixin,
                      SuccessMessageMixin, UpdateView):
     '''Change a user.'''
     model: Type[User] = User
@@ -53,7 +75,7 @@ class UserUpdateView(ModifyPermissionMixin, LoginRequiredMixin,
     unpermission_message: str = _('You do not have permission to modify another user')
 
 
-class UserDeleteView(ModifyPermissionMixin, LoginRequiredMixin,
+class UserDeleteView(ModifyPermissionMixin, LoginRequiredMixin, CurrentUserObjectMixin,
                      DeletionProtectionMixin, SuccessMessageMixin, DeleteView):
     '''Delete a user.'''
     model: Type[User] = User
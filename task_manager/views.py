@@ -1,9 +1,14 @@
 from django.utils.translation import gettext_lazy as _
-from django.views.generic import TemplateView
+from django.utils.crypto import constant_time_compare
+from django.views.generic import TemplateView, View
+from django.conf import settings
+from django.http import Http404, HttpRequest, HttpResponse
 from django.contrib.auth.views import LoginView, LogoutView
 from django.contrib.messages.views import SuccessMessageMixin
 from django.contrib import messages
 
+from .metrics import registry
+
 
 class HomePageView(TemplateView):
     '''Main page.'''
@@ -23,3 +28,24 @@ class UserLogoutView(LogoutView):
     def get(self, request, *args, **kwargs):
         messages.success(self.request, _('You are logged out'))
         return super().get(request, *args, **kwargs)
+
+
+class MetricsView(View):
+    '''Request metrics of this process in the Prometheus text format,
+    if INSTRUMENTATION is on. Scrapers send METRICS_TOKEN as a bearer
+    token; otherwise only staff users may read them.'''
+
+    def get(self, request: HttpRequest) -> HttpResponse:
+        if not settings.INSTRUMENTATION:
+            raise Http404
+        if not self.is_authorized(request):
+            return HttpResponse(status=401)
+        return HttpResponse(registry.render(),
+                            content_type='text/plain; version=0.0.4; charset=utf-8')
+
+    def is_authorized(self, request: HttpRequest) -> bool:
+        if settings.METRICS_TOKEN and constant_time_compare(
+            request.headers.get('Authorization', ''), 'Bearer ' + settings.METRICS_TOKEN
+        ):
+            return True
+        return request.user.is_staff